@@ -0,0 +1,110 @@
+# Project: bastproxy
+# Filename: scripts/bench_persistentdict.py
+#
+# File Description: benchmark the PersistentDict formats
+#
+# By: Bast
+"""Benchmark loading and syncing a PersistentDict in each format.
+
+The data looks like settings files: string keys with string, int, bool and
+list values, and some dicts with int keys. Each format is synced and loaded
+for 1k, 10k and 100k entries, and the best time of a few runs is reported.
+
+Usage:
+    python scripts/bench_persistentdict.py [--sizes 1000,10000] [--runs 5]
+
+"""
+
+# Standard Library
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Project
+from libs.persistentdict import SERIALIZERS, KeySchema, PersistentDict
+
+
+def make_data(size: int) -> dict:
+    """Build the data for a dict of size entries."""
+    data = {}
+    for index in range(size):
+        match index % 5:
+            case 0:
+                data[f"setting{index}"] = f"@Rsome value {index}"
+            case 1:
+                data[f"setting{index}"] = index
+            case 2:
+                data[f"setting{index}"] = bool(index % 2)
+            case 3:
+                data[f"setting{index}"] = [f"item{item}" for item in range(5)]
+            case _:
+                data[f"setting{index}"] = {item: f"level {item}" for item in range(3)}
+    return data
+
+
+def best_of(runs: int, func) -> float:
+    """Return the fastest of runs calls to func, in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench(tformat: str, size: int, runs: int, directory: Path) -> tuple[float, ...]:
+    """Time the sync and the load of one format and size."""
+    file_name = directory / f"{tformat}-{size}.txt"
+    pdict = PersistentDict("bench", file_name, tformat=tformat)
+    pdict.update(make_data(size))
+
+    def sync() -> None:
+        # time a full write, a journal would only append the changed keys
+        pdict._journal_rewrite = True
+        pdict.sync()
+
+    sync_time = best_of(runs, sync)
+    load_time = best_of(
+        runs, lambda: PersistentDict("bench", file_name, tformat=tformat)
+    )
+    schema = KeySchema(values=KeySchema())
+    schema_time = best_of(
+        runs,
+        lambda: PersistentDict("bench", file_name, tformat=tformat, key_schema=schema),
+    )
+    return sync_time, load_time, schema_time, file_name.stat().st_size / 1024
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp())
+    try:
+        print(
+            f"{'format':<14}{'entries':>9}{'sync ms':>10}{'load ms':>10}"
+            f"{'schema ms':>11}{'size KiB':>10}"
+        )
+        for size in [int(size) for size in args.sizes.split(",")]:
+            for tformat in [*SERIALIZERS, "journal"]:
+                sync_time, load_time, schema_time, kib = bench(
+                    tformat, size, args.runs, directory
+                )
+                print(
+                    f"{tformat:<14}{size:>9}{sync_time:>10.1f}{load_time:>10.1f}"
+                    f"{schema_time:>11.1f}{kib:>10.0f}"
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Project: bastproxy
+# Filename: scripts/export_capture.py
+#
+# File Description: export a network data capture as text
+#
+# By: Bast
+"""Export a network data capture file as text.
+
+The capture files are in data/logs/networkdata, the text has one line for
+each record in the same format the old networkdata.log used:
+
+    <time> : data.mud    - from_mud     : <line>
+
+Usage:
+    python scripts/export_capture.py <capture file> [-o out.log] [--utc]
+
+"""
+
+# Standard Library
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Project
+from libs.net.capture import export_text
+
+
+def main() -> None:
+    """Export the capture file given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="the capture file to export")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="the file to write, default is stdout"
+    )
+    parser.add_argument("--utc", action="store_true", help="write the times in UTC")
+    args = parser.parse_args()
+
+    # data that was not valid utf-8 is written as escapes
+    if args.output:
+        with args.output.open("w", encoding="utf-8", errors="backslashreplace") as out:
+            count = export_text(args.capture, out, utc=args.utc)
+        print(f"exported {count} records to {args.output}")
+    else:
+        sys.stdout.reconfigure(errors="backslashreplace")  # type: ignore[union-attr]
+        export_text(args.capture, sys.stdout, utc=args.utc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Project: bastproxy
+# Filename: scripts/replay_session.py
+#
+# File Description: replay a recorded mud session through the proxy
+#
+# By: Bast
+"""Replay a recorded mud session through the proxy and report its speed.
+
+The plugins are loaded the same way mudproxy.py loads them, but no listeners
+are created and no mud is connected. The lines the mud sent are fed into
+ProcessDataToClient, with stand-in clients attached, and the throughput,
+latency percentiles and allocations per line are reported.
+
+The session is a network data capture from data/logs/networkdata, or a
+networkdata.log from an older version. By default the plugins use an empty
+data directory in a temporary directory, use --data to replay with the
+settings, triggers and plugins of a real data directory. Changes to it are
+saved, so use a copy.
+
+Usage:
+    python scripts/replay_session.py <session> [--clients 3] [--speed 0]
+        [--batch 15] [--repeat 1] [--tracemalloc] [--data data]
+
+"""
+
+# Standard Library
+import argparse
+import asyncio
+import logging
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+CODE_ROOT = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(CODE_ROOT))
+
+# Project
+# The modules below are imported to add their functions to the API
+from libs import timing  # noqa: E402, F401
+from libs.api import API as BASEAPI  # noqa: E402
+from libs.asynch import QUEUEMANAGER  # noqa: E402
+from libs.net.replay import attach_clients, read_session, replay  # noqa: E402
+from libs.plugins import reloadutils  # noqa: E402, F401
+
+
+def load_plugins(data_path: Path) -> None:
+    """Load the plugins with a data directory, as mudproxy.py does."""
+    BASEAPI.LOG_IN_UTC_TZ = True
+    BASEAPI.startup = True
+    BASEAPI.quiet_mode = True
+    BASEAPI.BASEPATH = CODE_ROOT
+    BASEAPI.BASEDATAPATH = data_path
+    BASEAPI.BASEDATAPLUGINPATH = data_path / "plugins"
+    BASEAPI.BASEDATALOGPATH = data_path / "logs"
+    BASEAPI.BASEPLUGINPATH = CODE_ROOT / "plugins"
+    BASEAPI.BASEDATALOGPATH.mkdir(parents=True, exist_ok=True)
+    BASEAPI.BASEDATAPLUGINPATH.mkdir(parents=True, exist_ok=True)
+
+    from libs.plugins.loader import PluginLoader
+
+    PluginLoader().load_plugins_on_startup()
+    BASEAPI(owner_id="replay").add_events()
+    BASEAPI.startup = False
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Replay the session and print the stats of each run."""
+    task_checker = asyncio.create_task(
+        QUEUEMANAGER.task_check_for_new_tasks(), name="New Task Checker"
+    )
+    clients = attach_clients(args.clients)
+    # let the tasks from loading the plugins and attaching the clients run
+    await asyncio.sleep(0.1)
+
+    lines = list(read_session(args.session))
+    print(f"{len(lines)} lines from the mud in {args.session}, {args.clients} clients")
+    for number in range(args.repeat):
+        stats = await replay(lines, clients, speed=args.speed, batch=args.batch)
+        print(f"\nrun {number + 1}")
+        print("\n".join(stats.report()))
+    task_checker.cancel()
+
+
+def main() -> None:
+    """Parse the arguments and replay the session."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("session", type=Path, help="a capture or networkdata.log")
+    parser.add_argument("--clients", type=int, default=3, help="stand-in clients")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="multiple of the recorded speed, 0 for as fast as possible",
+    )
+    parser.add_argument(
+        "--batch", type=int, default=15, help="the most lines fed at once"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="times to replay")
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="trace allocations for the peak bytes per line, this is much slower",
+    )
+    parser.add_argument("--data", type=Path, help="the data directory to use")
+    args = parser.parse_args()
+
+    logging.basicConfig(level="WARNING")
+    data_path = args.data or Path(tempfile.mkdtemp(prefix="bastproxy-replay-"))
+    try:
+        load_plugins(data_path.resolve())
+        if args.tracemalloc:
+            tracemalloc.start()
+        asyncio.run(run(args))
+    finally:
+        if not args.data:
+            shutil.rmtree(data_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ Usage:
     - Instantiate the `API` class to create an API object.
     - Use the `add` method to add functions to the API.
     - Query the API using the `get` and `has` methods.
+    - Use the `bind` method to keep a handle to an API that is called often.
     - Remove API functions using the `remove` method.
     - Track API usage statistics and details using provided methods.
 
@@ -43,7 +44,8 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Any, ClassVar
 
-from ._apiitem import APIItem
+from ._apihandle import APIHandle
+from ._apiitem import APIItem, BoundAPIItem
 
 # Third Party
 # Project
@@ -65,6 +67,10 @@ class API:  # sourcery skip: upper-camel-case-classes
     # where the main api resides
     _class_api: ClassVar[dict[str, APIItem]] = {}
 
+    # changed whenever the class api changes, handles from bind use it to
+    # know when to look up their api again
+    _class_api_version: ClassVar[int] = 0
+
     # stats for the api
     stats: ClassVar[dict[str, APIStatItem]] = {}
 
@@ -118,6 +124,12 @@ class API:  # sourcery skip: upper-camel-case-classes
         # apis that have been add to this specific instance
         self._instance_api: dict[str, APIItem] = {}
 
+        # changed whenever the instance api changes
+        self._instance_api_version: int = 0
+
+        # handles returned by bind, key: api location
+        self._handles: dict[str, APIHandle] = {}
+
         self.log_level: str = "debug"
 
         # the format for the time
@@ -494,6 +506,7 @@ class API:  # sourcery skip: upper-camel-case-classes
             if force:
                 api_item.overwritten_api = self._class_api[full_api_name]
                 self._class_api[full_api_name] = api_item
+                API._class_api_version += 1
             else:
                 try:
                     from libs.records import LogRecord
@@ -510,6 +523,7 @@ class API:  # sourcery skip: upper-camel-case-classes
                     return False
         else:
             self._class_api[api_item.full_api_name] = api_item
+            API._class_api_version += 1
 
         return True
 
@@ -543,6 +557,7 @@ class API:  # sourcery skip: upper-camel-case-classes
                 api_item.overwritten_api = self._instance_api[api_item.full_api_name]
                 api_item.instance = True
                 self._instance_api[api_item.full_api_name] = api_item
+                self._instance_api_version += 1
             else:
                 try:
                     from libs.records import LogRecord
@@ -563,6 +578,7 @@ class API:  # sourcery skip: upper-camel-case-classes
         else:
             api_item.instance = True
             self._instance_api[api_item.full_api_name] = api_item
+            self._instance_api_version += 1
 
         return True
 
@@ -647,6 +663,8 @@ class API:  # sourcery skip: upper-camel-case-classes
             # this affects apis that are part of a subclass, such as the baseplugin APIs
             self._class_api[i].tfunction.api["addedin"][top_level_api].remove(api_name)  # type: ignore
             del self._class_api[i]
+        if class_keys:
+            API._class_api_version += 1
 
         instance_keys = [
             item for item in self._instance_api if item.startswith(api_toplevel)
@@ -665,6 +683,8 @@ class API:  # sourcery skip: upper-camel-case-classes
                 api_name
             )
             del self._instance_api[i]
+        if instance_keys:
+            self._instance_api_version += 1
 
     def get(self, api_location: str, get_class: bool = False) -> APIItem:
         """Get a callable from the API.
@@ -699,7 +719,47 @@ class API:  # sourcery skip: upper-camel-case-classes
         msg = f"{self.owner_id} : {api_location} is not in the api"
         raise AttributeError(msg)
 
-    __call__ = get
+    def __call__(self, api_location: str, get_class: bool = False) -> BoundAPIItem:
+        """Get a callable from the API that is bound to the owner of this instance.
+
+        Calls through the returned item are recorded for the owner of this API
+        instance, instead of looking up the caller in the call stack.
+
+        Args:
+            api_location: The location of the API to retrieve.
+            get_class: Whether to retrieve the callable from the class-wide API.
+
+        Returns:
+            The callable associated with the specified API location.
+
+        Raises:
+            AttributeError: If the API location is not found in the API.
+
+        """
+        return BoundAPIItem(self.get(api_location, get_class), self.owner_id)
+
+    def bind(self, api_location: str) -> APIHandle:
+        """Get a handle to an API location that can be kept and called later.
+
+        The handle looks up the location once and calls the APIItem directly
+        after that. It looks up the location again when an API is added or
+        removed, such as when a plugin is reloaded. Calls are recorded for the
+        owner of this API instance.
+
+        Args:
+            api_location: The location of the API to bind.
+
+        Returns:
+            The handle for the API location, the same handle is returned for
+            each call with the same location.
+
+        Raises:
+            None
+
+        """
+        if (handle := self._handles.get(api_location)) is None:
+            handle = self._handles[api_location] = APIHandle(self, api_location)
+        return handle
 
     def _api_get_children(self, parent_api: str) -> list[str]:
         """Return a list of APIs in a top-level API.
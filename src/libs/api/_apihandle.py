@@ -0,0 +1,130 @@
+# Project: bastproxy
+# Filename: libs/api/_apihandle.py
+#
+# File Description: holds the apihandle class
+#
+# By: Bast
+"""Module for resolved handles to API functions.
+
+This module provides the `APIHandle` class, which is returned by `API.bind`.
+A handle keeps the APIItem it resolved to and calls it directly, so code that
+calls the same API over and over does not look it up by name on every call.
+
+Key Components:
+    - APIHandle: A callable handle to an API location for a specific API
+        instance.
+
+Features:
+    - Resolves the API location the first time the handle is called.
+    - Resolves it again after an API is added or removed, such as when a
+        plugin is reloaded.
+    - Records calls for the owner of the API instance, the same as calls
+        through `API.__call__`.
+
+Usage:
+    - Get a handle with `api.bind("plugins.core.events:raise.event")` and keep it.
+    - Call the handle like the API function.
+
+Classes:
+    - `APIHandle`: Represents a resolved API location.
+
+"""
+
+# Standard Library
+from typing import TYPE_CHECKING
+
+# Third Party
+# Project
+from ._functools import CALLER_STACK
+
+if TYPE_CHECKING:
+    from ._api import API
+    from ._apiitem import APIItem
+    from ._apistats import APIStatItem
+
+
+class APIHandle:
+    """A handle to an API location that is resolved once and reused.
+
+    The handle remembers the versions of the class and instance APIs it was
+    resolved with. Adding or removing an API changes those versions, and the
+    handle looks up the location again on its next call. If the location was
+    removed, the call raises the same AttributeError as `API.get`.
+
+    """
+
+    __slots__ = ("_api_item", "_stats", "_versions", "api", "api_location")
+
+    def __init__(self, api: "API", api_location: str) -> None:
+        """Initialize the APIHandle.
+
+        Args:
+            api: The API instance to resolve the location with.
+            api_location: The location of the API.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        self.api: API = api
+        self.api_location: str = api_location
+        self._api_item: APIItem | None = None
+        self._stats: APIStatItem | None = None
+        self._versions: tuple[int, int] = (-1, -1)
+
+    @property
+    def api_item(self) -> "APIItem":
+        """Return the APIItem the handle resolves to.
+
+        Returns:
+            The current APIItem for the location.
+
+        Raises:
+            AttributeError: If the API location is not found in the API.
+
+        """
+        api = self.api
+        if self._versions != (api._class_api_version, api._instance_api_version):
+            self._resolve()
+        return self._api_item  # type: ignore[return-value]
+
+    def _resolve(self) -> None:
+        """Look up the API location and remember the versions it was found with.
+
+        Returns:
+            None
+
+        Raises:
+            AttributeError: If the API location is not found in the API.
+
+        """
+        api = self.api
+        self._api_item = api.get(self.api_location)
+        self._stats = self._api_item.stats
+        self._versions = (api._class_api_version, api._instance_api_version)
+
+    def __call__(self, *args, **kwargs):
+        """Call the API function and track its usage for the owner.
+
+        Args:
+            *args: Positional arguments to pass to the API function.
+            **kwargs: Keyword arguments to pass to the API function.
+
+        Returns:
+            The result of the API function call.
+
+        Raises:
+            AttributeError: If the API location is not found in the API.
+
+        """
+        api_item = self.api_item
+        caller_id = self.api.owner_id
+        self._stats.add_call(caller_id)  # type: ignore[union-attr]
+        CALLER_STACK.append(caller_id)
+        try:
+            return api_item.tfunction(*args, **kwargs)
+        finally:
+            CALLER_STACK.pop()
@@ -14,12 +14,16 @@ statistical data about the API's usage.
 Key Components:
     - APIItem: A class that wraps an API function to track its usage and provide
         detailed information about it.
+    - BoundAPIItem: An APIItem bound to the owner of the API instance that
+        looked it up.
 
 Features:
     - Tracks the usage of API functions.
     - Provides detailed information about API functions, including their name, owner,
         and description.
     - Integrates with a statistics manager to record and retrieve API usage data.
+    - Records calls through a bound item for its owner without inspecting the
+        call stack.
     - Supports retrieving detailed descriptions and source code of API functions.
     - Handles overwriting of API functions and maintains information about the
         overwritten API.
@@ -33,6 +37,7 @@ Usage:
 
 Classes:
     - `APIItem`: Represents an API function with tracking and descriptive capabilities.
+    - `BoundAPIItem`: Represents an APIItem called on behalf of a specific owner.
 
 """
 
@@ -43,7 +48,7 @@ from collections.abc import Callable
 # Third Party
 # Project
 from ._apistats import STATS_MANAGER, APIStatItem
-from ._functools import get_args, get_caller_owner_id
+from ._functools import CALLER_STACK, get_args, get_caller_owner_id
 
 
 class APIItem:
@@ -256,3 +261,69 @@ class APIItem:
 
         """
         return f"APIItem({self.full_api_name}, {self.owner_id}, {self.tfunction})"
+
+
+class BoundAPIItem:
+    """An APIItem bound to the owner ID of the API instance that looked it up.
+
+    Calls through the bound item are recorded for that owner, so the caller
+    does not have to be found by inspecting the call stack. The owner is pushed
+    onto the caller stack while the API function runs, so nested API calls can
+    still find who called them. Other attributes are read from the APIItem.
+
+    """
+
+    __slots__ = ("api_item", "caller_id")
+
+    def __init__(self, api_item: APIItem, caller_id: str) -> None:
+        """Initialize the BoundAPIItem.
+
+        Args:
+            api_item: The APIItem to call.
+            caller_id: The owner ID to record calls for.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        self.api_item: APIItem = api_item
+        self.caller_id: str = caller_id
+
+    def __call__(self, *args, **kwargs):
+        """Call the wrapped API function and track its usage for the owner.
+
+        Args:
+            *args: Positional arguments to pass to the API function.
+            **kwargs: Keyword arguments to pass to the API function.
+
+        Returns:
+            The result of the API function call.
+
+        Raises:
+            None
+
+        """
+        STATS_MANAGER.add_call(self.api_item.full_api_name, self.caller_id)
+        CALLER_STACK.append(self.caller_id)
+        try:
+            return self.api_item.tfunction(*args, **kwargs)
+        finally:
+            CALLER_STACK.pop()
+
+    def __getattr__(self, name: str):
+        """Get an attribute of the wrapped APIItem.
+
+        Args:
+            name: The name of the attribute.
+
+        Returns:
+            The attribute of the APIItem.
+
+        Raises:
+            AttributeError: If the APIItem does not have the attribute.
+
+        """
+        return getattr(self.api_item, name)
@@ -14,12 +14,14 @@ arguments.
 Key Components:
     - stackdump: Function to dump the current stack trace.
     - get_caller_owner_id: Function to get the owner ID of the caller.
+    - CALLER_STACK: The owner IDs of the callers of the running API calls.
     - get_args: Function to retrieve the arguments of a given function.
 
 Features:
     - Stack trace dumping with optional message and ID.
     - Identification of the caller's owner ID, with support for ignoring
-        specific owner IDs.
+        specific owner IDs. The callers of running API calls are checked
+        first, the call stack is only walked if none of them match.
     - Retrieval of function arguments from the function declaration.
 
 Usage:
@@ -46,6 +48,10 @@ from itertools import chain
 
 # Project
 
+# the owner ids of the callers of the API calls that are running, the last
+# item is the caller of the innermost call
+CALLER_STACK: list[str] = []
+
 
 def stackdump(id: str = "", msg: str = "") -> list[str]:
     """Dump the current stack trace.
@@ -85,8 +91,9 @@ def stackdump(id: str = "", msg: str = "") -> list[str]:
 def get_caller_owner_id(ignore_owner_list: list[str] | None = None) -> str:
     """Return the owner ID of the caller.
 
-    This function inspects the call stack to determine the owner ID of the caller,
-    ignoring any owner IDs specified in the ignore list.
+    This function checks the callers of the running API calls, starting with
+    the innermost call, and falls back to inspecting the call stack if none of
+    them are usable. Any owner IDs specified in the ignore list are skipped.
 
     Args:
         ignore_owner_list: A list of owner IDs to ignore.
@@ -100,15 +107,19 @@ def get_caller_owner_id(ignore_owner_list: list[str] | None = None) -> str:
     """
     ignore_list = ignore_owner_list or []
 
+    for caller_id in reversed(CALLER_STACK):
+        if caller_id != "unknown" and caller_id not in ignore_list:
+            return caller_id
+
     caller_id = "unknown"
 
     from ._api import API
-    from ._apiitem import APIItem
+    from ._apiitem import APIItem, BoundAPIItem
 
     if frame := inspect.currentframe():
         while frame := frame.f_back:
             if "self" in frame.f_locals and not isinstance(
-                frame.f_locals["self"], APIItem
+                frame.f_locals["self"], (APIItem, BoundAPIItem)
             ):
                 tcs = frame.f_locals["self"]
                 if (
@@ -0,0 +1,333 @@
+# Project: bastproxy
+# Filename: libs/net/capture.py
+#
+# File Description: a binary capture of the network data of a session
+#
+# By: Bast
+"""Module for capturing the network data of a session in a binary file.
+
+Every line read from or written to the mud and the clients is captured as a
+record of the time, the direction, the connection and the raw data. Records
+are packed into a buffer on the event loop, and each full buffer is passed to
+a sink as a block. The log plugin passes the blocks to the log writer thread,
+which compresses them and writes them to the capture file.
+
+File Format:
+    - A header of `MAGIC`, the format version and the compression, padded
+        to 8 bytes.
+    - Blocks, each a `<II` of the stored length and the raw length followed
+        by the stored bytes.
+    - A raw block is a run of records, each a `<dBBI` of the timestamp, the
+        direction (with `BYTES_FLAG` set if the data was bytes), the length
+        of the connection id and the length of the data, followed by the
+        connection id and the data.
+    - A `GAP` record, with no connection id, marks where blocks were dropped
+        before they were written.
+
+Key Components:
+    - SessionCapture: Packs records into blocks on the event loop.
+    - CaptureFile: Writes blocks to a capture file.
+    - read_capture: Reads the records from a capture file.
+    - export_text: Writes the records of a capture file as text.
+
+Features:
+    - Blocks are compressed with zstd if zstandard is installed, otherwise
+        with zlib, or they can be stored uncompressed.
+    - Capturing does nothing until a sink is set.
+    - A block is passed to the sink when it is full, or `FLUSH_INTERVAL`
+        seconds after it was started. Without a running event loop, it is
+        passed when a record is captured after the interval.
+
+Usage:
+    - Call `CAPTURE.start` with a sink to capture, and `CAPTURE.stop` to flush
+        the last block and stop.
+    - Call `CAPTURE.record` with one of the directions to capture data.
+    - Run scripts/export_capture.py to export a capture file as text.
+
+Classes:
+    - `SessionCapture`: Packs captured records into blocks.
+    - `CaptureFile`: Writes blocks to a capture file.
+
+"""
+
+# Standard Library
+import asyncio
+import datetime as dt
+import struct
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+# 3rd Party
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Project
+
+MAGIC = b"BPCAP"
+VERSION = 1
+
+FROM_MUD = 0
+TO_MUD = 1
+CLIENT_READ = 2
+CLIENT_WRITE = 3
+# marks where blocks were dropped, see gap_block
+GAP = 4
+# the labels used by the text export, these match the old networkdata.log
+DIRECTIONS = ("from_mud", "to_mud", "client_read", "client_write", "gap")
+# set in the direction if the data was bytes, such as a telnet command
+BYTES_FLAG = 0x80
+
+COMPRESS_NONE = 0
+COMPRESS_ZLIB = 1
+COMPRESS_ZSTD = 2
+DEFAULT_COMPRESSION = COMPRESS_ZSTD if zstandard is not None else COMPRESS_ZLIB
+
+# the size a block is passed to the sink at
+BLOCK_SIZE = 64 * 1024
+# the most seconds a record waits in a block
+FLUSH_INTERVAL = 1.0
+
+# padded to the size of a block header, so the reader can tell them apart
+_HEADER = struct.Struct("<5sBBx")
+_BLOCK = struct.Struct("<II")
+_RECORD = struct.Struct("<dBBI")
+
+
+def _compressor(compression: int) -> Callable[[bytes], bytes]:
+    """Return the function that compresses blocks."""
+    if compression == COMPRESS_ZSTD:
+        if zstandard is None:
+            msg = "zstd compression needs the zstandard package"
+            raise ValueError(msg)
+        compress: Callable[[bytes], bytes] = zstandard.ZstdCompressor().compress
+        return compress
+    if compression == COMPRESS_ZLIB:
+        return zlib.compress
+    return bytes
+
+
+def _decompressor(compression: int) -> Callable[[bytes], bytes]:
+    """Return the function that decompresses blocks."""
+    if compression == COMPRESS_ZSTD:
+        if zstandard is None:
+            msg = "zstd compression needs the zstandard package"
+            raise ValueError(msg)
+        decompress: Callable[[bytes], bytes] = zstandard.ZstdDecompressor().decompress
+        return decompress
+    if compression == COMPRESS_ZLIB:
+        return zlib.decompress
+    return bytes
+
+
+def gap_block(when: float, dropped: int) -> bytes:
+    """Build a raw block with a record that marks dropped blocks.
+
+    Args:
+        when: The time the blocks were found to be dropped.
+        dropped: The number of blocks that were dropped.
+
+    Returns:
+        The raw block.
+
+    """
+    data = f"{dropped} blocks of network data were not written".encode()
+    return _RECORD.pack(when, GAP, 0, len(data)) + data
+
+
+class SessionCapture:
+    """Pack captured network data into blocks and pass them to a sink."""
+
+    def __init__(self) -> None:
+        """Initialize the capture, it does nothing until it is started."""
+        self.sink: Callable[[bytes], None] | None = None
+        self.buffer = bytearray()
+        self.block_started = 0.0
+        self.flush_timer: asyncio.TimerHandle | None = None
+
+    def start(self, sink: Callable[[bytes], None]) -> None:
+        """Start capturing.
+
+        Args:
+            sink: Called with each raw block, it should not block the event
+                loop.
+
+        """
+        self.flush()
+        self.sink = sink
+
+    def stop(self) -> None:
+        """Pass the last block to the sink and stop capturing."""
+        self.flush()
+        self.sink = None
+
+    def record(
+        self, direction: int, connection: str, data: str | bytes | bytearray
+    ) -> None:
+        """Capture data read from or written to a connection.
+
+        Args:
+            direction: FROM_MUD, TO_MUD, CLIENT_READ or CLIENT_WRITE.
+            connection: The connection id, "mud" or the uuid of a client.
+            data: The data, as it was read or written.
+
+        """
+        if self.sink is None:
+            return
+        now = time.time()
+        if isinstance(data, str):
+            raw = data.encode("utf-8", "surrogateescape")
+        else:
+            raw = bytes(data)
+            direction |= BYTES_FLAG
+        connection_id = connection.encode("utf-8")
+        buffer = self.buffer
+        if not buffer:
+            self.block_started = now
+            self._start_flush_timer()
+        buffer += _RECORD.pack(now, direction, len(connection_id), len(raw))
+        buffer += connection_id
+        buffer += raw
+        if len(buffer) >= BLOCK_SIZE or now - self.block_started >= FLUSH_INTERVAL:
+            self.flush()
+
+    def _start_flush_timer(self) -> None:
+        """Flush the block after FLUSH_INTERVAL, even if no record follows."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # the next record flushes the block once the interval has passed
+            return
+        self.flush_timer = loop.call_later(FLUSH_INTERVAL, self.flush)
+
+    def flush(self) -> None:
+        """Pass the current block to the sink."""
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if self.buffer and self.sink is not None:
+            self.sink(bytes(self.buffer))
+        self.buffer.clear()
+
+
+class CaptureFile:
+    """Write blocks of captured records to a capture file."""
+
+    def __init__(self, path: Path | str, compression: int = DEFAULT_COMPRESSION):
+        """Open the file and write the header.
+
+        Args:
+            path: The path of the capture file, it is appended to if it exists.
+            compression: COMPRESS_NONE, COMPRESS_ZLIB or COMPRESS_ZSTD.
+
+        """
+        self.compress = _compressor(compression)
+        self.file: BinaryIO = Path(path).open("ab")  # noqa: SIM115
+        self.file.write(_HEADER.pack(MAGIC, VERSION, compression))
+
+    def write_block(self, block: bytes) -> None:
+        """Compress a raw block and write it."""
+        stored = self.compress(block)
+        self.file.write(_BLOCK.pack(len(stored), len(block)))
+        self.file.write(stored)
+
+    def flush(self) -> None:
+        """Flush the file."""
+        self.file.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+
+def read_capture(path: Path | str) -> Iterator[tuple[float, int, str, str | bytes]]:
+    """Read the records of a capture file.
+
+    A file can hold more than one capture, each starting with a header.
+
+    Args:
+        path: The path of the capture file.
+
+    Yields:
+        (timestamp, direction, connection id, data) for each record, data is
+        bytes if it was bytes when it was captured.
+
+    Raises:
+        ValueError: If the file is not a capture file.
+
+    """
+    with Path(path).open("rb") as file:
+        decompress = None
+        while header := file.read(_BLOCK.size):
+            if header.startswith(MAGIC):
+                _, version, compression = _HEADER.unpack(header)
+                if version != VERSION:
+                    msg = f"{path} is capture version {version}, not {VERSION}"
+                    raise ValueError(msg)
+                decompress = _decompressor(compression)
+                continue
+            if decompress is None or len(header) < _BLOCK.size:
+                msg = f"{path} is not a capture file"
+                raise ValueError(msg)
+            stored_length, _ = _BLOCK.unpack(header)
+            block = decompress(file.read(stored_length))
+            offset = 0
+            while offset < len(block):
+                when, direction, id_length, data_length = _RECORD.unpack_from(
+                    block, offset
+                )
+                offset += _RECORD.size
+                connection = block[offset : offset + id_length].decode("utf-8")
+                offset += id_length
+                raw = block[offset : offset + data_length]
+                offset += data_length
+                if direction & BYTES_FLAG:
+                    yield when, direction & ~BYTES_FLAG, connection, raw
+                else:
+                    yield (
+                        when,
+                        direction,
+                        connection,
+                        raw.decode("utf-8", "surrogateescape"),
+                    )
+
+
+def export_text(path: Path | str, out: TextIO, utc: bool = False) -> int:
+    """Write the records of a capture file in the networkdata.log format.
+
+    Args:
+        path: The path of the capture file.
+        out: The stream to write the text to.
+        utc: Write the times in UTC instead of local time.
+
+    Returns:
+        The number of records written.
+
+    """
+    count = 0
+    for when, direction, connection, data in read_capture(path):
+        stamp = dt.datetime.fromtimestamp(when, dt.UTC)
+        if not utc:
+            stamp = stamp.astimezone()
+        if direction == GAP:
+            name = "capture"
+        elif connection == "mud":
+            name = "data.mud"
+        else:
+            name = f"data.client.{connection}"
+        # bytes, such as telnet commands, are written as their repr
+        text = data if isinstance(data, str) else repr(data)
+        out.write(
+            f"{stamp.isoformat()} : {name:<11} - {DIRECTIONS[direction]:<12} : {text}"
+        )
+        if not text.endswith("\n"):
+            out.write("\n")
+        count += 1
+    return count
+
+
+CAPTURE = SessionCapture()
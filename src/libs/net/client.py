@@ -40,7 +40,6 @@ Classes:
 import asyncio
 import contextlib
 import datetime
-import logging
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
@@ -54,6 +53,7 @@ if TYPE_CHECKING:
 from libs.api import API
 from libs.asynch import TaskItem
 from libs.net import telnet
+from libs.net.capture import CAPTURE, CLIENT_READ, CLIENT_WRITE
 from libs.records import (
     LogRecord,
     NetworkData,
@@ -104,7 +104,6 @@ class ClientConnection:
         self.reader: TelnetReaderUnicode = reader
         self.writer: TelnetWriterUnicode = writer
         self.telnet_server: TelnetServer | None = self.writer.protocol
-        self.data_logger = logging.getLogger(f"data.client.{self.uuid}")
         self.max_lines_to_process = 15
 
     @property
@@ -366,7 +365,7 @@ class ClientConnection:
                 level="debug",
                 sources=[__name__],
             )()
-            self.data_logger.info("%-12s : %s", "client_read", inp)
+            CAPTURE.record(CLIENT_READ, self.uuid, inp)
 
             if not inp:  # This is an EOF.  Hard disconnect.
                 self.connected = False
@@ -425,19 +424,20 @@ class ClientConnection:
             if msg_obj.is_io:
                 if msg_obj.line:
                     LogRecord(
-                        f"client_write - Writing message to client {self.uuid}: "
-                        f"{msg_obj.line}",
+                        "client_write - Writing message to client %s: %s",
                         level="debug",
                         sources=[__name__],
+                        args=(self.uuid, msg_obj.line),
                     )()
                     LogRecord(
-                        f"client_write - type of msg_obj.msg = {type(msg_obj.line)}",
+                        "client_write - type of msg_obj.msg = %s",
                         level="debug",
                         sources=[__name__],
+                        args=(type(msg_obj.line),),
                     )()
                     self.writer.write(msg_obj.line)
                     msg_obj.was_sent = True
-                    self.data_logger.info("%-12s : %s", "client_write", msg_obj.line)
+                    CAPTURE.record(CLIENT_WRITE, self.uuid, msg_obj.line)
                 else:
                     LogRecord(
                         "client_write - No message to write to client.",
@@ -446,24 +446,23 @@ class ClientConnection:
                     )()
                 if msg_obj.is_prompt:
                     self.writer.write(telnet.go_ahead())
-                    self.data_logger.info(
-                        "%-12s : %s", "client_write", telnet.go_ahead()
-                    )
+                    CAPTURE.record(CLIENT_WRITE, self.uuid, telnet.go_ahead())
             elif msg_obj.is_command_telnet:
                 LogRecord(
-                    f"client_write - type of msg_obj.msg = {type(msg_obj.line)}",
+                    "client_write - type of msg_obj.msg = %s",
                     level="debug",
                     sources=[__name__],
+                    args=(type(msg_obj.line),),
                 )()
                 LogRecord(
-                    f"client_write - Writing telnet option to client {self.uuid}: "
-                    f"{msg_obj.line!r}",
+                    "client_write - Writing telnet option to client %s: %r",
                     level="debug",
                     sources=[__name__],
+                    args=(self.uuid, msg_obj.line),
                 )()
                 self.writer.send_iac(msg_obj.line)
                 msg_obj.was_sent = True
-                self.data_logger.info("%-12s : %s", "client_write", msg_obj.line)
+                CAPTURE.record(CLIENT_WRITE, self.uuid, msg_obj.line)
 
             count = count + 1
             if count == self.max_lines_to_process:
@@ -36,7 +36,6 @@ Classes:
 # Standard Library
 import asyncio
 import datetime
-import logging
 from typing import TYPE_CHECKING
 
 # Third Party
@@ -47,6 +46,7 @@ from libs.asynch import TaskItem
 
 # Project
 from libs.net import telnet
+from libs.net.capture import CAPTURE, FROM_MUD, TO_MUD
 from libs.records import (
     LogRecord,
     NetworkData,
@@ -231,17 +231,21 @@ class MudConnection:
                     print("no data from readline")
                     break
                 LogRecord(
-                    f"client_read - readline - Raw received data in mud_read : {inp}",
+                    "client_read - readline - Raw received data in mud_read : %s",
                     level="debug",
                     sources=[__name__],
+                    args=(inp,),
                 )()
                 LogRecord(
-                    f"client_read - readline - inp type = {type(inp)}",
+                    "client_read - readline - inp type = %s",
                     level="debug",
                     sources=[__name__],
+                    args=(type(inp),),
                 )()
-                data.append(NetworkDataLine(inp.rstrip(), originated="mud"))
-                logging.getLogger("data.mud").info("%-12s : %s", "from_mud", inp)
+                data.append(
+                    NetworkDataLine(inp.rstrip(), originated="mud", lightweight=True)
+                )
+                CAPTURE.record(FROM_MUD, "mud", inp)
                 if (
                     len(self.reader._buffer) <= 0
                     or b"\n" not in self.reader._buffer
@@ -252,19 +256,26 @@ class MudConnection:
             if len(self.reader._buffer) > 0 and b"\n" not in self.reader._buffer:
                 inp: str = await self.reader.read(len(self.reader._buffer))
                 LogRecord(
-                    f"client_read - read - Raw received data in mud_read : {inp}",
+                    "client_read - read - Raw received data in mud_read : %s",
                     level="debug",
                     sources=[__name__],
+                    args=(inp,),
                 )()
                 LogRecord(
-                    f"client_read - read - inp type = {type(inp)}",
+                    "client_read - read - inp type = %s",
                     level="debug",
                     sources=[__name__],
+                    args=(type(inp),),
                 )()
                 data.append(
-                    NetworkDataLine(inp, originated="mud", had_line_endings=False)
+                    NetworkDataLine(
+                        inp,
+                        originated="mud",
+                        had_line_endings=False,
+                        lightweight=True,
+                    )
                 )
-                logging.getLogger("data.mud").info("%-12s : %s", "from_mud", inp)
+                CAPTURE.record(FROM_MUD, "mud", inp)
 
             if self.reader.at_eof():  # This is an EOF.  Hard disconnect.
                 self.connected = False
@@ -318,9 +329,7 @@ class MudConnection:
                     )()
                     self.writer.write(msg_obj.line)
                     msg_obj.was_sent = True
-                    logging.getLogger("data.mud").info(
-                        "%-12s : %s", "to_mud", msg_obj.line
-                    )
+                    CAPTURE.record(TO_MUD, "mud", msg_obj.line)
                 else:
                     LogRecord(
                         "client_write - No message to write to client.",
@@ -340,9 +349,7 @@ class MudConnection:
                 )()
                 self.writer.send_iac(msg_obj.line)
                 msg_obj.was_sent = True
-                logging.getLogger("data.mud").info(
-                    "%-12s : %s", "to_client", msg_obj.line
-                )
+                CAPTURE.record(TO_MUD, "mud", msg_obj.line)
 
             if count >= self.max_lines_to_process:
                 await asyncio.sleep(0)
@@ -0,0 +1,260 @@
+# Project: bastproxy
+# Filename: libs/net/replay.py
+#
+# File Description: replay recorded mud traffic through the proxy
+#
+# By: Bast
+"""Module for replaying recorded mud traffic through the proxy.
+
+A recorded session is fed into `ProcessDataToClient` the same way
+`MudConnection.mud_read` does, with stand-in clients attached in place of
+telnet clients. Each stand-in records when every line reaches it, so the
+replay measures the whole pipeline: triggers, colors, record tracking and
+the send to every client.
+
+Key Components:
+    - read_session: Reads the lines from the mud in a capture file or an old
+        networkdata.log.
+    - ReplayClient: A stand-in for a logged in ClientConnection.
+    - ReplayStats: The throughput, latency and allocations of a replay.
+    - replay: Feeds lines through the proxy and returns the stats.
+
+Features:
+    - Replays as fast as possible, or at a multiple of the recorded speed.
+    - Latency is measured from feeding a line to it reaching each client.
+    - The number of memory blocks still allocated after the replay is
+        reported per line, with the peak traced memory if tracemalloc is
+        running.
+
+Usage:
+    - Run scripts/replay_session.py, which loads the plugins and replays a
+        session.
+
+Classes:
+    - `ReplayClient`: A stand-in client that records what it is sent.
+    - `ReplayStats`: The results of a replay.
+
+"""
+
+# Standard Library
+import asyncio
+import datetime as dt
+import re
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# 3rd Party
+# Project
+from libs.api import API
+from libs.net.capture import FROM_MUD, MAGIC, read_capture
+from libs.records import NetworkData, NetworkDataLine, ProcessDataToClient
+
+# a line from the mud in networkdata.log
+_TEXT_LINE = re.compile(
+    r"^(?P<time>\S+) : data\.mud\s+- from_mud\s+: (?P<data>.*)$", re.DOTALL
+)
+
+
+def read_session(path: Path | str) -> Iterator[tuple[float, str]]:
+    """Read the lines from the mud in a recorded session.
+
+    Args:
+        path: A capture file or a networkdata.log.
+
+    Yields:
+        (timestamp, line) for each line read from the mud, with its line
+        ending if it had one. Lines from a networkdata.log always have one.
+
+    """
+    path = Path(path)
+    with path.open("rb") as file:
+        is_capture = file.read(len(MAGIC)) == MAGIC
+    if is_capture:
+        for when, direction, _, data in read_capture(path):
+            if direction == FROM_MUD and isinstance(data, str):
+                yield when, data
+        return
+
+    with path.open(encoding="utf-8", errors="surrogateescape", newline="\n") as file:
+        for text in file:
+            if match := _TEXT_LINE.match(text):
+                when = dt.datetime.fromisoformat(match["time"]).timestamp()
+                yield when, match["data"]
+
+
+class ReplayClient:
+    """A stand-in for a logged in ClientConnection.
+
+    It has the attributes the clients plugin uses, and records the time each
+    line is sent to it instead of writing it to a socket.
+    """
+
+    def __init__(self, number: int) -> None:
+        """Initialize the client.
+
+        Args:
+            number: The number of the client, used in its uuid.
+
+        """
+        self.uuid = f"replay-{number}"
+        self.addr = "replay"
+        self.port = number
+        self.state: dict[str, bool] = {"logged in": False}
+        self.view_only = False
+        self.connected = True
+        self.lines = 0
+        self.fed_at = 0.0
+        self.latencies: list[float] = []
+
+    def send_to(self, data: NetworkDataLine) -> None:
+        """Record the latency of a line sent to the client."""
+        self.lines += 1
+        self.latencies.append(time.perf_counter() - self.fed_at)
+
+
+@dataclass
+class ReplayStats:
+    """The results of a replay."""
+
+    lines: int = 0
+    seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    retained_blocks: int = 0
+    peak_traced: int | None = None
+
+    @property
+    def lines_per_second(self) -> float:
+        """Return the lines replayed per second."""
+        return self.lines / self.seconds if self.seconds else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return a latency percentile in seconds, using the nearest rank.
+
+        Args:
+            percent: The percentile, from 0 to 100.
+
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(round(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def report(self) -> list[str]:
+        """Return the stats as lines of text."""
+        msg = [
+            f"lines replayed        : {self.lines}",
+            f"seconds               : {self.seconds:.3f}",
+            f"lines/sec             : {self.lines_per_second:.0f}",
+        ]
+        msg.extend(
+            f"{f'latency p{percent}':<22}: {self.percentile(percent) * 1000:.3f} ms"
+            for percent in (50, 90, 99)
+        )
+        msg.append(
+            f"latency max           : {max(self.latencies, default=0) * 1000:.3f} ms"
+        )
+        if self.lines:
+            msg.append(
+                f"retained blocks/line  : {self.retained_blocks / self.lines:.1f}"
+            )
+        if self.peak_traced is not None and self.lines:
+            msg.append(f"peak traced bytes/line: {self.peak_traced / self.lines:.0f}")
+        return msg
+
+
+def attach_clients(count: int) -> list[ReplayClient]:
+    """Add logged in stand-in clients to the clients plugin.
+
+    Args:
+        count: The number of clients to add.
+
+    Returns:
+        The clients that were added.
+
+    """
+    api = API(owner_id=f"{__name__}:attach_clients")
+    clients = [ReplayClient(number) for number in range(count)]
+    for client in clients:
+        api("plugins.core.clients:client.add")(client)
+        api("plugins.core.clients:client.logged.in")(client.uuid)
+    return clients
+
+
+async def replay(
+    lines: Iterable[tuple[float, str]],
+    clients: list[ReplayClient],
+    speed: float = 0,
+    batch: int = 1,
+) -> ReplayStats:
+    """Feed lines into ProcessDataToClient as MudConnection.mud_read would.
+
+    Args:
+        lines: (timestamp, line) for each line, as from read_session.
+        clients: The stand-in clients, which are reset before the replay.
+        speed: 0 to replay as fast as possible, otherwise the multiple of the
+            recorded speed to replay at.
+        batch: The most lines to feed in one NetworkData, like
+            MudConnection.max_lines_to_process.
+
+    Returns:
+        The stats of the replay.
+
+    """
+    for client in clients:
+        client.lines = 0
+        client.latencies = []
+    stats = ReplayStats()
+    pending: list[str] = []
+    first_recorded = None
+    blocks_before = sys.getallocatedblocks()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+
+    async def feed() -> None:
+        data = NetworkData([], owner_id="replay")
+        for line in pending:
+            data.append(
+                NetworkDataLine(
+                    line.rstrip(),
+                    originated="mud",
+                    had_line_endings=line.endswith("\n"),
+                    lightweight=True,
+                )
+            )
+        fed_at = time.perf_counter()
+        for client in clients:
+            client.fed_at = fed_at
+        ProcessDataToClient(data)()
+        stats.lines += len(pending)
+        pending.clear()
+        # this is so we don't hog the asyncio loop, the same as mud_read
+        await asyncio.sleep(0)
+
+    for when, line in lines:
+        if speed:
+            if first_recorded is None:
+                first_recorded = when
+            delay = (when - first_recorded) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                if pending:
+                    await feed()
+                await asyncio.sleep(delay)
+        pending.append(line)
+        if len(pending) >= batch or not line.endswith("\n"):
+            await feed()
+    if pending:
+        await feed()
+
+    stats.seconds = time.perf_counter() - start
+    stats.retained_blocks = sys.getallocatedblocks() - blocks_before
+    if tracemalloc.is_tracing():
+        stats.peak_traced = tracemalloc.get_traced_memory()[1]
+    for client in clients:
+        stats.latencies.extend(client.latencies)
+    return stats
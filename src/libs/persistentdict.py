@@ -9,15 +9,23 @@
 This module provides the `PersistentDict` class, which allows for the creation of
 a dictionary that persists its data to disk. The dictionary operations are performed
 in memory for speed, and the data is written to disk only when explicitly requested.
-The module supports both JSON and pickle formats for serialization.
+The module supports JSON, compact JSON, orjson, msgpack and pickle formats for
+serialization, and a journal format that appends the changed keys to the file
+instead of rewriting it.
 
 Key Components:
     - PersistentDict: A class that extends the built-in dict to provide persistence.
+    - Serializer: The base class for the formats in SERIALIZERS.
+    - KeySchema: Describes which keys are converted to ints when a file is loaded.
     - Utility functions for converting data types and keys.
 
 Features:
     - Delayed disk writes for improved performance.
-    - Support for JSON and pickle serialization formats.
+    - Support for JSON, compact JSON and pickle serialization formats, and for
+        orjson and msgpack when they are installed.
+    - A journal format where a sync appends one line for each key that was set
+        or deleted, and the file is compacted once the journal grows too large
+        compared to the dict.
     - Automatic conversion of input data to appropriate types.
     - Context manager support for automatic resource management.
 
@@ -29,6 +37,8 @@ Usage:
 
 Classes:
     - `PersistentDict`: Represents a dictionary that persists its data to disk.
+    - `Serializer`: Turns the data of a PersistentDict into bytes and back.
+    - `KeySchema`: Represents the key types of a dict and the dicts nested in it.
 
 """
 
@@ -43,6 +53,15 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any, Self
 
 # Third Party
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # Project
 from libs.api import API
 from libs.records import LogRecord
@@ -50,6 +69,12 @@ from libs.records import LogRecord
 if TYPE_CHECKING:
     pass
 
+# compact a journal when it has more entries than this times the number of keys
+JOURNAL_COMPACT_RATIO = 2
+
+# a journal with fewer entries than this is never compacted
+JOURNAL_MIN_ENTRIES = 100
+
 
 def convert(tinput: Any) -> Any:
     """Convert input data to appropriate types.
@@ -81,6 +106,32 @@ def convert(tinput: Any) -> Any:
     return tinput
 
 
+def int_key(key: Any) -> Any:
+    """Convert a key to an int if it is one.
+
+    Strings that cannot start an int are returned without calling int, since
+    raising and catching the ValueError is most of the cost of a load.
+
+    Args:
+        key: The key to convert.
+
+    Returns:
+        The key as an int, or the key unchanged.
+
+    Raises:
+        None
+
+    """
+    if isinstance(key, str):
+        first = key.lstrip()[:1]
+        if not first.isdigit() and first not in ("+", "-"):
+            return key
+    try:
+        return int(key)
+    except ValueError:
+        return key
+
+
 def convert_keys_to_int(tdict: dict) -> dict[Any, Any]:
     """Convert dictionary keys to integers where possible.
 
@@ -100,9 +151,7 @@ def convert_keys_to_int(tdict: dict) -> dict[Any, Any]:
     """
     new = {}
     for i, ndata in tdict.items():
-        nkey = i
-        with contextlib.suppress(ValueError):
-            nkey = int(i)
+        nkey = int_key(i)
         if isinstance(ndata, dict):
             converted_ndata = convert_keys_to_int(ndata)
         else:
@@ -111,6 +160,224 @@ def convert_keys_to_int(tdict: dict) -> dict[Any, Any]:
     return new
 
 
+def json_loads(data: bytes | str) -> Any:
+    """Parse JSON data, with orjson if it is installed.
+
+    orjson does not accept everything the json module writes, such as NaN or
+    integers larger than 64 bits, so the json module is used when it fails.
+
+    Args:
+        data: The JSON data.
+
+    Returns:
+        The parsed data.
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON.
+
+    """
+    if orjson is not None:
+        with contextlib.suppress(orjson.JSONDecodeError):
+            return orjson.loads(data)
+    return json.loads(data)
+
+
+class Serializer:
+    """Turn the data of a PersistentDict into bytes and back.
+
+    Subclasses are added to SERIALIZERS under the name used for tformat.
+
+    Attributes:
+        native_keys: True if the format keeps the types of keys, so loaded keys
+            do not need to be converted to ints.
+        needs_convert: True if loaded values have to be passed through convert.
+
+    """
+
+    native_keys = False
+    needs_convert = False
+
+    def dumps(self, data: dict) -> bytes:
+        """Serialize the data.
+
+        Args:
+            data: The data to serialize.
+
+        Returns:
+            The serialized data.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement it.
+
+        """
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> dict:
+        """Deserialize the data.
+
+        Args:
+            data: The serialized data.
+
+        Returns:
+            The deserialized data.
+
+        Raises:
+            NotImplementedError: If the subclass does not implement it.
+
+        """
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+    """Serialize to JSON with the json module."""
+
+    def __init__(self, indent: int | None = None) -> None:
+        """Initialize the serializer.
+
+        Args:
+            indent: The indent to write with, None for compact JSON.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        self.indent = indent
+
+    def dumps(self, data: dict) -> bytes:
+        """Serialize the data to JSON, skipping keys JSON does not support."""
+        return json.dumps(
+            data, separators=(",", ":"), skipkeys=True, indent=self.indent
+        ).encode("utf-8")
+
+    def loads(self, data: bytes) -> dict:
+        """Deserialize JSON data."""
+        loaded: dict = json_loads(data)
+        return loaded
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Serialize to compact JSON with orjson.
+
+    Without orjson, or for data orjson cannot serialize, the json module is
+    used, so the file is compact JSON either way.
+    """
+
+    def dumps(self, data: dict) -> bytes:
+        """Serialize the data to JSON with orjson."""
+        if orjson is not None:
+            with contextlib.suppress(TypeError):
+                return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        return super().dumps(data)
+
+
+class MsgpackSerializer(Serializer):
+    """Serialize to msgpack, which keeps int keys as ints."""
+
+    native_keys = True
+
+    def dumps(self, data: dict) -> bytes:
+        """Serialize the data to msgpack."""
+        packed: bytes = msgpack.packb(data, use_bin_type=True)
+        return packed
+
+    def loads(self, data: bytes) -> dict:
+        """Deserialize msgpack data."""
+        loaded: dict = msgpack.unpackb(data, strict_map_key=False)
+        return loaded
+
+
+class PickleSerializer(Serializer):
+    """Serialize with pickle."""
+
+    needs_convert = True
+
+    def dumps(self, data: dict) -> bytes:
+        """Serialize the data with pickle."""
+        return pickle.dumps(data, 2)
+
+    def loads(self, data: bytes) -> dict:
+        """Deserialize pickle data."""
+        loaded: dict = pickle.loads(data)
+        return loaded
+
+
+# the serializers for each tformat, the journal format writes its own lines
+SERIALIZERS: dict[str, Serializer] = {
+    "json": JSONSerializer(indent=2),
+    "json-compact": JSONSerializer(),
+    "orjson": OrjsonSerializer(),
+    "pickle": PickleSerializer(),
+}
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = MsgpackSerializer()
+
+
+class KeySchema:
+    """The key types of a dict and of the dicts nested in it.
+
+    Text formats store every key as a string. Without a schema, a loaded
+    PersistentDict converts every key that looks like an int, at every level,
+    to an int. A schema converts the keys of the dicts it names and leaves the
+    rest of the data as it was loaded.
+
+    """
+
+    __slots__ = ("fields", "key_type", "values")
+
+    def __init__(
+        self,
+        key_type: type = int,
+        values: "KeySchema | None" = None,
+        fields: "dict[Any, KeySchema] | None" = None,
+    ) -> None:
+        """Initialize the schema.
+
+        Args:
+            key_type: int to convert the keys of the dict to ints where
+                possible, str to keep them as they are.
+            values: The schema for every value of the dict that is a dict.
+            fields: The schema for the values of specific keys, used instead
+                of values.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        self.key_type = key_type
+        self.values = values
+        self.fields = fields or {}
+
+    def coerce(self, data: dict) -> dict:
+        """Convert the keys of data and its nested dicts.
+
+        Args:
+            data: The loaded dict.
+
+        Returns:
+            A new dict with the keys converted.
+
+        Raises:
+            None
+
+        """
+        if self.key_type is int:
+            new = {int_key(key): value for key, value in data.items()}
+        else:
+            new = dict(data)
+        if self.values is not None or self.fields:
+            for key, value in new.items():
+                schema = self.fields.get(key, self.values)
+                if schema is not None and isinstance(value, dict):
+                    new[key] = schema.coerce(value)
+        return new
+
+
 class PersistentDict(dict):
     """Persistent dictionary with an API compatible with shelve and anydbm.
 
@@ -120,8 +387,19 @@ class PersistentDict(dict):
     Write to disk is delayed until close or sync (similar to gdbm's fast mode).
 
     Input file format is automatically discovered.
-    Output file format is selectable between pickle and json
-    All three serialization formats are backed by fast C implementations.
+    Output file format is selectable with tformat, one of the names in
+    SERIALIZERS or journal.
+    All serialization formats are backed by fast C implementations.
+
+    Loaded keys are converted to ints where possible, at every level, unless
+    a key_schema says which dicts to convert. The top level keys are always
+    converted, like keys that are set.
+
+    The journal format keeps one JSON line for each key that was set or
+    deleted. A sync appends lines for the keys changed since the last sync,
+    with their current values, and a load replays the lines. Values that are
+    changed in place, such as a list that is appended to, are only written if
+    the key is set again.
 
     """
 
@@ -133,6 +411,7 @@ class PersistentDict(dict):
         mode: str | None = None,
         tformat: str = "json",
         *args,
+        key_schema: KeySchema | None = None,
         **kwargs,
     ) -> None:
         """Initialize the PersistentDict.
@@ -146,17 +425,27 @@ class PersistentDict(dict):
             file_name: The name of the file where the dictionary data is stored.
             flag: The mode in which to open the file.
             mode: The file mode to use when creating the file.
-            tformat: The serialization format to use ('json' or 'pickle').
+            tformat: The serialization format to use, a name in SERIALIZERS
+                or 'journal'.
             *args: Additional positional arguments to pass to the dict constructor.
+            key_schema: The schema to convert loaded keys with, None to convert
+                every key that looks like an int.
             **kwargs: Additional keyword arguments to pass to the dict constructor.
 
         Returns:
             None
 
         Raises:
-            ValueError: If the file is not in a supported format.
+            ValueError: If the format is unknown or the file is not in a
+                supported format.
 
         """
+        if tformat != "journal" and tformat not in SERIALIZERS:
+            msg = (
+                f"Unknown format {tformat!r}, use one of "
+                f"{', '.join([*SERIALIZERS, 'journal'])}"
+            )
+            raise ValueError(msg)
         self.owner_id = owner_id
         self._dump_shallow_attrs = ["api"]
         self.api = API(owner_id=f"{self.owner_id}:{__name__}:{file_name}")
@@ -167,9 +456,24 @@ class PersistentDict(dict):
         # None or an octal triple like 0644
         self.mode = (stat.S_IWUSR | stat.S_IRUSR) or mode
 
-        # json', or 'pickle'
+        # a name in SERIALIZERS or 'journal'
         self.format = tformat
+        self.serializer = SERIALIZERS[
+            "json-compact" if tformat == "journal" else tformat
+        ]
+        self.key_schema = key_schema
         self.file_name = file_name
+
+        # the keys changed since the last sync for the journal format, the value
+        # is True if the key was set and False if it was deleted
+        self._journal_changes: dict[Any, bool] | None = (
+            {} if tformat == "journal" else None
+        )
+        # the number of entries in the journal file
+        self._journal_entries = 0
+        # set when the dict was cleared, the next sync rewrites the journal
+        self._journal_rewrite = False
+
         self.pload()
         super().__init__(*args, **kwargs)
 
@@ -181,6 +485,10 @@ class PersistentDict(dict):
         atomically moves it to the target file to ensure data integrity. If the
         dictionary is opened in read-only mode, this method does nothing.
 
+        For the journal format, the keys changed since the last sync are
+        appended to the file instead, and the file is only rewritten when the
+        journal needs compaction.
+
         Returns:
             None
 
@@ -190,6 +498,9 @@ class PersistentDict(dict):
         """
         if self.flag == "r":
             return
+        if self._journal_changes is not None and not self.journal_needs_compaction():
+            self.append_journal()
+            return
         temp_name = self.file_name.with_suffix(".tmp")
 
         try:
@@ -201,6 +512,52 @@ class PersistentDict(dict):
             shutil.move(temp_name, self.file_name)  # atomic commit
         if self.mode is not None:
             Path(self.file_name).chmod(self.mode)
+        if self._journal_changes is not None:
+            self._journal_changes.clear()
+            self._journal_entries = len(self)
+            self._journal_rewrite = False
+
+    def journal_needs_compaction(self) -> bool:
+        """Check if the journal should be rewritten instead of appended to.
+
+        Returns:
+            True if the journal file does not exist, the dict was cleared, or
+            the journal would have more than JOURNAL_COMPACT_RATIO entries for
+            each key.
+
+        Raises:
+            None
+
+        """
+        if self._journal_rewrite or not self.file_name.exists():
+            return True
+        entries = self._journal_entries + len(self._journal_changes or ())
+        return entries > max(JOURNAL_MIN_ENTRIES, JOURNAL_COMPACT_RATIO * len(self))
+
+    def append_journal(self) -> None:
+        """Append the keys changed since the last sync to the journal file.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        if not self._journal_changes:
+            return
+        lines = [
+            json.dumps(
+                ["s", key, self[key]] if was_set else ["d", key],
+                separators=(",", ":"),
+                skipkeys=True,
+            )
+            for key, was_set in self._journal_changes.items()
+        ]
+        with self.file_name.open(mode="a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self._journal_entries += len(lines)
+        self._journal_changes.clear()
 
     def close(self) -> None:
         """Close the dictionary and synchronize with the file on disk.
@@ -261,8 +618,9 @@ class PersistentDict(dict):
 
         This method serializes the in-memory dictionary and writes it to the specified
         file object. The serialization format is determined by the `format` attribute,
-        which can be either 'json' or 'pickle'. The data is written to a temporary file
-        and then atomically moved to the target file to ensure data integrity.
+        which is a name in SERIALIZERS or 'journal'. The data is written to a
+        temporary file and then atomically moved to the target file to ensure data
+        integrity.
 
         Args:
             file_object: The file object to which the dictionary data will be written.
@@ -271,25 +629,26 @@ class PersistentDict(dict):
             None
 
         Raises:
-            NotImplementedError: If the specified format is not supported.
+            None
 
         """
-        if self.format == "json":
+        if self.format == "journal":
             with file_object.open(mode="w", encoding="utf-8") as f:
-                json.dump(self, f, separators=(",", ":"), skipkeys=True, indent=2)
-        elif self.format == "pickle":
-            with file_object.open(mode="wb") as f:
-                pickle.dump(dict(self), f, 2)
+                for key, value in self.items():
+                    f.write(
+                        json.dumps(
+                            ["s", key, value], separators=(",", ":"), skipkeys=True
+                        )
+                    )
+                    f.write("\n")
         else:
-            msg = f"Unknown format: {self.format!r}"
-            raise NotImplementedError(msg)
+            file_object.write_bytes(self.serializer.dumps(dict(self)))
 
     def pload(self) -> None:
         """Load the dictionary from the file on disk.
 
         This method loads the dictionary data from the file on disk. It attempts to
-        read the data using the specified serialization format (either 'json' or
-        'pickle'). If the file does not exist or is not readable, the method does
+        read the data using the specified serialization format. If the file does not exist or is not readable, the method does
         nothing. If an error occurs during the loading process, a ValueError is
         raised.
 
@@ -313,8 +672,8 @@ class PersistentDict(dict):
         """Load the dictionary data from the file.
 
         This method reads the dictionary data from the file on disk using the
-        specified serialization format (either 'json' or 'pickle'). It converts
-        the keys to integers where possible and updates the in-memory dictionary
+        specified serialization format. It converts the keys to integers where
+        possible, as described by the key schema, and updates the in-memory dictionary
         with the loaded data. If the file does not exist or is not readable, the
         method does nothing. If an error occurs during the loading process, a
         ValueError is raised.
@@ -330,17 +689,12 @@ class PersistentDict(dict):
         tstuff = {}
 
         if not self.file_name.exists():
-            return None
+            return
         try:
-            if self.format == "pickle":
-                with self.file_name.open(mode="rb") as tfile:
-                    tstuff = pickle.load(tfile)
-            elif self.format == "json":
-                with self.file_name.open("r", encoding="utf-8") as tfile:
-                    tstuff = json.load(tfile, object_hook=convert)
-
-            nstuff = convert_keys_to_int(tstuff)
-            return self.update(nstuff)
+            if self.format == "journal":
+                tstuff = self.read_journal()
+            else:
+                tstuff = self.serializer.loads(self.file_name.read_bytes())
 
         except Exception:  # pylint: disable=broad-except
             sources = [__name__]
@@ -352,10 +706,63 @@ class PersistentDict(dict):
                 sources=sources,
                 exc_info=True,
             )()
+        else:
+            if self.serializer.native_keys:
+                nstuff = tstuff
+            elif self.key_schema is not None:
+                nstuff = self.key_schema.coerce(tstuff)
+            else:
+                nstuff = convert_keys_to_int(tstuff)
+            if self.serializer.needs_convert:
+                self.update(nstuff)
+            else:
+                # values from the text formats are already plain data
+                dict.update(self, nstuff)
+            if self._journal_changes is not None:
+                # the loaded keys are already in the journal
+                self._journal_changes.clear()
+            return
 
         msg = "File not in a supported format"
         raise ValueError(msg)
 
+    def read_journal(self) -> dict:
+        """Replay the journal file.
+
+        A last line that was not completely written is skipped.
+
+        Returns:
+            A dict of the keys and values in the journal.
+
+        Raises:
+            ValueError: If a line other than the last is not a journal entry.
+
+        """
+        tstuff = {}
+        with self.file_name.open("r", encoding="utf-8") as tfile:
+            lines = [line for line in tfile.read().splitlines() if line.strip()]
+        for index, line in enumerate(lines):
+            try:
+                entry = json_loads(line)
+            except json.JSONDecodeError:
+                if index != len(lines) - 1:
+                    raise
+                LogRecord(
+                    f"Skipping an incomplete journal entry in {self.file_name}",
+                    level="warning",
+                    sources=[__name__, self.owner_id],
+                )()
+                break
+            if entry[0] == "s":
+                tstuff[entry[1]] = entry[2]
+            elif entry[0] == "d":
+                tstuff.pop(entry[1], None)
+            else:
+                msg = f"Unknown journal entry {entry!r}"
+                raise ValueError(msg)
+        self._journal_entries = len(lines)
+        return tstuff
+
     def __setitem__(self, key: Any, val: Any) -> None:
         """Set the value for a given key in the dictionary.
 
@@ -381,6 +788,91 @@ class PersistentDict(dict):
             key = convert(key)
         val = convert(val)
         super().__setitem__(key, val)
+        if self._journal_changes is not None:
+            self._journal_changes[key] = True
+
+    def __delitem__(self, key: Any) -> None:
+        """Delete a key from the dictionary.
+
+        Args:
+            key: The key to delete.
+
+        Returns:
+            None
+
+        Raises:
+            KeyError: If the key is not in the dictionary.
+
+        """
+        super().__delitem__(key)
+        if self._journal_changes is not None:
+            self._journal_changes[key] = False
+
+    def pop(self, key: Any, *args) -> Any:
+        """Remove a key and return its value.
+
+        Args:
+            key: The key to remove.
+            *args: The default to return if the key is not in the dictionary.
+
+        Returns:
+            The value of the key, or the default.
+
+        Raises:
+            KeyError: If the key is not in the dictionary and there is no default.
+
+        """
+        if key in self and self._journal_changes is not None:
+            self._journal_changes[key] = False
+        return super().pop(key, *args)
+
+    def popitem(self) -> tuple[Any, Any]:
+        """Remove and return the last key and value.
+
+        Returns:
+            A tuple of the key and value.
+
+        Raises:
+            KeyError: If the dictionary is empty.
+
+        """
+        key, value = super().popitem()
+        if self._journal_changes is not None:
+            self._journal_changes[key] = False
+        return key, value
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Get the value of a key, setting it to default if it is not there.
+
+        Args:
+            key: The key to get.
+            default: The value to set if the key is not in the dictionary.
+
+        Returns:
+            The value of the key.
+
+        Raises:
+            None
+
+        """
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self) -> None:
+        """Remove all keys from the dictionary.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        super().clear()
+        if self._journal_changes is not None:
+            self._journal_changes.clear()
+            self._journal_rewrite = True
 
     def update(self, *args, **kwargs) -> None:
         """Update the dictionary with the provided key-value pairs.
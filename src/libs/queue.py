@@ -7,7 +7,8 @@
 """Module for managing a simple queue with optional ID-based lookups.
 
 This module provides the `SimpleQueue` class, which implements a basic queue
-with a fixed length. It supports standard queue operations such as enqueue,
+with a fixed length, backed by a deque so adding and evicting items is O(1). It
+supports standard queue operations such as enqueue,
 dequeue, and size retrieval. Additionally, it offers snapshot functionality
 and ID-based item lookups if an ID key is provided during initialization.
 
@@ -24,7 +25,7 @@ Features:
     - Snapshot functionality to capture and retrieve the state of the queue at a
         point in time.
     - ID-based item lookup for quick access to specific items if an ID key is
-        provided.
+        provided, kept in a dict that is updated as items are added and removed.
     - Methods to get the last X items and to check if the queue is empty.
 
 Usage:
@@ -44,7 +45,9 @@ Classes:
 """
 
 # Standard Library
+from collections import deque
 from collections.abc import Iterator
+from itertools import islice
 from typing import Any
 
 # 3rd Party
@@ -60,6 +63,9 @@ class SimpleQueue:
     it offers snapshot functionality and ID-based item lookups if an ID key is
     provided during initialization.
 
+    If more than one item has the same ID, the most recently added one is
+    returned by get_by_id.
+
     """
 
     def __init__(self, length: int = 10, id_key: str | None = None) -> None:
@@ -79,18 +85,67 @@ class SimpleQueue:
             None
 
         """
-        self.len: int = length
-        self.items: list = []
+        self.items: deque = deque(maxlen=length)
         self.snapshot: SimpleQueue | None = None
         self.id_key: str | None = id_key
         self.id_lookup: dict[str, Any] = {}
         self.last_automatically_removed_item: Any = None
 
+    @property
+    def len(self) -> int:
+        """Return the maximum length of the queue.
+
+        Returns:
+            The maximum number of items in the queue.
+
+        Raises:
+            None
+
+        """
+        return self.items.maxlen  # type: ignore[return-value]
+
+    @len.setter
+    def len(self, length: int) -> None:
+        """Change the maximum length of the queue, keeping the newest items.
+
+        Args:
+            length: The new maximum length.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        for _ in range(len(self.items) - length):
+            self._forget(self.items.popleft())
+        self.items = deque(self.items, maxlen=length)
+
+    def _forget(self, item: Any) -> None:
+        """Remove an item that left the queue from the ID lookup.
+
+        Args:
+            item: The item that was removed.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        if not self.id_key:
+            return
+        # a newer item with the same id keeps its entry
+        item_id = item[self.id_key]
+        if self.id_lookup.get(item_id) is item:
+            del self.id_lookup[item_id]
+
     def isempty(self) -> bool:
         """Check if the queue is empty.
 
-        This method checks whether the queue is empty by comparing the items list
-        to an empty list.
+        This method checks whether the queue has any items.
 
         Args:
             None
@@ -102,9 +157,9 @@ class SimpleQueue:
             None
 
         """
-        return self.items == []
+        return not self.items
 
-    def enqueue(self, item: Any) -> None:
+    def enqueue(self, item: Any) -> Any:
         """Enqueue an item to the queue.
 
         This method adds an item to the end of the queue. If the queue exceeds its
@@ -114,15 +169,24 @@ class SimpleQueue:
             item: The item to be added to the queue.
 
         Returns:
-            None
+            The item that was removed to make room, or None.
 
         Raises:
             None
 
         """
+        if not self.items.maxlen:
+            self.last_automatically_removed_item = item
+            return item
+        removed = None
+        if len(self.items) == self.items.maxlen:
+            removed = self.items[0]
+            self.last_automatically_removed_item = removed
+            self._forget(removed)
         self.items.append(item)
-        while len(self.items) > self.len:
-            self.last_automatically_removed_item = self.items.pop(0)
+        if self.id_key:
+            self.id_lookup[item[self.id_key]] = item
+        return removed
 
     def dequeue(self) -> Any:
         """Dequeue an item from the queue.
@@ -140,7 +204,9 @@ class SimpleQueue:
             IndexError: If the queue is empty.
 
         """
-        return self.items.pop(0)
+        item = self.items.popleft()
+        self._forget(item)
+        return item
 
     def size(self) -> int:
         """Retrieve the current size of the queue.
@@ -177,7 +243,8 @@ class SimpleQueue:
 
         """
         self.snapshot = SimpleQueue(self.len, id_key=self.id_key)
-        self.snapshot.items = self.items[:]
+        self.snapshot.items = self.items.copy()
+        self.snapshot.id_lookup = self.id_lookup.copy()
 
     def getsnapshot(self) -> "SimpleQueue | None":
         """Retrieve the snapshot of the queue.
@@ -213,13 +280,13 @@ class SimpleQueue:
             None
 
         """
-        return self.items[:]
+        return list(self.items)
 
     def get_last_x(self, count: int) -> list:
         """Get the last X items from the queue.
 
         This method returns the last X items from the queue, where X is specified
-        by the count parameter.
+        by the count parameter. A count of 0 returns all items.
 
         Args:
             count: The number of items to retrieve from the end of the queue.
@@ -234,14 +301,18 @@ class SimpleQueue:
         if count < 0:
             msg = "Count must be non-negative"
             raise ValueError(msg)
-        return self.items[-count:]
+        if count == 0 or count >= len(self.items):
+            return list(self.items)
+        items = list(islice(reversed(self.items), count))
+        items.reverse()
+        return items
 
     def get_by_id(self, item_id: str) -> Any:
         """Retrieve an item by its ID.
 
-        This method searches for and returns an item from the queue based on its ID.
-        The ID is determined by the id_key provided during initialization. If no
-        item with the specified ID is found, it returns None.
+        This method returns an item from the queue based on its ID. The ID is
+        determined by the id_key provided during initialization. If no item with
+        the specified ID is found, it returns None.
 
         Args:
             item_id: The ID of the item to retrieve.
@@ -253,12 +324,7 @@ class SimpleQueue:
             None
 
         """
-        if self.id_key:
-            for item in self.items:
-                if item[self.id_key] == item_id:
-                    return item
-
-        return None
+        return self.id_lookup.get(item_id)
 
     def __len__(self) -> int:
         """Retrieve the number of items in the queue.
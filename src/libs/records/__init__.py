@@ -17,6 +17,11 @@ The public record types ones are:
 
 The public manager is RMANAGER, which manages records or all types
 
+STACKTRACER decides which records capture the call stack they were created in
+
+LOGLEVELS decides which LogRecords are built, from the level each source is
+logged at
+
 There are also some private classes that are used to manage records
     BaseRecord - the base class for all records
     ChangeRecord - a record that holds a change to a record
@@ -24,7 +29,9 @@ There are also some private classes that are used to manage records
 """
 
 __all__ = [
+    "LOGLEVELS",
     "RMANAGER",
+    "STACKTRACER",
     "BaseDictRecord",
     "BaseRecord",
     "LogRecord",
@@ -36,7 +43,9 @@ __all__ = [
     "SendDataDirectlyToMud",
 ]
 
+from libs.records.managers.loglevels import LOGLEVELS
 from libs.records.managers.records import RMANAGER
+from libs.records.managers.stacks import STACKTRACER
 from libs.records.rtypes.base import (  # import to resolve circular import
     BaseDictRecord,
     BaseRecord,
@@ -0,0 +1,93 @@
+# Project: bastproxy
+# Filename: libs/records/managers/loglevels.py
+#
+# File Description: a table of the lowest level each log source is logged at
+#
+# By: Bast
+"""This module holds a table of the lowest level each log source is logged at.
+
+A LogRecord checks the table before it is built, so a record that no handler
+would log costs a dictionary lookup instead of a full record. The lowest
+level for a source is the lowest of its console, file and client levels.
+
+The log plugin sets a resolver that computes the level for a source the first
+time it is seen, and clears the table when the levels change. Until a
+resolver is set, every record is built and logged.
+"""
+
+# Standard Library
+import logging
+from collections.abc import Callable
+
+# 3rd Party
+# Project
+
+# the level number for each level name a LogRecord is created with
+LEVEL_NUMBERS: dict[str, int] = {
+    name.lower(): number for name, number in logging.getLevelNamesMapping().items()
+}
+
+
+class LogLevels:
+    """The lowest level each log source is logged at."""
+
+    def __init__(self):
+        """Initialize the table without a resolver."""
+        # source: (lowest level, the counts of each level for the log type)
+        self.levels: dict[str, tuple[int, dict[str, int]]] = {}
+        self.resolver: Callable[[str], tuple[int, dict[str, int]]] | None = None
+
+    def set_resolver(
+        self, resolver: Callable[[str], tuple[int, dict[str, int]]] | None
+    ) -> None:
+        """Set the function that computes the level for a source.
+
+        Args:
+            resolver: A function that returns the lowest level a source is
+                logged at and the dictionary its records are counted in, or
+                None to log everything.
+
+        """
+        self.resolver = resolver
+        self.levels.clear()
+
+    def clear(self) -> None:
+        """Clear the table, the levels are computed again when next needed."""
+        self.levels.clear()
+
+    def is_enabled(self, level: str, sources: list | None) -> bool:
+        """Check if a record at a level from sources would be logged.
+
+        A record that is not logged is still counted for each of its sources,
+        the same as one that is.
+
+        Args:
+            level: The name of the level, such as "debug".
+            sources: The sources of the record.
+
+        Returns:
+            True if any handler would log the record, False otherwise.
+
+        """
+        if self.resolver is None or not sources:
+            return True
+        level_number = LEVEL_NUMBERS.get(level, logging.CRITICAL)
+        levels = self.levels
+        entries = []
+        for source in sources:
+            if not source:
+                continue
+            if (entry := levels.get(source)) is None:
+                # log everything from the source while it is being resolved,
+                # in case the resolver logs
+                levels[source] = (logging.NOTSET, {})
+                entry = levels[source] = self.resolver(source)
+            if level_number >= entry[0]:
+                return True
+            entries.append(entry)
+        for _, counts in entries:
+            counts[level] = counts.get(level, 0) + 1
+        return False
+
+
+LOGLEVELS = LogLevels()
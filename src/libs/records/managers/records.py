@@ -79,7 +79,10 @@ class RecordManager:
         return self.active_record_stack.peek()
 
     def get_children(self, record, record_filter=None):
-        """Get all direct children of a record.
+        """Get all direct children of a record that are in the manager.
+
+        Records keep their children when they are added as a parent, so this
+        only looks at the children of the record.
 
         Args:
             record: The parent record to find children for.
@@ -93,14 +96,12 @@ class RecordManager:
             record_filter = []
         rfilter = self.default_filter[:]
         rfilter.extend(record_filter)
-        return list(
-            {
-                rec
-                for rec in self.record_instances.values()
-                for parent in rec.parents
-                if parent.uuid == record.uuid and rec.__class__.__name__ not in rfilter
-            }
-        )
+        return [
+            child
+            for child in record.children.values()
+            if child.__class__.__name__ not in rfilter
+            and self.record_instances.get(child.uuid) is child
+        ]
 
     def get_all_children_dict(self, record, record_filter=None):
         """Get all children recursively as a nested dictionary.
@@ -217,12 +218,14 @@ class RecordManager:
                 f"Record UUID collision {record.uuid} already exists in the record manager",
                 level="error",
             )()
-        self.records[queuename].enqueue(record)
         self.record_instances[record.uuid] = record
 
-        if last_record := self.records[queuename].last_automatically_removed_item:
+        removed_record = self.records[queuename].enqueue(record)
+        if removed_record is not None:
             with contextlib.suppress(KeyError):
-                del self.record_instances[last_record.uuid]
+                del self.record_instances[removed_record.uuid]
+            for parent in removed_record.parents:
+                parent.children.pop(id(removed_record), None)
 
     def get_types(self):
         """Get all record types and their counts.
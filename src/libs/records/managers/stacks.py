@@ -0,0 +1,152 @@
+# Project: bastproxy
+# Filename: libs/records/managers/stacks.py
+#
+# File Description: a manager that captures call stacks for records
+#
+# By: Bast
+"""This module holds a manager that captures call stacks for records.
+
+Formatting a call stack for every record and update is expensive, so the
+manager has a tracing mode that decides what is captured.
+
+    off - no stacks are captured
+    sampled - one in every sample_rate records captures its stack, along with
+        the stacks of all updates to that record
+    full - every record and update captures a formatted stack, and lines
+        read from the mud are fully tracked records instead of lightweight lines
+
+In sampled mode only the file, line number and function of each frame are
+captured, the stack is formatted the first time it is shown.
+"""
+
+# Standard Library
+import linecache
+import sys
+import traceback
+from types import FrameType
+
+# 3rd Party
+# Project
+
+TRACING_MODES = ("off", "sampled", "full")
+
+
+class CapturedStack:
+    """A call stack that is formatted the first time it is needed."""
+
+    __slots__ = ("_lines", "locations")
+
+    def __init__(
+        self,
+        locations: tuple[tuple[str, int, str], ...] = (),
+        lines: list[str] | None = None,
+    ):
+        """Initialize the captured stack.
+
+        Args:
+            locations: The (filename, line number, function name) of each
+                frame, from the outermost to the innermost frame.
+            lines: The already formatted lines of the stack.
+
+        """
+        self.locations = locations
+        self._lines = lines
+
+    def format(self) -> list[str]:
+        """Get the stack as lines, in the same form as traceback.format_stack.
+
+        Returns:
+            A list of lines, two for each frame that has source.
+
+        """
+        if self._lines is None:
+            lines = []
+            for filename, lineno, name in self.locations:
+                lines.append(f'  File "{filename}", line {lineno}, in {name}')
+                if source := linecache.getline(filename, lineno).strip():
+                    lines.append(f"    {source}")
+            self._lines = lines
+        return self._lines
+
+
+class StackTracer:
+    """Capture call stacks for records based on the tracing mode."""
+
+    def __init__(self):
+        """Initialize the tracer in sampled mode."""
+        self.mode: str = "sampled"
+        self.sample_rate: int = 100
+        self._count: int = 0
+
+    def set_mode(self, mode: str, sample_rate: int | None = None) -> None:
+        """Set the tracing mode.
+
+        Args:
+            mode: One of TRACING_MODES.
+            sample_rate: Capture one in this many records in sampled mode.
+
+        Raises:
+            ValueError: If the mode or sample rate is not valid.
+
+        """
+        if mode not in TRACING_MODES:
+            msg = (
+                f"tracing mode must be one of {', '.join(TRACING_MODES)}, not {mode!r}"
+            )
+            raise ValueError(msg)
+        if sample_rate is not None:
+            if sample_rate < 1:
+                msg = f"sample rate must be at least 1, not {sample_rate}"
+                raise ValueError(msg)
+            self.sample_rate = sample_rate
+        self.mode = mode
+        self._count = 0
+
+    def sample(self) -> bool:
+        """Check if the next record should capture its stack.
+
+        Returns:
+            True if the stack should be captured, False otherwise.
+
+        """
+        if self.mode == "full":
+            return True
+        if self.mode == "off":
+            return False
+        self._count += 1
+        if self._count >= self.sample_rate:
+            self._count = 0
+            return True
+        return False
+
+    def capture(self, limit: int, skip: int = 0) -> CapturedStack:
+        """Capture the stack of the caller.
+
+        Args:
+            limit: The number of frames to capture.
+            skip: The number of frames above the caller to leave out.
+
+        Returns:
+            The captured stack, formatted right away in full mode.
+
+        """
+        frame: FrameType | None = sys._getframe(skip + 1)
+        if self.mode == "full":
+            lines = [
+                line
+                for entry in traceback.format_stack(frame, limit=limit)
+                for line in entry.splitlines()
+                if line
+            ]
+            return CapturedStack(lines=lines)
+
+        locations: list[tuple[str, int, str]] = []
+        while frame is not None and len(locations) < limit:
+            code = frame.f_code
+            locations.append((code.co_filename, frame.f_lineno, code.co_name))
+            frame = frame.f_back
+        locations.reverse()
+        return CapturedStack(tuple(locations))
+
+
+STACKTRACER = StackTracer()
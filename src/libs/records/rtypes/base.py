@@ -9,7 +9,6 @@
 # Standard Library
 import datetime
 import pprint
-import traceback
 from collections import UserDict, UserList
 from typing import TYPE_CHECKING
 from uuid import uuid4
@@ -18,6 +17,7 @@ from uuid import uuid4
 # Project
 from libs.api import API
 from libs.records.managers.records import RMANAGER
+from libs.records.managers.stacks import STACKTRACER
 from libs.records.managers.updates import UpdateManager
 from libs.records.rtypes.update import UpdateRecord
 from libs.tracking.utils.attributes import AttributeMonitor
@@ -51,8 +51,11 @@ class BaseRecord(AttributeMonitor):
         self.execute_time_taken = -1
         self.track_record = track_record
         self.column_width = 15
-        stack = traceback.format_stack(limit=10)
-        self.stack_at_creation = self.fix_stack(stack)
+        # updates to this record capture their stacks if this record does
+        self.stack_traced = STACKTRACER.sample()
+        self._stack_at_creation = (
+            STACKTRACER.capture(limit=10) if self.stack_traced else None
+        )
         if self.api("libs.api:has")("plugins.core.events:get.event.stack"):
             self.event_stack = self.api("plugins.core.events:get.event.stack")()
         else:
@@ -62,6 +65,9 @@ class BaseRecord(AttributeMonitor):
             parent = RMANAGER.get_latest_record()
         self.parent = parent
         self.parents = []
+        # the records that have this record as a parent, keyed by id since
+        # a lightweight line does not have a uuid until it is needed
+        self.children: dict[int, BaseRecord] = {}
         if parent:
             self.add_parent(parent)
 
@@ -71,9 +77,16 @@ class BaseRecord(AttributeMonitor):
     def add_parent(self, parent, reset=False):
         """Add a parent to this record."""
         if reset:
-            self.parents = []
+            self.remove_parents()
         if parent not in self.parents:
             self.parents.append(parent)
+            parent.children[id(self)] = self
+
+    def remove_parents(self):
+        """Remove this record from its parents."""
+        for parent in self.parents:
+            parent.children.pop(id(self), None)
+        self.parents = []
 
     def __hash__(self):
         """Return hash based on class name and UUID.
@@ -172,17 +185,17 @@ class BaseRecord(AttributeMonitor):
         if record := self.updates.get_update(uuid):
             return record
 
-        for child_record in RMANAGER.get_all_children_list(self.uuid):
-            if child_record.updates.get_update(uuid):
+        for child_record in RMANAGER.get_all_children_list(self):
+            if record := child_record.updates.get_update(uuid):
                 return record
         return None
 
-    def fix_stack(self, stack):
-        """Turn the stack into a list of lines."""
-        new_stack = []
-        for line in stack:
-            new_stack.extend([nline for nline in line.splitlines() if nline])
-        return new_stack
+    @property
+    def stack_at_creation(self):
+        """The call stack when this record was created, formatted on first use."""
+        if self._stack_at_creation is None:
+            return [f"Not captured, record tracing mode is {STACKTRACER.mode}"]
+        return self._stack_at_creation.format()
 
     def get_attributes_to_format(self):
         """Attributes to format in the details.
@@ -236,14 +236,16 @@ class SendDataDirectlyToClient(BaseRecord):
             # This way view clients don't see the output of commands entered by other clients
             if (
                 client_uuid not in self.clients
-                and self.api("plugins.core.clients:client.is.view.client")(client_uuid)
+                and self.api.bind("plugins.core.clients:client.is.view.client")(
+                    client_uuid
+                )
                 and line.internal
             ):
                 return False
             # If the client is in the list of clients or self.clients is empty,
             # then we can check to make sure the client is logged in or the prelogin flag is set
             if (not self.clients or client_uuid in self.clients) and (
-                self.api("plugins.core.clients:client.is.logged.in")(client_uuid)
+                self.api.bind("plugins.core.clients:client.is.logged.in")(client_uuid)
                 or line.prelogin
             ):
                 # All checks passed, we can send to this client
@@ -258,12 +260,12 @@ class SendDataDirectlyToClient(BaseRecord):
                 line.format()
                 line.lock()
 
-                clients = self.clients or self.api(
+                clients = self.clients or self.api.bind(
                     "plugins.core.clients:get.all.clients"
                 )(uuid_only=True)
                 for client_uuid in clients:
                     if self.can_send_to_client(client_uuid, line):
-                        self.api("plugins.core.clients:send.to.client")(
+                        self.api.bind("plugins.core.clients:send.to.client")(
                             client_uuid, line
                         )
                     else:
@@ -4,28 +4,74 @@
 # File Description: Holds the log record type
 #
 # By: Bast
-"""Holds the log record type."""
+"""Holds the log record type.
+
+A LogRecord is only built if a handler would log it, see LOGLEVELS. The
+message can be formatted with %-style args or be a callable, so the message of
+a record that is not built is never formatted either.
+"""
 
 # Standard Library
 import logging
+from collections.abc import Callable
+from types import MappingProxyType
 
 # 3rd Party
 # Project
+from libs.records.managers.loglevels import LOGLEVELS
 from libs.records.rtypes.base import BaseListRecord
 
 
+class DisabledLogRecord:
+    """Stands in for a LogRecord that no handler would log."""
+
+    __slots__ = ()
+
+    wasemitted = MappingProxyType({"console": False, "file": False, "client": False})
+
+    def __call__(self, *args, **kwargs):
+        """Do nothing, the record is not logged."""
+
+
+DISABLED_LOG_RECORD = DisabledLogRecord()
+
+
 class LogRecord(BaseListRecord):
     """a simple message record for logging, this may end up sent to a client."""
 
+    def __new__(
+        cls,
+        _message: list[str] | str | Callable | None = None,
+        level: str = "info",
+        sources: list | None = None,
+        **_kwargs,
+    ):
+        """Return a disabled record if no handler would log the record."""
+        if LOGLEVELS.is_enabled(level, sources):
+            return super().__new__(cls)
+        return DISABLED_LOG_RECORD
+
     def __init__(
         self,
-        message: list[str] | str,
+        message: list[str] | str | Callable,
         level: str = "info",
         sources: list | None = None,
+        args: tuple | None = None,
         **kwargs,
     ):
-        """Initialize the class."""
-        super().__init__(message, internal=True, track_record=False)
+        """Initialize the class.
+
+        message: the message, a callable that returns the message, or a
+            format string for args
+        args: the %-style args for the message, only for a str message.
+        """
+        text: list[str] | str = message() if callable(message) else message
+        if args is not None:
+            if not isinstance(text, str):
+                msg = "args can only be used with a str message"
+                raise TypeError(msg)
+            text = text % args
+        super().__init__(text, internal=True, track_record=False)
         # The type of message
         self.level: str = level
         # The sources of the message for logging purposes, a list
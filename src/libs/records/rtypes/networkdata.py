@@ -4,14 +4,32 @@
 # File Description: Holds the records for network data
 #
 # By: Bast
-"""Holds the data line record."""
+"""Holds the data line record.
+
+Lines read from the mud can be created as lightweight lines. A lightweight line
+has the same attributes and methods as any other line, but it does not create
+its own API, does not capture stacks, is not added to the record manager and
+does not keep updates. The uuid and owner id are created the first time they
+are used. A lightweight line is promoted to a fully tracked record when
+the record tracing mode is full, or when its updates are asked for.
+"""
 
 # Standard Library
+import datetime as dt
+from uuid import uuid4
 
 # 3rd Party
 # Project
+from libs.api import API
+from libs.records.managers.records import RMANAGER
+from libs.records.managers.stacks import STACKTRACER
+from libs.records.managers.updates import UpdateManager
 from libs.records.rtypes.base import BaseRecord, TrackedUserList
 from libs.records.rtypes.log import LogRecord
+from libs.tracking.utils.attributes import AttributeMonitor
+
+# the api used by lightweight lines until they are promoted
+LIGHTWEIGHT_API = API(owner_id=__name__)
 
 
 class NetworkDataLine(BaseRecord):
@@ -20,6 +38,28 @@ class NetworkDataLine(BaseRecord):
     or the mud.
     """
 
+    # set to True for lines that are not tracked
+    lightweight: bool = False
+    _uuid: str | None = None
+    _owner_id: str | None = None
+    _updates: UpdateManager | None = None
+    # the attributes of a line, they are set together in __init__
+    line_type: str
+    originated: str
+    _noansi: str | bytes | bytearray | None
+    _colorcoded: str | bytes | bytearray | None
+    line: str | bytes | bytearray
+    original_line: str | bytes | bytearray
+    send: bool
+    line_modified: bool
+    is_prompt: bool
+    had_line_endings: bool
+    was_sent: bool
+    color: str
+    split_from: "NetworkDataLine | None"
+    preamble: bool
+    prelogin: bool
+
     def __init__(
         self,
         line: str | bytes | bytearray,
@@ -29,6 +69,7 @@ class NetworkDataLine(BaseRecord):
         preamble: bool = True,
         prelogin: bool = False,
         color: str = "",
+        lightweight: bool = False,
     ):
         """Initialize a network data line.
 
@@ -40,9 +81,14 @@ class NetworkDataLine(BaseRecord):
             preamble: Whether to include preamble (default: True).
             prelogin: Whether this is a prelogin line (default: False).
             color: Color code for the line (default: "").
+            lightweight: Create a lightweight line unless the record tracing
+                mode is full (default: False).
 
         """
-        BaseRecord.__init__(self, f"{self.__class__.__name__}:{line!r}")
+        if lightweight and STACKTRACER.mode != "full":
+            self._init_lightweight()
+        else:
+            BaseRecord.__init__(self, f"{self.__class__.__name__}:{line!r}")
         self._attributes_to_monitor.append("line")
         self._attributes_to_monitor.append("send")
         self._attributes_to_monitor.append("is_prompt")
@@ -64,65 +110,162 @@ class NetworkDataLine(BaseRecord):
                 stack_info=True,
                 sources=[__name__],
             )()
-        self.line_type = line_type  # IO, COMMAND-TELNET
-        self.originated = originated  # mud, client, internal
-        if (isinstance(line, (bytes, bytearray))) and not self.is_command_telnet:
+        if (isinstance(line, (bytes, bytearray))) and line_type != "COMMAND-TELNET":
             line = line.decode("utf-8")
-        self.line: str | bytes | bytearray = line
-        self.original_line: str | bytes | bytearray = line
+        # the attributes are set together since setting them one at a time
+        # through the attribute monitor is slow for every line from the mud
+        self._am_set_initial_values(
+            line_type=line_type,  # IO, COMMAND-TELNET
+            originated=originated,  # mud, client, internal
+            # the color conversions of the line, cleared when the line changes
+            _noansi=None,
+            _colorcoded=None,
+            line=line,
+            original_line=line,
+            send=True,
+            line_modified=False,
+            is_prompt=False,
+            had_line_endings=had_line_endings,
+            was_sent=False,
+            color=color,
+            split_from=None,
+            # preamble defaults to True because a large percentage
+            # of the data that is internal will need it
+            # it is not used if the data is not internal
+            preamble=preamble,
+            # prelogin defaults to False because a large percentage
+            # of the data that is internal will not need it
+            # because not much data is sent to a client before login
+            prelogin=prelogin,
+        )
         self._am_lock_attribute("original_line")
-        self.send: bool = True
-        self.line_modified: bool = False
-        self.is_prompt: bool = False
-        self.had_line_endings: bool = had_line_endings
-        self.was_sent: bool = False
-        self.color = color
-        self.split_from = None
-
-        # preamble defaults to True because a large percentage
-        # of the data that is internal will need it
-        # it is not used if the data is not internal
-        self.preamble = preamble
-
-        # prelogin defaults to False because a large percentage
-        # of the data that is internal will not need it
-        # because not much data is sent to a client before login
-        self.prelogin = prelogin
 
         self.addupdate("Modify", "original input", extra={"data": f"{line!r}"})
 
+    def _init_lightweight(self):
+        """Set the record attributes of a lightweight line."""
+        AttributeMonitor.__init__(self)
+        self._attributes_to_monitor.append("parents")
+        self._am_set_initial_values(
+            lightweight=True,
+            api=LIGHTWEIGHT_API,
+            created=dt.datetime.now(dt.UTC),
+            execute_time_taken=-1,
+            track_record=False,
+            column_width=15,
+            stack_traced=False,
+            _stack_at_creation=None,
+            event_stack=["Not captured, the line was created lightweight"],
+            parent=None,
+            parents=[],
+            children={},
+            executing=False,
+        )
+
+    @property
+    def uuid(self):
+        """The uuid of the line, a lightweight line creates it on first use."""
+        if self._uuid is None and self.lightweight:
+            self._uuid = uuid4().hex
+        return self._uuid
+
+    @uuid.setter
+    def uuid(self, value):
+        self._uuid = value
+
+    @property
+    def owner_id(self):
+        """The owner id of the line, a lightweight line creates it on first use."""
+        if self._owner_id is None and self.lightweight:
+            self._owner_id = f"{self.__class__.__name__}:{self.original_line!r}"
+        return self._owner_id
+
+    @owner_id.setter
+    def owner_id(self, value):
+        self._owner_id = value
+
+    @property
+    def updates(self):
+        """The updates to the line, asking for them promotes a lightweight line."""
+        if self.lightweight:
+            self.promote()
+        return self._updates
+
+    @updates.setter
+    def updates(self, value):
+        self._updates = value
+
+    def promote(self):
+        """Promote a lightweight line to a tracked record.
+
+        The line gets its own API, is added to the record manager and starts
+        keeping updates, beginning with its original input. Changes made
+        before the promotion are not in the updates.
+        """
+        if not self.lightweight:
+            return
+        # create the uuid and owner id while the line is still lightweight
+        self._uuid = self.uuid
+        self._owner_id = self.owner_id
+        self.lightweight = False
+        self.updates = UpdateManager()
+        self.api = API(owner_id=self.owner_id)
+        RMANAGER.add(self)
+        self.addupdate(
+            "Modify", "original input", extra={"data": f"{self.original_line!r}"}
+        )
+
+    def addupdate(self, flag: str, action: str, extra: dict | None = None):
+        """Add a change event for this line, lightweight lines do not keep them."""
+        if self.lightweight:
+            return
+        super().addupdate(flag, action, extra=extra)
+
     def add_parent(self, parent, reset=True):
         """Add a parent to this record."""
         if reset:
-            self.parents = []
+            self.remove_parents()
         if parent in self.parents:
             return
         if parent.__class__.__name__ in ["NetworkData", "NetworkDataLine"]:
             self.parents.append(parent)
+            parent.children[id(self)] = self
 
     @property
     def noansi(self):
         """Get the line with ANSI codes stripped.
 
+        The result is cached until the line changes.
+
         Returns:
             The line without ANSI escape sequences.
 
         """
         if self.is_command_telnet:
             return self.line
-        return self.api("plugins.core.colors:ansicode.strip")(self.line)
+        if self._noansi is None:
+            self._noansi = self.api.bind("plugins.core.colors:ansicode.strip")(
+                self.line
+            )
+        return self._noansi
 
     @property
     def colorcoded(self):
         """Get the line with ANSI codes converted to color codes.
 
+        The result is cached until the line changes.
+
         Returns:
             The line with color codes.
 
         """
         if self.is_command_telnet:
             return self.line
-        return self.api("plugins.core.colors:ansicode.to.colorcode")(self.line)
+        if self._colorcoded is None:
+            self._colorcoded = self.api.bind(
+                "plugins.core.colors:ansicode.to.colorcode"
+            )(self.line)
+        return self._colorcoded
 
     def lock(self):
         """Lock all attributes to prevent further modification."""
@@ -145,12 +288,14 @@ class NetworkDataLine(BaseRecord):
         """
         if self.is_command_telnet:
             return self.line
-        return self.api("plugins.core.colors:colorcode.escape")(self.line)
+        return self.api.bind("plugins.core.colors:colorcode.escape")(self.line)
 
     def _am_onchange_line(self, orig_value, new_value):
-        """Set the line_modified flag if the line changes."""
+        """Set the line_modified flag and clear cached conversions if the line changes."""
         if orig_value != new_value:
             self.line_modified = True
+            self._noansi = None
+            self._colorcoded = None
 
     @property
     def is_command_telnet(self):
@@ -208,7 +353,9 @@ class NetworkDataLine(BaseRecord):
         if not self.is_io:
             return
 
-        if not self.api("libs.api:has")("plugins.core.colors:colorcode.to.ansicode"):
+        if not self.api.bind("libs.api:has")(
+            "plugins.core.colors:colorcode.to.ansicode"
+        ):
             return
 
         if self.color and isinstance(self.line, str):
@@ -223,7 +370,9 @@ class NetworkDataLine(BaseRecord):
                 self.line = f"@w{self.color}".join(new_line_list)
             if self.line:
                 self.line = f"{self.color}{self.line}@w"
-        self.line = self.api("plugins.core.colors:colorcode.to.ansicode")(self.line)
+        self.line = self.api.bind("plugins.core.colors:colorcode.to.ansicode")(
+            self.line
+        )
 
     def fix_double_command_seperator(self):
         """Fix double command seperators.
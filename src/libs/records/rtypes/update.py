@@ -10,12 +10,12 @@
 import contextlib
 import datetime
 import pprint
-import traceback
 from uuid import uuid4
 
 # 3rd Party
 # Project
 from libs.api import API
+from libs.records.managers.stacks import STACKTRACER
 
 
 class UpdateRecord:
@@ -27,7 +27,8 @@ class UpdateRecord:
     extra: any extra info about this update
     data: the new data.
 
-    will automatically add the time and last 5 stack frames
+    will automatically add the time and, depending on the record tracing
+    mode, the last 15 stack frames
     """
 
     def __init__(
@@ -53,9 +54,11 @@ class UpdateRecord:
         if extra:
             self.extra |= extra
         self.data = data
-        # Extract the last 15 stack frames
-        self.stack = self.fix_stack(traceback.format_stack(limit=15))
-        self.actor = self.find_relevant_actor(self.stack)
+        # Capture the last 15 stack frames, leaving out this method
+        self._stack = None
+        self._actor = None
+        if STACKTRACER.mode == "full" or getattr(parent, "stack_traced", False):
+            self._stack = STACKTRACER.capture(limit=15, skip=1)
         self.event_stack = []
         with contextlib.suppress(Exception):
             if self.api("libs.api:has")("plugins.core.events:get.event.stack"):
@@ -94,21 +97,27 @@ class UpdateRecord:
         """
         return self.time_taken < other.time_taken
 
-    def fix_stack(self, stack):
-        """Clean up and format the stack trace.
+    @property
+    def stack(self):
+        """The call stack when this update was created, formatted on first use.
 
-        Args:
-            stack: The raw stack trace lines.
+        Returns:
+            A list of stack lines, empty if the stack was not captured.
+
+        """
+        return self._stack.format() if self._stack else []
+
+    @property
+    def actor(self):
+        """The most relevant actor from the stack, found on first use.
 
         Returns:
-            A cleaned list of stack lines.
+            The relevant stack lines for the actor or empty string.
 
         """
-        new_stack = []
-        # don't need the last 2 lines
-        for line in stack:
-            new_stack.extend(line.splitlines() if line else [])
-        return new_stack[:-2]
+        if self._actor is None:
+            self._actor = self.find_relevant_actor(self.stack)
+        return self._actor
 
     def find_relevant_actor(self, stack):
         """Find the most relevant actor from the stack trace.
@@ -172,10 +172,10 @@ class Timing:
                 "args": args,
             }
             LogRecord(
-                f"starttimer - {uid} {timername:<20} : started - from {owner_id} "
-                f"with args {args}",
+                "starttimer - %s %-20s : started - from %s with args %s",
                 level="debug",
                 sources=[__name__, owner_id],
+                args=(uid, timername, owner_id, args),
             )()
             return uid
         return None
@@ -206,17 +206,17 @@ class Timing:
                 time_taken = (timerfinish - self.timing[uid]["start"]) * 1000.0
                 if args := self.timing[uid]["args"]:
                     LogRecord(
-                        f"finishtimer - {uid} {timername:<20} : finished in "
-                        f"{time_taken} ms - with args {args}",
+                        "finishtimer - %s %-20s : finished in %s ms - with args %s",
                         level="debug",
                         sources=[__name__, self.timing[uid]["owner_id"]],
+                        args=(uid, timername, time_taken, args),
                     )()
                 else:
                     LogRecord(
-                        f"finishtimer - {uid} {timername:<20} : finished in "
-                        f"{time_taken} ms",
+                        "finishtimer - %s %-20s : finished in %s ms",
                         level="debug",
                         sources=[__name__, self.timing[uid]["owner_id"]],
+                        args=(uid, timername, time_taken),
                     )()
                 del self.timing[uid]
                 return time_taken
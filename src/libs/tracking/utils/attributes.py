@@ -73,6 +73,21 @@ class AttributeMonitor:
             if change_func:
                 change_func(original_value, new_value)
 
+    def _am_set_initial_values(self, **values):
+        """Set the first value of several attributes at once.
+
+        The attributes must not be set yet, so no change functions are called.
+        The original values of monitored attributes are stored.
+
+        Args:
+            **values: The attribute names and their values.
+
+        """
+        self.__dict__.update(values)
+        for name in self._attributes_to_monitor:
+            if name in values:
+                self._am_original_values[name] = values[name]
+
     def _am_get_original_value(self, name):
         return self._am_original_values.get(name, None)
 
@@ -0,0 +1,242 @@
+# Project: bastproxy
+# Filename: plugins/core/colors/libs/_transcoder.py
+#
+# File Description: single pass conversion between @ color codes and ansi
+#
+# By: Bast
+"""Module for converting between @ color codes and ANSI color sequences.
+
+This module provides functions that convert a string from @ color codes to
+ANSI SGR sequences and back in a single scan of the string. The color codes
+are looked up in tables built once from `CONVERTCOLORS` and `CONVERTANSI`, and
+the results for recent strings are kept in an LRU cache since prompts, headers
+and other repeated lines are converted over and over.
+
+Key Components:
+    - colorcode_to_ansicode: Convert @ color codes to ANSI sequences.
+    - colorcode_strip: Remove @ color codes and ANSI sequences.
+    - ansicode_to_colorcode: Convert ANSI sequences to @ color codes.
+    - ansicode_strip: Remove ANSI sequences.
+    - cache_info: Get the cache statistics for each conversion.
+
+Features:
+    - One tokenizer pass per string instead of a chain of substitutions.
+    - Strings without an @ or an escape character are returned right away.
+    - The @@ and @- escapes are kept, xterm numbers over 255 and unknown @
+        codes are dropped.
+
+Usage:
+    - Call the conversion functions with the string to convert.
+
+"""
+
+# Standard Library
+import functools
+import re
+
+# 3rd Party
+# Project
+from libs.records import LogRecord
+from plugins.core.colors.libs._colors import CONVERTANSI, CONVERTCOLORS
+
+# the number of converted strings to keep for each conversion
+CACHE_SIZE = 4096
+
+ESCAPE = chr(27)
+ANSI_RESET = f"{ESCAPE}[0m"
+
+# an @ and the code after it, xterm codes keep up to three digits
+COLORCODE_TOKEN_RE = re.compile(r"@(?:[xz]\d{1,3}|.)?", re.DOTALL)
+
+ANSI_COLOR_REGEX = re.compile(
+    ESCAPE + r"\[(?P<arg_1>\d+)(;(?P<arg_2>\d+)" r"(;(?P<arg_3>\d+))?)?m"
+)
+
+# key: the @ color code letter, value: the ansi sequence for it
+COLORCODE_TO_ANSI = {
+    f"@{code}": f"{ESCAPE}[{ansi}m"
+    for code, ansi in CONVERTCOLORS.items()
+    if code in "cmyrgbwCMYRGBWD"
+}
+
+# key: an xterm color number as written, value: True if it is a valid color
+XTERM_NUMBER_VALID = {
+    number: int(number) < 256
+    for length in (1, 2, 3)
+    for number in (f"{value:0{length}d}" for value in range(10**length))
+}
+
+# key: a full ansi sequence, value: the @ color code for it
+# filled in as sequences are seen, since the arguments can have leading zeros
+ANSI_TO_COLORCODE: dict[str, str] = {}
+
+
+def _parse_colorcodes(text: str) -> tuple[str, list[tuple[str, str]]]:
+    """Split a string into leading text and colored pieces.
+
+    Args:
+        text: The string with @ color codes.
+
+    Returns:
+        A tuple of the text before the first color and a list of
+        (ansi sequence, text) for each color that has text after it.
+
+    """
+    leading: list[str] = []
+    pieces: list[tuple[str, str]] = []
+    current = leading
+    current_color = ""
+    position = 0
+    for match in COLORCODE_TOKEN_RE.finditer(text):
+        start = match.start()
+        if start > position:
+            current.append(text[position:start])
+        position = match.end()
+        token = match.group()
+        if len(token) == 2:
+            if token == "@@":
+                current.append("@")
+                continue
+            if token == "@-":
+                current.append("~")
+                continue
+            if token not in COLORCODE_TO_ANSI:
+                # an unknown code or an xterm code without a number
+                continue
+            color = COLORCODE_TO_ANSI[token]
+        elif len(token) == 1:
+            # an @ at the end of the string
+            current.append(token)
+            continue
+        else:
+            number = token[2:]
+            if not XTERM_NUMBER_VALID[number]:
+                continue
+            kind = "38" if token[1] == "x" else "48"
+            color = f"{ESCAPE}[{kind};5;{number}m"
+
+        if current_color and current:
+            pieces.append((current_color, "".join(current)))
+        current_color = color
+        current = []
+    if position < len(text):
+        current.append(text[position:])
+    if current_color and current:
+        pieces.append((current_color, "".join(current)))
+    return "".join(leading), pieces
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def colorcode_to_ansicode(text: str) -> str:
+    """Convert @ color codes in a string to ANSI sequences.
+
+    A reset is added to the end of the string if it has any colored text.
+
+    Args:
+        text: The string with @ color codes.
+
+    Returns:
+        The string with ANSI sequences.
+
+    """
+    if "@" not in text:
+        return text
+    leading, pieces = _parse_colorcodes(text)
+    if not pieces:
+        return leading
+    return "".join([leading, *(color + piece for color, piece in pieces), ANSI_RESET])
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def colorcode_strip(text: str) -> str:
+    """Remove @ color codes and ANSI sequences from a string.
+
+    Args:
+        text: The string with @ color codes.
+
+    Returns:
+        The string without any colors.
+
+    """
+    if "@" in text:
+        leading, pieces = _parse_colorcodes(text)
+        text = "".join([leading, *(piece for _, piece in pieces)])
+    return ansicode_strip(text)
+
+
+def _ansi_sequence_to_colorcode(match: re.Match) -> str:
+    """Get the @ color code for an ANSI sequence.
+
+    Args:
+        match: The match of the ANSI sequence.
+
+    Returns:
+        The @ color code, or an empty string if the color is unknown.
+
+    """
+    sequence = match.group()
+    if (colorcode := ANSI_TO_COLORCODE.get(sequence)) is not None:
+        return colorcode
+    code = match.group("arg_1")
+    if match.group("arg_2"):
+        code = f"{code};{int(match.group('arg_2'))}"
+    if match.group("arg_3"):
+        code = f"{code};{int(match.group('arg_3'))}"
+    if code in CONVERTANSI:
+        colorcode = f"@{CONVERTANSI[code]}"
+    else:
+        LogRecord(
+            f"could not lookup color {code} for ansi sequence {sequence!r}",
+            level="error",
+            sources=["plugins.core.colors"],
+        )()
+        colorcode = ""
+    ANSI_TO_COLORCODE[sequence] = colorcode
+    return colorcode
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def ansicode_to_colorcode(text: str) -> str:
+    """Convert ANSI sequences in a string to @ color codes.
+
+    Args:
+        text: The string with ANSI sequences.
+
+    Returns:
+        The string with @ color codes.
+
+    """
+    if ESCAPE not in text:
+        return text
+    return ANSI_COLOR_REGEX.sub(_ansi_sequence_to_colorcode, text)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def ansicode_strip(text: str) -> str:
+    """Remove ANSI sequences from a string.
+
+    Args:
+        text: The string with ANSI sequences.
+
+    Returns:
+        The string without ANSI sequences.
+
+    """
+    if ESCAPE not in text:
+        return text
+    return ANSI_COLOR_REGEX.sub("", text)
+
+
+def cache_info() -> dict[str, dict[str, int]]:
+    """Get the cache statistics for each conversion.
+
+    Returns:
+        A dict of conversion names to their cache statistics.
+
+    """
+    return {
+        "colorcode.to.ansicode": colorcode_to_ansicode.cache_info()._asdict(),
+        "colorcode.strip": colorcode_strip.cache_info()._asdict(),
+        "ansicode.to.colorcode": ansicode_to_colorcode.cache_info()._asdict(),
+        "ansicode.strip": ansicode_strip.cache_info()._asdict(),
+    }
@@ -9,18 +9,16 @@
 import re
 
 from libs.api import AddAPI
-from libs.records import LogRecord
 from plugins._baseplugin import BasePlugin
 
 # 3rd Party
 # Project
-from plugins.core.colors.libs._colors import COLORTABLE, CONVERTANSI, CONVERTCOLORS
+from plugins.core.colors.libs import _transcoder as transcoder
+from plugins.core.colors.libs._colors import COLORTABLE
 from plugins.core.commands import AddArgument, AddParser
+from plugins.core.events import RegisterToEvent
 
 XTERM_COLOR_REGEX = re.compile(r"^@[xz](?P<num>[\d]{1,3})$")
-ANSI_COLOR_REGEX = re.compile(
-    chr(27) + r"\[(?P<arg_1>\d+)(;(?P<arg_2>\d+)" r"(;(?P<arg_3>\d+))?)?m"
-)
 
 COLORCODE_REGEX = re.compile(r"(@[cmyrgbwCMYRGBWD|xz[\d{0:3}]])(?P<stuff>.*)")
 
@@ -61,32 +59,6 @@ def createspan(color, text):
     return f"<span style='color:{ncolor}'>{text}</span>"
 
 
-def genrepl(match):
-    """A general replace function."""
-    return match.group(1)
-
-
-def fixstring(tstr):
-    """Fix a strings invalid colors."""
-    # Thanks to Fiendish from the aardwolf mushclient package, see
-    # http://code.google.com/p/aardwolfclientpackage/
-
-    # fix tildes
-    tstr = re.sub(r"@-", "~", tstr)
-    # change @@ to \0
-    tstr = re.sub(r"@@", "\0", tstr)
-    # strip invalid xterm codes (non-number)
-    tstr = re.sub(r"@[xz]([^\d])", genrepl, tstr)
-    # strip invalid xterm codes (300+)
-    tstr = re.sub(r"@[xz][3-9]\d\d", "", tstr)
-    # strip invalid xterm codes (260+)
-    tstr = re.sub(r"@[xz]2[6-9]\d", "", tstr)
-    # strip invalid xterm codes (256+)
-    tstr = re.sub(r"@[xz]25[6-9]", "", tstr)
-    # rip out hidden garbage
-    return re.sub(r"@[^xzcmyrgbwCMYRGBWD]", "", tstr)
-
-
 class ColorsPlugin(BasePlugin):
     """a plugin to handle ansi colors."""
 
@@ -101,7 +73,6 @@ class ColorsPlugin(BasePlugin):
         for line in tinput:
             lastchar = "\n" if line and line[-1] == "\n" else ""
             stripped_line = line.rstrip()
-            # line = fixstring(line)
             if "@@" in stripped_line:
                 stripped_line = stripped_line.replace("@@", "\0")
             tlist = re.split(
@@ -178,34 +149,7 @@ class ColorsPlugin(BasePlugin):
     @AddAPI("colorcode.to.ansicode", description="convert @@ colors in a string")
     def _api_colorcode_to_ansicode(self, tstr):
         """Convert @ colors in a string."""
-        if "@" in tstr:
-            if tstr[-2:] != "@w":
-                tstr = f"{tstr}@w"
-            tstr = fixstring(tstr)
-            tmat = re.search(r"@(\w)([^@]+)", tstr)
-            tstr2 = tstr[: tmat.start()] if tmat and tmat.start() != 0 else ""
-            for tmatch in re.finditer(r"@(\w)([^@]+)", tstr):
-                color, text = tmatch.groups()
-                if color == "x":
-                    tcolor, newtext = re.findall(r"^(\d\d?\d?)(.*)$", text)[0]
-                    color = f"38;5;{tcolor}"
-                    tstr2 = tstr2 + self.api(f"{self.plugin_id}:ansicode.to.string")(
-                        color, newtext
-                    )
-                elif color == "z":
-                    tcolor, newtext = re.findall(r"^(\d\d?\d?)(.*)$", text)[0]
-                    color = f"48;5;{tcolor}"
-                    tstr2 = tstr2 + self.api(f"{self.plugin_id}:ansicode.to.string")(
-                        color, newtext
-                    )
-                else:
-                    tstr2 = tstr2 + self.api(f"{self.plugin_id}:ansicode.to.string")(
-                        CONVERTCOLORS[color], text
-                    )
-
-            if tstr2:
-                tstr = tstr2 + f"{chr(27)}[0m"
-        return re.sub("\0", "@", tstr)  # put @ back in
+        return transcoder.colorcode_to_ansicode(tstr)
 
     @AddAPI(
         "colorcode.escape", description="escape colorcodes so they are not interpreted"
@@ -231,29 +175,7 @@ class ColorsPlugin(BasePlugin):
     def _api_ansicode_to_colorcode(self, text):
         # pylint: disable=no-self-use
         """Convert ansi color escape sequences to @@ colors."""
-
-        def single_sub(match) -> str:
-            """Do a single substitution."""
-            argsdict = match.groupdict()
-            tstr = ""
-            tstr += argsdict["arg_1"]
-            if argsdict["arg_2"]:
-                tstr = tstr + f";{int(argsdict['arg_2'])}"
-
-            if argsdict["arg_3"]:
-                tstr = tstr + f";{int(argsdict['arg_3'])}"
-
-            try:
-                return f"@{CONVERTANSI[tstr]}"
-            except KeyError:
-                LogRecord(
-                    f"could not lookup color {tstr} for text {text!r}",
-                    level="error",
-                    plugin=self.plugin_id,
-                )()
-                return ""
-
-        return ANSI_COLOR_REGEX.sub(single_sub, text)
+        return transcoder.ansicode_to_colorcode(text)
 
     @AddAPI("ansicode.to.string", description="return an ansi coded string")
     def _api_ansicode_to_string(self, color, data):
@@ -265,14 +187,28 @@ class ColorsPlugin(BasePlugin):
     def _api_ansicode_strip(self, text):
         # pylint: disable=no-self-use
         """Strip all ansi from a string."""
-        return ANSI_COLOR_REGEX.sub("", text)
+        return transcoder.ansicode_strip(text)
 
     @AddAPI("colorcode.strip", description="strip @@ colors")
     def _api_colorcode_strip(self, text):
         """Strip @@ colors."""
-        return self.api(f"{self.plugin_id}:ansicode.strip")(
-            self.api(f"{self.plugin_id}:colorcode.to.ansicode")(text)
-        )
+        return transcoder.colorcode_strip(text)
+
+    @RegisterToEvent(event_name="ev_plugin_{plugin_id}_stats")
+    def _eventcb_colors_ev_plugins_stats(self):
+        """Return stats for the plugin."""
+        if event_record := self.api("plugins.core.events:get.current.event.record")():
+            showorder = []
+            stats = {}
+            for name, info in transcoder.cache_info().items():
+                lookups = info["hits"] + info["misses"]
+                hit_rate = f"{info['hits'] / lookups:.1%}" if lookups else "n/a"
+                showorder.append(name)
+                stats[name] = f"{info['currsize']} cached, {hit_rate} hits"
+            event_record["stats"]["Conversion Cache"] = {
+                "showorder": showorder,
+                **stats,
+            }
 
     @AddParser(description="show colors")
     @AddArgument("-c", "--compact", help="show a compact version", action="store_true")
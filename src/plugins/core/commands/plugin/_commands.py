@@ -14,7 +14,7 @@ from libs import argp
 # 3rd Party
 # Project
 from libs.api import AddAPI
-from libs.persistentdict import PersistentDict
+from libs.persistentdict import KeySchema, PersistentDict
 from libs.records import (
     LogRecord,
     NetworkData,
@@ -51,7 +51,7 @@ class CommandsPlugin(BasePlugin):
         # load the history
         self.history_save_file = self.plugin_info.data_directory / "history.txt"
         self.command_history_dict = PersistentDict(
-            self.plugin_id, self.history_save_file, "c"
+            self.plugin_id, self.history_save_file, "c", key_schema=KeySchema()
         )
         if "history" not in self.command_history_dict:
             self.command_history_dict["history"] = []
@@ -93,6 +93,8 @@ class CommandsPlugin(BasePlugin):
             int,
             "the # of times the current command has been run",
             readonly=True,
+            volatile=True,
+            noevent=True,
         )
         self.api("plugins.core.settings:add")(
             self.plugin_id,
@@ -101,6 +103,8 @@ class CommandsPlugin(BasePlugin):
             str,
             "the last command that was sent to the mud",
             readonly=True,
+            volatile=True,
+            noevent=True,
         )
         self.api("plugins.core.settings:add")(
             self.plugin_id, "historysize", 50, int, "the size of the history to keep"
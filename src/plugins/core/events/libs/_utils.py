@@ -29,6 +29,8 @@ class RegisterToEvent:
             **kwargs: Keyword arguments including:
                 event_name: the event to register to
                 priority: the priority to register the function with (Default: 50).
+                batch: call the function once with the whole data_list of a
+                    raise instead of once for each item (Default: False).
 
         """
         self.registration_args = {"event_name": "", "priority": 50} | kwargs
@@ -43,14 +43,56 @@ class ProcessRaisedEvent(BaseRecord):
         else:
             self._exec_once(actor, *args, **kwargs)
 
-    def _exec_multi(self, *args, **kwargs):
-        """Process the event."""
-        for item in kwargs["data_list"]:
-            self.event_data[kwargs["key_name"]] = item
-            self._exec_once(*args, **kwargs)
-
-    def _exec_once(self, actor, **kwargs):
-        """Exec it with self.arg_data."""
+    def _exec_multi(self, actor, data_list, key_name, **kwargs):
+        """Process the event for each item in data_list.
+
+        The phases of the event are processed in order. In a phase of batch
+        callbacks, they are called once with the whole list in the
+        '<key_name>_list' key of the event data. In the other phases, the
+        callbacks are called once for each item, which is in the key_name key.
+
+        If a function is registered or unregistered during the raise, the
+        phases are rebuilt and the raise continues with the priorities after
+        the last phase that was processed.
+        """
+        event = self.event
+        phases = event.dispatch_phases
+        # (priority, batch) of the end of the last phase processed, batch
+        # functions come after the others at the same priority
+        done = None
+        index = 0
+        while index < len(phases):
+            batch, start, end = phases[index]
+            index += 1
+            if done is not None:
+                if (end, batch) <= done:
+                    continue
+                if (start, batch) <= done:
+                    # start the phase at the first priority not yet processed
+                    start = min(
+                        priority
+                        for priority, _, is_batch in event.dispatch_plan
+                        if is_batch == batch and (priority, batch) > done
+                    )
+            phase = (batch, start, end)
+            if batch:
+                self.event_data[f"{key_name}_list"] = data_list
+                self._exec_once(actor, phase=phase)
+            else:
+                for item in data_list:
+                    self.event_data[key_name] = item
+                    self._exec_once(actor, phase=phase)
+            done = (end, batch)
+            if event.dispatch_phases is not phases:
+                phases = event.dispatch_phases
+                index = 0
+
+    def _exec_once(self, actor, phase=None, **kwargs):
+        """Exec it with self.arg_data.
+
+        phase: (batch, lowest priority, highest priority) of the callbacks to
+            call, all of them are called if None.
+        """
         self.times_invoked += 1
         self.addupdate("Info", "Invoked", extra={"data": f"{self.event_data.data}"})
 
@@ -69,40 +111,50 @@ class ProcessRaisedEvent(BaseRecord):
                 sources=[self.called_from, self.event.created_by],
             )()
 
-        # convert a dict to an EventArgsRecord object
-
-        # This checks each priority seperately and executes the functions in order of priority
-        # A while loop is used to ensure that if a function is added to the event during the execution of the same event
-        # it will be processed in the same order as the other functions
-        # This means that any registration added during the execution of the event will be processed
-        priorities_done = []
-
-        found_callbacks = True
-        count = 0
-        while found_callbacks:
-            count = count + 1
-            found_callbacks = False
-            if keys := list(self.event.priority_dictionary.keys()):
-                keys = sorted(keys)
-                if len(keys) < 1:
-                    found_callbacks = False
-                    continue
-                for priority in keys:
-                    found_callbacks = self.event.raise_priority(
-                        priority, priority in priorities_done
-                    )
-                    priorities_done.append(priority)
-
-        if count > 2:  # the minimum number of times through the loop is 2
+        # The callbacks are called in the order of the event's dispatch plan.
+        # If a function is registered or unregistered while the event is being
+        # processed, the plan is replaced, so the new plan is walked from the
+        # start, skipping the callbacks that were already called. A new
+        # callback at a priority that was already passed is called out of order.
+        event = self.event
+        plan = event.dispatch_plan
+        called = set()
+        reached = None
+        passes = 1
+        called_after_change = False
+        index = 0
+        while index < len(plan):
+            priority, call_back, batch_callback = plan[index]
+            index += 1
+            if phase and (
+                batch_callback != phase[0] or not phase[1] <= priority <= phase[2]
+            ):
+                continue
+            # the plan holds the same callback objects after it is rebuilt
+            entry = (priority, id(call_back))
+            if entry in called or call_back is event.current_callback:
+                continue
+            called.add(entry)
+            called_after_change = passes > 1
+            event.execute_callback(
+                priority, call_back, reached is not None and priority < reached
+            )
+            if reached is None or priority > reached:
+                reached = priority
+            if event.dispatch_plan is not plan:
+                plan = event.dispatch_plan
+                passes += 1
+                index = 0
+
+        if called_after_change:
             LogRecord(
-                f"raise_event - event {self.event_name} raised by {self.called_from} was processed {count} times",
+                f"raise_event - event {self.event_name} raised by {self.called_from} was processed {passes} times",
                 level="warning",
                 sources=[self.event.created_by],
             )()
 
         self.current_record = None
         self.current_callback = None
-        self.event.reset_event()
 
     def get_attributes_to_format(self):
         attributes = super().get_attributes_to_format()
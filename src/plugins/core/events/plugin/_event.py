@@ -9,9 +9,24 @@
 The created_by attribute is the name of the plugin or module that created the event
 It can be updated in two ways, by using the api plugins.core.events:add:event
     or when the event is raised and a calledfrom argument is passed and created_by is not already been set
+
+The registered functions are kept in a dispatch plan, a tuple of
+(priority, callback, batch) in the order they are called. It is rebuilt when a
+function is registered or unregistered, not when the event is raised.
+
+A function registered with batch=True is called once for an event raised with
+a data_list instead of once for each item. The plan is split into phases of
+(batch, lowest priority, highest priority), so the items are dispatched one at
+a time up to the first batch function, the batch functions get the whole list,
+and so on. At the same priority, batch functions come after the others.
+
+An event keeps the last few times it was raised, the number is its retention.
+The count and the time taken of every raise are kept as totals, so they cover
+raises that are no longer kept.
 """
 
 # Standard Library
+import time
 from collections.abc import Callable
 
 # 3rd Party
@@ -22,22 +37,32 @@ from libs.records import LogRecord
 from plugins.core.events.libs.data._event import EventDataRecord
 from plugins.core.events.libs.process._raisedevent import ProcessRaisedEvent
 
+# the number of raised events an event keeps if it does not set its own
+DEFAULT_RETENTION = 10
+
 
 class Event:
     """Base class for an event."""
 
+    # the retention of events that do not set their own, updated from the
+    # raisedeventretention setting of the events plugin
+    default_retention: int = DEFAULT_RETENTION
+
     def __init__(
         self,
         name: str,
         created_by: str = "",
         description: list | None = None,
         arg_descriptions: dict[str, str] | None = None,
+        retention: int | None = None,
     ):
         """name: the name of the event.
 
         created_by: it should be the __name__ of the module or the plugin id for easy identification
         description: a list of strings that describe the event
         arg_descriptions: a dictionary of argument names and descriptions.
+        retention: the number of raised events to keep, 0 to keep none, None
+            to use the default.
         """
         self.name: str = name
         # it should be the __name__ of the module or the plugin id for easy identification
@@ -48,17 +73,44 @@ class Event:
         self.owner_id: str = f"{__name__}:{self.name}"
         self.api = API(owner_id=self.owner_id)
         self.priority_dictionary = {}
+        # (priority, callback, batch) in the order the callbacks are called
+        self.dispatch_plan: tuple[tuple[int, Callback, bool], ...] = ()
+        # (batch, lowest priority, highest priority) for a raise with a data_list
+        self.dispatch_phases: tuple[tuple[bool, int, int], ...] = ()
         self.raised_count = 0
-        # NOTE : this is an unbound dictionary, may need to limit the size
-        #           because of how many events will be raised
-        self.raised_events = {}
+        # the time taken by all raises, in milliseconds
+        self.raised_time_total: float = 0
+        self.raised_time_max: float = 0
+        self.retention: int | None = retention
+        # the last raised events, oldest first
+        self.raised_events: dict[str, ProcessRaisedEvent] = {}
         self.current_callback = None
-        self.active_event = None
+        self.active_event: ProcessRaisedEvent | None = None
 
     def get_active_event(self):
         """Get the active event."""
         return self.active_event
 
+    def get_retention(self) -> int:
+        """Return the number of raised events this event keeps."""
+        return self.default_retention if self.retention is None else self.retention
+
+    def set_retention(self, retention: int | None):
+        """Set the number of raised events to keep, None to use the default."""
+        self.retention = retention
+        self.trim_raised_events()
+
+    def trim_raised_events(self):
+        """Remove the oldest raised events that are over the retention."""
+        retention = max(self.get_retention(), 0)
+        while len(self.raised_events) > retention:
+            del self.raised_events[next(iter(self.raised_events))]
+
+    @property
+    def raised_time_average(self) -> float:
+        """The average time taken by a raise, in milliseconds."""
+        return self.raised_time_total / self.raised_count if self.raised_count else 0
+
     def count(self) -> int:
         """Return the number of functions registered to this event."""
         return sum(len(v) for v in self.priority_dictionary.values())
@@ -76,8 +128,14 @@ class Event:
             self.priority_dictionary[priority] for priority in self.priority_dictionary
         )
 
-    def register(self, func: Callable, func_owner_id: str, prio: int = 50) -> bool:
-        """Register a function to this event container."""
+    def register(
+        self, func: Callable, func_owner_id: str, prio: int = 50, batch: bool = False
+    ) -> bool:
+        """Register a function to this event container.
+
+        batch: call the function once with the whole data_list of a raise
+            instead of once for each item.
+        """
         priority = prio or 50
         if priority not in self.priority_dictionary:
             self.priority_dictionary[priority] = {}
@@ -87,12 +145,11 @@ class Event:
         if call_back not in self.priority_dictionary[priority]:
             # This is a list of functions that are registered to this event at this priority
             # It is used to ensure that a function is not registered twice
-            # Each time the event is invoked, the dictionary item will be set to True
-            # when the function has been called. This is used to ensure that all functions
-            # are called at least once before the event is finished
-            self.priority_dictionary[priority][call_back] = False
+            # the value is True for batch functions
+            self.priority_dictionary[priority][call_back] = batch
+            self.build_dispatch_plan()
             LogRecord(
-                f"{self.name} - register function {call_back} with priority {priority}",
+                f"{self.name} - register function {call_back} with priority {priority}{' (batch)' if batch else ''}",
                 level="debug",
                 sources=[call_back.owner_id, self.created_by],
             )()
@@ -111,6 +168,7 @@ class Event:
                         sources=[call_back.owner_id, self.created_by],
                     )()
                     del self.priority_dictionary[priority][call_back]
+                    self.build_dispatch_plan()
                     return True
 
         LogRecord(
@@ -167,6 +225,11 @@ class Event:
             *description,
             f"{'Created by':<13} : {self.created_by}",
             f"{'Raised':<13} : {self.raised_count}",
+            (
+                f"{'Time (ms)':<13} : {self.raised_time_total:.2f} total, "
+                f"{self.raised_time_average:.2f} avg, {self.raised_time_max:.2f} max"
+            ),
+            f"{'Kept':<13} : {len(self.raised_events)} of {self.get_retention()}",
             "",
             self.api("plugins.core.utils:center.colored.string")(
                 "@x86Registrations@w", "-", 60, filler_color=header_color
@@ -180,7 +243,8 @@ class Event:
         for priority in key_list:
             function_message.extend(
                 f"{priority:<13} : {call_back.owner_id:<25} - {call_back.name}"
-                for call_back in self.priority_dictionary[priority]
+                f"{' (batch)' if batch else ''}"
+                for call_back, batch in self.priority_dictionary[priority].items()
             )
         if not function_message:
             message.append("None")
@@ -205,54 +269,61 @@ class Event:
 
         return message
 
-    def reset_event(self):
-        """Reset the event."""
-        for priority in self.priority_dictionary:
-            for call_back in self.priority_dictionary[priority]:
-                self.priority_dictionary[priority][call_back] = False
-
-    def raise_priority(self, priority, already_done: bool) -> bool:
-        """Raise the event at a specific priority."""
-        found = False
-        for call_back in list(self.priority_dictionary[priority].keys()):
-            try:
-                # A callback should call the api 'plugins.core.events:get:current:event'
-                # which returns event_name, EventDataRecord
-                # If the registered event changes the data, it should snapshot it with addupdate
-                if (
-                    call_back in self.priority_dictionary[priority]
-                    and not self.priority_dictionary[priority][call_back]
-                    and self.current_callback != call_back
-                ):
-                    self.current_callback = call_back
-                    self.priority_dictionary[priority][call_back] = True
-                    call_back.execute()
-                    found = True
-                    if already_done:
-                        LogRecord(
-                            f"raise_event - event {self.name} with function {call_back.owner_id}:{call_back.name} was called out of order at priority {priority}",
-                            level="warning",
-                            sources=[call_back.owner_id, self.created_by],
-                        )()
-                        LogRecord(
-                            f"    this is likely due to a function being registered at priority {priority} during the execution of the event",
-                            level="warning",
-                            sources=[call_back.owner_id, self.created_by],
-                        )()
-
-            except Exception:  # pylint: disable=broad-except
+    def build_dispatch_plan(self):
+        """Rebuild the dispatch plan from the registered functions."""
+        self.dispatch_plan = tuple(
+            (priority, call_back, batch)
+            for priority in sorted(self.priority_dictionary)
+            for call_back, batch in self.priority_dictionary[priority].items()
+        )
+
+        # [batch, first priority, last priority] of each run of the same batch flag
+        phases: list[list] = []
+        for priority in sorted(self.priority_dictionary):
+            batches = set(self.priority_dictionary[priority].values())
+            for batch in (False, True):
+                if batch not in batches:
+                    continue
+                if phases and phases[-1][0] == batch:
+                    phases[-1][2] = priority
+                else:
+                    phases.append([batch, priority, priority])
+        self.dispatch_phases = tuple(tuple(phase) for phase in phases)
+
+    def execute_callback(self, priority, call_back, out_of_order: bool):
+        """Call a function registered at a priority."""
+        previous_callback = self.current_callback
+        try:
+            # A callback should call the api 'plugins.core.events:get:current:event'
+            # which returns event_name, EventDataRecord
+            # If the registered event changes the data, it should snapshot it with addupdate
+            self.current_callback = call_back
+            call_back.execute()
+            if out_of_order:
+                LogRecord(
+                    f"raise_event - event {self.name} with function {call_back.owner_id}:{call_back.name} was called out of order at priority {priority}",
+                    level="warning",
+                    sources=[call_back.owner_id, self.created_by],
+                )()
                 LogRecord(
-                    f"raise_event - event {self.name} with function {call_back.name} raised an exception",
-                    level="error",
+                    f"    this is likely due to a function being registered at priority {priority} during the execution of the event",
+                    level="warning",
                     sources=[call_back.owner_id, self.created_by],
-                    exc_info=True,
                 )()
 
-        return found
+        except Exception:  # pylint: disable=broad-except
+            LogRecord(
+                f"raise_event - event {self.name} with function {call_back.name} raised an exception",
+                level="error",
+                sources=[call_back.owner_id, self.created_by],
+                exc_info=True,
+            )()
+        finally:
+            self.current_callback = previous_callback
 
     def raise_event(
         self, data: dict | EventDataRecord, actor: str, data_list=None, key_name=None
-    ) -> EventDataRecord | None:
+    ) -> ProcessRaisedEvent | None:
         """Raise this event."""
         self.raised_count = self.raised_count + 1
 
@@ -277,9 +348,19 @@ class Event:
         if actor and not self.created_by:
             self.created_by = actor
 
-        self.active_event = ProcessRaisedEvent(self, data, actor)  # type: ignore
-        uuid = self.active_event.uuid
-        self.raised_events[uuid] = self.active_event
-        self.active_event(actor, data_list=data_list, key_name=key_name)
-        self.active_event = None
-        return self.raised_events[uuid]
+        raised_event = ProcessRaisedEvent(self, data, actor)
+        if self.get_retention() > 0:
+            self.raised_events[raised_event.uuid] = raised_event
+            self.trim_raised_events()
+
+        # the event can be raised again by one of its callbacks
+        previous_event = self.active_event
+        self.active_event = raised_event
+        start = time.perf_counter()
+        raised_event(actor, data_list=data_list, key_name=key_name)
+        time_taken = (time.perf_counter() - start) * 1000
+        self.active_event = previous_event
+
+        self.raised_time_total += time_taken
+        self.raised_time_max = max(self.raised_time_max, time_taken)
+        return raised_event
@@ -19,7 +19,7 @@ from plugins._baseplugin import BasePlugin, RegisterPluginHook
 from plugins.core.commands import AddArgument, AddParser
 from plugins.core.events import RegisterToEvent
 
-from ._event import Event
+from ._event import DEFAULT_RETENTION, Event
 
 
 class EventsPlugin(BasePlugin):
@@ -47,6 +47,13 @@ class EventsPlugin(BasePlugin):
             bool,
             "flag to log savestate events, reduces log spam if False",
         )
+        self.api("plugins.core.settings:add")(
+            self.plugin_id,
+            "raisedeventretention",
+            DEFAULT_RETENTION,
+            int,
+            "the # of raised events each event keeps, 0 to keep none",
+        )
 
         # Can't use decorator since this is the one that registers all events from decorators
         self.api("plugins.core.events:register.to.event")(
@@ -61,6 +68,15 @@ class EventsPlugin(BasePlugin):
             f"ev_{self.plugin_id}_all_events_registered"
         )
 
+    @RegisterToEvent(event_name="ev_{plugin_id}_var_raisedeventretention_modified")
+    def _eventcb_raised_event_retention_modified(self):
+        """Apply the new retention to the events that use the default."""
+        Event.default_retention = self.api("plugins.core.settings:get")(
+            self.plugin_id, "raisedeventretention"
+        )
+        for event in self.events.values():
+            event.trim_raised_events()
+
     @RegisterToEvent(event_name="ev_baseplugin_patched")
     def _eventcb_baseplugin_patched(self):
         """A plugin was patched, so reload all events."""
@@ -157,7 +173,7 @@ class EventsPlugin(BasePlugin):
             event_name = event_name.format(**func.__self__.__dict__)
             prio = item["priority"]
             self.api("plugins.core.events:register.to.event")(
-                event_name, func, priority=prio
+                event_name, func, priority=prio, batch=item.get("batch", False)
             )
 
     @RegisterToEvent(event_name="ev_plugin_unloaded")
@@ -198,12 +214,31 @@ class EventsPlugin(BasePlugin):
         created_by: str,
         description: list | None = None,
         arg_descriptions: dict[str, str] | None = None,
+        retention: int | None = None,
     ):
-        """Add an event for this plugin to track."""
+        """Add an event for this plugin to track.
+
+        @Yretention@w = the # of raised events to keep, None for the default
+        """
         event = self.api(f"{self.plugin_id}:get.event")(event_name)
         event.created_by = created_by
         event.description = description or []
         event.arg_descriptions = arg_descriptions or {}
+        if retention is not None:
+            event.set_retention(retention)
+
+    @AddAPI(
+        "set.event.retention",
+        description="set the number of raised events an event keeps",
+    )
+    def _api_set_event_retention(self, event_name: str, retention: int | None):
+        """Set the number of raised events an event keeps.
+
+        @Yevent_name@w = the event
+        @Yretention@w  = the # of raised events to keep, 0 to keep none,
+                        None to use the raisedeventretention setting
+        """
+        self.api(f"{self.plugin_id}:get.event")(event_name).set_retention(retention)
 
     @AddAPI("get.event", description="return the event")
     def _api_get_event(self, event_name):
@@ -253,10 +288,13 @@ class EventsPlugin(BasePlugin):
         @Yfunc@w        = The function to register
         keyword arguments:
           prio          = the priority of the function (default: 50).
+          batch         = call the function once with the whole data_list
+                          of a raise, in the '<key_name>_list' key (default: False)
 
         this function returns no values
         """
         priority = kwargs.get("prio", 50)
+        batch = kwargs.get("batch", False)
         func_owner_id = self.api("libs.api:get.function.owner.plugin")(func)
 
         if not func_owner_id:
@@ -273,7 +311,7 @@ class EventsPlugin(BasePlugin):
 
         event = self.api(f"{self.plugin_id}:get.event")(event_name)
 
-        event.register(func, func_owner_id, priority)
+        event.register(func, func_owner_id, priority, batch=batch)
 
     @AddAPI("unregister.from.event", description="unregister a function from an event")
     def _api_unregister_from_event(self, event_name, func):
@@ -63,21 +63,24 @@ class FuzzyPlugin(BasePlugin):
         found = ""
         scorer_inst = rapidfuzz.fuzz.__dict__[scorer]
         LogRecord(
-            f"_api_get_best_match - {item_to_match=}, {scorer=} {score_cutoff=}",
+            "_api_get_best_match - item_to_match=%r, scorer=%r score_cutoff=%r",
             level="debug",
             sources=[self.plugin_id],
+            args=(item_to_match, scorer, score_cutoff),
         )()
         LogRecord(
-            f"_api_get_best_match - {list_to_match=}",
+            "_api_get_best_match - list_to_match=%r",
             level="debug",
             sources=[self.plugin_id],
+            args=(list_to_match,),
         )()
 
         if item_to_match in list_to_match:
             LogRecord(
-                f"_api_get_best_match (exact) matched {item_to_match} to {found}",
+                "_api_get_best_match (exact) matched %s to %s",
                 level="debug",
                 sources=[self.plugin_id],
+                args=(item_to_match, found),
             )()
             return item_to_match
 
@@ -85,9 +88,10 @@ class FuzzyPlugin(BasePlugin):
         if len(matching_startswith) == 1:
             found = matching_startswith[0]
             LogRecord(
-                f"_api_get_best_match (startswith) matched {item_to_match} to {found}",
+                "_api_get_best_match (startswith) matched %s to %s",
                 level="debug",
                 sources=[self.plugin_id],
+                args=(item_to_match, found),
             )()
         else:
             sorted_extract = sort_fuzzy_result(
@@ -96,18 +100,20 @@ class FuzzyPlugin(BasePlugin):
                 )
             )
             LogRecord(
-                f"_api_get_best_match - extract for {item_to_match} - {sorted_extract}",
+                "_api_get_best_match - extract for %s - %s",
                 level="debug",
                 sources=[self.plugin_id],
+                args=(item_to_match, sorted_extract),
             )()
             maxscore = max(sorted_extract.keys())
             if maxscore > score_cutoff and len(sorted_extract[maxscore]) == 1:
                 found = sorted_extract[maxscore][0]
                 LogRecord(
-                    f"_api_get_best_match - (score) matched {item_to_match} to {found}",
+                    "_api_get_best_match - (score) matched %s to %s",
                     level="debug",
                     sources=[self.plugin_id],
-                )
+                    args=(item_to_match, found),
+                )()
 
         return found
 
@@ -10,8 +10,9 @@ see info/logging_notes.txt for more information about logging
 """
 
 # Standard Library
+import atexit
+import datetime as dt
 import logging
-import logging.handlers
 import numbers
 import sys
 import traceback
@@ -19,6 +20,7 @@ import traceback
 # Third Party
 # Project
 from libs.api import API
+from libs.net.capture import CAPTURE, CaptureFile, gap_block
 from libs.records import (
     LogRecord,
     NetworkData,
@@ -26,20 +28,23 @@ from libs.records import (
     SendDataDirectlyToClient,
 )
 from plugins.core.colors import ALLCONVERTCOLORS
+from plugins.core.log.libs._writer import (
+    LOG_WRITER,
+    BatchedFileHandler,
+    QueuedLogHandler,
+)
 
 from .tz import formatTime_RFC3339, formatTime_RFC3339_UTC
 from .utils import get_toplevel
 
 default_log_file = "bastproxy.log"
-data_logger_log_file = "networkdata.log"
+data_capture_file = "networkdata-{started}.bpcap"
 
 type_counts = {}
 
 
-def update_type_counts(name, level):
-    logger_name = get_toplevel(name)
-    if isinstance(level, numbers.Number):
-        level = logging.getLevelName(level).lower()  # type: ignore
+def get_type_counts(logger_name):
+    """Get the counts of each level for a toplevel logger."""
     if logger_name not in type_counts:
         type_counts[logger_name] = {
             "debug": 0,
@@ -48,9 +53,14 @@ def update_type_counts(name, level):
             "error": 0,
             "critical": 0,
         }
-    if level not in type_counts[logger_name]:
-        type_counts[logger_name][level] = 0
-    type_counts[logger_name][level] += 1
+    return type_counts[logger_name]
+
+
+def update_type_counts(name, level):
+    if isinstance(level, numbers.Number):
+        level = logging.getLevelName(level).lower()  # type: ignore
+    counts = get_type_counts(get_toplevel(name))
+    counts[level] = counts.get(level, 0) + 1
 
 
 class CustomColorFormatter(logging.Formatter):
@@ -132,21 +142,11 @@ class CustomConsoleHandler(logging.StreamHandler):
             super().emit(record)
 
 
-class CustomRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
-    def __init__(
-        self,
-        filename,
-        when="midnight",
-        interval=1,
-        backupCount=0,
-        encoding=None,
-        delay=False,
-        utc=False,
-        atTime=None,
-    ):
-        super().__init__(
-            filename, when, interval, backupCount, encoding, delay, utc, atTime
-        )
+class CustomRotatingFileHandler(QueuedLogHandler):
+    """Queue records for the log file, which is written on the writer thread."""
+
+    def __init__(self, target: logging.Handler):
+        super().__init__(LOG_WRITER, target)
         self.api = API(owner_id=f"{__name__}:CustomRotatingFileHandler")
         self.setLevel(logging.DEBUG)
 
@@ -212,8 +212,37 @@ class CustomClientHandler(logging.Handler):
                 SendDataDirectlyToClient(new_message)()
 
 
+class CaptureHandler(logging.Handler):
+    """Write blocks of captured network data to a capture file.
+
+    This runs on the writer thread, the message of each record is a block from
+    libs.net.capture.CAPTURE. The writer's warning about dropped blocks is
+    written as a gap record, so an export shows where data is missing.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.set_name(f"the capture file {path}")
+        self.capture_file = CaptureFile(path)
+
+    def emit(self, record):
+        if isinstance(record.msg, bytes):
+            self.capture_file.write_block(record.msg)
+        elif dropped := getattr(record, "dropped", 0):
+            self.capture_file.write_block(gap_block(record.created, dropped))
+
+    def flush_batch(self):
+        self.capture_file.flush()
+
+    def close(self):
+        self.capture_file.close()
+        super().close()
+
+
 def reset_logging():
     """Reset logging handlers and filters."""
+    CAPTURE.stop()
+    LOG_WRITER.stop()
     rootlogger = logging.getLogger()
     while rootlogger.hasHandlers():
         try:
@@ -237,16 +266,21 @@ def setup_loggers(log_level: int):
 
     default_log_file_path = API.BASEDATALOGPATH / default_log_file
     (API.BASEDATALOGPATH / "networkdata").mkdir(parents=True, exist_ok=True)
-    data_logger_log_file_path = (
-        API.BASEDATALOGPATH / "networkdata" / data_logger_log_file
+    data_capture_file_path = (
+        API.BASEDATALOGPATH
+        / "networkdata"
+        / data_capture_file.format(
+            started=dt.datetime.now(dt.UTC).strftime("%Y-%m-%d-%H%M%S")
+        )
     )
 
-    file_handler = CustomRotatingFileHandler(
-        filename=default_log_file_path, when="midnight"
-    )
-    file_handler.formatter = logging.Formatter(
+    # the files are written on the writer thread, see _writer.py
+    file_target = BatchedFileHandler(filename=default_log_file_path, when="midnight")
+    file_target.formatter = logging.Formatter(
         "%(asctime)s : %(levelname)-9s - %(name)-22s - %(message)s"
     )
+    LOG_WRITER.add_handler(file_target)
+    file_handler = CustomRotatingFileHandler(file_target)
 
     console_handler = CustomConsoleHandler()
     console_handler.formatter = CustomColorFormatter(
@@ -268,18 +302,21 @@ def setup_loggers(log_level: int):
     else:
         logging.Formatter.formatTime = formatTime_RFC3339
 
-    # This logger is for any network data from both the mud and the client to facilitate
-    # debugging. It is not intended to be used for general logging. It will not use the same
-    # log settings as the root logger. It will log to a file and not to the console.
-    # logging network data from the mud will use data.mud
-    # logging network data to/from the client will use data.<client_uuid>
-    data_logger = logging.getLogger("data")
-    data_logger.setLevel(logging.INFO)
-    data_logger_file_handler = logging.handlers.TimedRotatingFileHandler(
-        data_logger_log_file_path, when="midnight"
-    )
-    data_logger_file_handler.formatter = logging.Formatter(
-        "%(asctime)s : %(name)-11s - %(message)s"
-    )
-    data_logger.addHandler(data_logger_file_handler)
-    data_logger.propagate = False
+    # Network data from the mud and the clients is captured to facilitate
+    # debugging, see libs/net/capture.py. Each block of records is written to
+    # the capture file on the writer thread, use scripts/export_capture.py to
+    # read it.
+    capture_handler = CaptureHandler(data_capture_file_path)
+    LOG_WRITER.add_handler(capture_handler)
+    # blocks dropped for the capture file are also warned about in the main log
+    LOG_WRITER.warning_handler = file_target
+
+    def write_capture_block(block: bytes) -> None:
+        LOG_WRITER.put(capture_handler, logging.makeLogRecord({"msg": block}))
+
+    LOG_WRITER.start()
+    CAPTURE.start(write_capture_block)
+
+
+# pass the last block to the writer before it is stopped at exit
+atexit.register(CAPTURE.stop)
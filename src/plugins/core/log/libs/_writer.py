@@ -0,0 +1,271 @@
+# Project: bastproxy
+# Filename: plugins/core/log/libs/_writer.py
+#
+# File Description: write log records to files on a background thread
+#
+# By: Bast
+"""Module for writing log records to files off the event loop.
+
+Writing to a log file, and rotating it, can block on a slow disk. The file
+handlers used by the proxy are not attached to loggers directly. A
+`QueuedLogHandler` is attached instead, it formats the message of a record on
+the event loop and puts it on the queue of a `LogWriter`, whose thread
+passes it to the file handler.
+
+Key Components:
+    - LogWriter: A bounded queue of records and the thread that writes them.
+    - QueuedLogHandler: A handler that queues records for a file handler.
+    - BatchedFileHandler: A rotating file handler that flushes once for each
+        batch of records instead of once for each record.
+
+Features:
+    - The event loop never waits on the disk, putting a record on the queue
+        does not block.
+    - When the queue is full, new records are dropped and counted. A warning
+        with the number dropped is written when there is room again, to the
+        handler that dropped them and to the warning handler (the main log
+        file).
+    - The writer takes every record that is waiting, writes them, and then
+        flushes each file once.
+    - `flush` waits for the records queued so far to be written, `stop`
+        writes everything that is queued and closes the file handlers.
+
+Usage:
+    - The log plugin adds its file handlers to `LOG_WRITER` and starts it when
+        the loggers are set up.
+    - `LOG_WRITER` is stopped when the proxy exits.
+
+Classes:
+    - `LogWriter`: Writes queued records on a background thread.
+    - `QueuedLogHandler`: Queues records for a file handler.
+    - `BatchedFileHandler`: Flushes a rotating log file once for each batch.
+
+"""
+
+# Standard Library
+import atexit
+import contextlib
+import logging
+import logging.handlers
+import queue
+import threading
+
+# 3rd Party
+# Project
+
+# the most records that can wait to be written
+LOG_QUEUE_SIZE = 10000
+
+# the most records written before the files are flushed
+LOG_BATCH_SIZE = 500
+
+# put on the queue to stop the writer thread
+_STOP = object()
+
+
+class BatchedFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """A rotating file handler that only flushes at the end of a batch.
+
+    The file is still flushed when it is closed, such as when it is rotated.
+    """
+
+    def flush(self):
+        """Do nothing, the writer flushes at the end of each batch."""
+
+    def flush_batch(self):
+        """Flush the records written in this batch."""
+        super().flush()
+
+
+class LogWriter:
+    """Write queued log records to their file handlers on a background thread."""
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE):
+        """Initialize the writer, the thread is not started.
+
+        Args:
+            maxsize: The most records that can wait to be written.
+
+        """
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        # file handler: the number of records dropped since the last warning
+        self.dropped: dict[logging.Handler, int] = {}
+        self.handlers: list[logging.Handler] = []
+        # also gets the warnings for records dropped for the other handlers
+        self.warning_handler: logging.Handler | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Return True if the writer thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_handler(self, handler: logging.Handler) -> None:
+        """Add a file handler that records will be written to.
+
+        Args:
+            handler: The file handler, it should only be used by the writer.
+
+        """
+        self.handlers.append(handler)
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="bastproxy log writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write the queued records, stop the thread and close the handlers."""
+        if self.running:
+            self.queue.put(_STOP)
+            self._thread.join()  # type: ignore[union-attr]
+        self._thread = None
+        for handler in self.handlers:
+            handler.close()
+        self.handlers = []
+        self.warning_handler = None
+
+    def flush(self, timeout: float = 5) -> bool:
+        """Wait for the records queued so far to be written.
+
+        Args:
+            timeout: The most seconds to wait.
+
+        Returns:
+            True if the records were written, False if it timed out.
+
+        """
+        if not self.running:
+            return True
+        written = threading.Event()
+        try:
+            self.queue.put((None, written), timeout=timeout)
+        except queue.Full:
+            return False
+        return written.wait(timeout)
+
+    def put(self, handler: logging.Handler, record: logging.LogRecord) -> None:
+        """Queue a record to be written by a file handler.
+
+        If the writer is not running, the record is written right away.
+
+        Args:
+            handler: The file handler to write the record with.
+            record: The record, its message should already be formatted.
+
+        """
+        if not self.running:
+            handler.handle(record)
+            return
+        try:
+            if dropped := self.dropped.get(handler):
+                self._put_dropped_warnings(handler, dropped)
+            self.queue.put_nowait((handler, record))
+        except queue.Full:
+            self.dropped[handler] = self.dropped.get(handler, 0) + 1
+
+    def _put_dropped_warnings(self, handler: logging.Handler, dropped: int) -> None:
+        """Queue the warnings for records dropped for a handler.
+
+        Raises:
+            queue.Full: If there is no room for all the warnings, nothing is
+                queued and the records are still counted.
+
+        """
+        items = [(handler, self._dropped_record(dropped))]
+        if self.warning_handler is not None and self.warning_handler is not handler:
+            name = handler.get_name() or type(handler).__name__
+            items.append(
+                (self.warning_handler, self._dropped_record(dropped, f" for {name}"))
+            )
+        # queue all of them or none, so a warning is not written twice
+        if self.queue.maxsize and (
+            self.queue.maxsize - self.queue.qsize() < len(items)
+        ):
+            raise queue.Full
+        for item in items:
+            self.queue.put_nowait(item)
+        del self.dropped[handler]
+
+    def _dropped_record(self, dropped: int, target: str = "") -> logging.LogRecord:
+        """Build the warning for records that were dropped."""
+        return logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": (
+                    f"the log queue was full, {dropped} records{target} were not"
+                    " written"
+                ),
+                "dropped": dropped,
+            }
+        )
+
+    def _run(self) -> None:
+        """Write batches of records until the writer is stopped."""
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            written = set()
+            waiting = []
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                    continue
+                handler, record = item
+                if handler is None:
+                    waiting.append(record)
+                    continue
+                try:
+                    handler.handle(record)
+                except Exception:  # pylint: disable=broad-except
+                    handler.handleError(record)
+                written.add(handler)
+
+            for handler in written:
+                with contextlib.suppress(OSError, ValueError):
+                    getattr(handler, "flush_batch", handler.flush)()
+            for event in waiting:
+                event.set()
+
+
+class QueuedLogHandler(logging.handlers.QueueHandler):
+    """Queue records to be written by a file handler on the writer thread.
+
+    The message of a record is formatted when it is queued, the file handler
+    formats the rest of the line on the writer thread.
+    """
+
+    def __init__(self, writer: LogWriter, target: logging.Handler):
+        """Initialize the handler.
+
+        Args:
+            writer: The writer that owns the queue.
+            target: The file handler that writes the records.
+
+        """
+        super().__init__(writer.queue)
+        self.writer = writer
+        self.target = target
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the writer's queue for the file handler."""
+        self.writer.put(self.target, record)
+
+
+LOG_WRITER = LogWriter()
+
+# stop before logging.shutdown, which was registered first, so the queued
+# records are written
+atexit.register(LOG_WRITER.stop)
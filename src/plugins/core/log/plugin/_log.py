@@ -10,16 +10,22 @@ import logging
 import numbers
 
 from libs.api import AddAPI
+from libs.net.capture import CAPTURE
 
 # 3rd Party
 # Project
-from libs.persistentdict import PersistentDict
-from libs.records import RMANAGER, LogRecord
+from libs.persistentdict import KeySchema, PersistentDict
+from libs.records import LOGLEVELS, RMANAGER, LogRecord
 from plugins._baseplugin import BasePlugin, RegisterPluginHook
 from plugins.core.commands import AddArgument, AddParser
 from plugins.core.events import RegisterToEvent
 from plugins.core.log import get_toplevel
-from plugins.core.log.libs._custom_logger import setup_loggers, type_counts
+from plugins.core.log.libs._custom_logger import (
+    get_type_counts,
+    setup_loggers,
+    type_counts,
+)
+from plugins.core.log.libs._writer import LOG_WRITER
 
 
 class LogPlugin(BasePlugin):
@@ -39,16 +45,19 @@ class LogPlugin(BasePlugin):
             self.plugin_id,
             self.plugin_info.data_directory / "logtypes_to_client.txt",
             "c",
+            key_schema=KeySchema(),
         )
         self.handlers["console"] = PersistentDict(
             self.plugin_id,
             self.plugin_info.data_directory / "logtypes_to_console.txt",
             "c",
+            key_schema=KeySchema(),
         )
         self.handlers["file"] = PersistentDict(
             self.plugin_id,
             self.plugin_info.data_directory / "logtypes_to_file.txt",
             "c",
+            key_schema=KeySchema(),
         )
 
     @RegisterPluginHook("__init__", priority=99)
@@ -60,6 +69,8 @@ class LogPlugin(BasePlugin):
             "setting up custom logging", level="debug", sources=[self.plugin_id]
         )()
         setup_loggers(logging.DEBUG)
+        # records below the lowest level of all handlers are not built
+        LOGLEVELS.set_resolver(self.get_lowest_level)
 
     @RegisterPluginHook("initialize")
     def _phook_initialize(self):
@@ -141,6 +152,40 @@ class LogPlugin(BasePlugin):
             case _:
                 return ""
 
+    def get_handler_level(self, handler, logger_name):
+        """Get the level a toplevel logger logs at to the console or file.
+
+        if the logger hasn't been seen, it will default to logging.INFO
+        """
+        if logger_name not in self.handlers[handler]:
+            self.handlers[handler][logger_name] = "info"
+            self.handlers[handler].sync()
+
+        return getattr(
+            logging, self.handlers[handler][logger_name].upper(), logging.INFO
+        )
+
+    def get_lowest_level(self, logger):
+        """Get the lowest level a logger logs at to any handler.
+
+        errors are always logged to the client
+
+        returns the level and the counts of each level for the logger
+        """
+        logger_name = get_toplevel(logger)
+        levels = [
+            self.get_handler_level("console", logger_name),
+            self.get_handler_level("file", logger_name),
+            logging.ERROR,
+        ]
+        if logger_name in self.handlers["client"]:
+            levels.append(
+                getattr(
+                    logging, self.handlers["client"][logger_name].upper(), logging.INFO
+                )
+            )
+        return min(levels), get_type_counts(logger_name)
+
     @AddAPI(
         "can.log.to.console", description="check if a logger can log to the console"
     )
@@ -149,15 +194,7 @@ class LogPlugin(BasePlugin):
 
         if the logger hasn't been seen, it will default to logging.INFO
         """
-        logger_name = get_toplevel(logger)
-        if logger_name not in self.handlers["console"]:
-            self.handlers["console"][logger_name] = "info"
-            self.handlers["console"].sync()
-
-        convlevel = getattr(
-            logging, self.handlers["console"][logger_name].upper(), logging.INFO
-        )
-        return level >= convlevel
+        return level >= self.get_handler_level("console", get_toplevel(logger))
 
     @AddAPI("can.log.to.file", description="check if a logger can log to file")
     def _api_can_log_to_file(self, logger, level):
@@ -165,15 +202,7 @@ class LogPlugin(BasePlugin):
 
         if the logger hasn't been seen, it will default to logging.INFO
         """
-        logger_name = get_toplevel(logger)
-        if logger_name not in self.handlers["file"]:
-            self.handlers["file"][logger_name] = "info"
-            self.handlers["file"].sync()
-
-        convlevel = getattr(
-            logging, self.handlers["file"][logger_name].upper(), logging.INFO
-        )
-        return level >= convlevel
+        return level >= self.get_handler_level("file", get_toplevel(logger))
 
     @AddAPI("can.log.to.client", description="check if a logger can log to the client")
     def _api_can_log_to_client(self, logger, level):
@@ -229,6 +258,7 @@ class LogPlugin(BasePlugin):
             )()
 
         self.handlers["client"].sync()
+        LOGLEVELS.clear()
 
     @AddParser(
         description="""toggle logtypes to clients
@@ -312,6 +342,7 @@ class LogPlugin(BasePlugin):
             return
 
         self.handlers["console"][logger_name] = level
+        LOGLEVELS.clear()
         LogRecord(
             f"setting {logger_name} to log to console at level {level}",
             level="debug",
@@ -388,6 +419,7 @@ class LogPlugin(BasePlugin):
 
         logger_name = get_toplevel(logtype)
         self.handlers["file"][logger_name] = level
+        LOGLEVELS.clear()
         LogRecord(
             f"setting {logger_name} to log to file at level {level}",
             level="debug",
@@ -550,6 +582,7 @@ class LogPlugin(BasePlugin):
                 del self.handlers["file"][i]
             if i in self.type_counts:
                 del self.type_counts[i]
+        LOGLEVELS.clear()
 
         self.handlers["file"].sync()
         self.handlers["client"].sync()
@@ -559,8 +592,10 @@ class LogPlugin(BasePlugin):
 
     @RegisterToEvent(event_name="ev_plugins.core.proxy_shutdown")
     def _eventcb_proxy_shutdown(self):
-        """Clean up log types."""
+        """Clean up log types and write the queued log records and network data."""
         self.api(f"{self.plugin_id}:clean.types")()
+        CAPTURE.flush()
+        LOG_WRITER.flush()
 
     @AddParser(description="remove log types that have not been used")
     def _command_clean(self):
@@ -22,3 +22,7 @@ class SettingInfo:
         self.readonly = kwargs.get("readonly", False)
         self.hidden = kwargs.get("hidden", False)
         self.aftersetmessage = kwargs.get("aftersetmessage", "")
+        # volatile settings are kept in memory and never saved
+        self.volatile = kwargs.get("volatile", False)
+        # don't raise a modified event when the setting changes
+        self.noevent = kwargs.get("noevent", False)
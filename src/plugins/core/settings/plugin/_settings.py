@@ -6,6 +6,7 @@
 # By: Bast
 
 # Standard Library
+import asyncio
 import contextlib
 import textwrap
 from pathlib import Path
@@ -15,7 +16,7 @@ from libs import argp
 # 3rd Party
 # Project
 from libs.api import AddAPI
-from libs.persistentdict import PersistentDict
+from libs.persistentdict import KeySchema, PersistentDict
 from libs.records import LogRecord
 from plugins._baseplugin import BasePlugin, RegisterPluginHook
 from plugins.core.commands import AddArgument, AddCommand, AddParser
@@ -41,6 +42,78 @@ class SettingsPlugin(BasePlugin):
         # the value is a PersistentDict object
         self.settings_values = {}
 
+        # a dictionary of volatile settings values with plugin_id as key
+        # the value is a dict of setting names to values, these are never saved
+        self.volatile_values = {}
+
+        # plugin_ids with changed settings that have not been saved
+        self.unsaved_plugins = set()
+
+        # the task that saves changed settings after the save delay
+        self.save_task = None
+
+    @RegisterPluginHook("initialize")
+    def _phook_initialize(self):
+        """Initialize the plugin."""
+        self.api("plugins.core.settings:add")(
+            self.plugin_id,
+            "savedelay",
+            5.0,
+            float,
+            "seconds to collect setting changes before saving them, 0 to save right away",
+        )
+
+    @RegisterPluginHook("save")
+    def _phook_save(self):
+        """Save the settings of all plugins with changes."""
+        self.api(f"{self.plugin_id}:save.changed")()
+
+    @RegisterToEvent(event_name="ev_plugins.core.proxy_shutdown")
+    def _eventcb_settings_shutdown(self):
+        """Save the settings of all plugins with changes on shutdown."""
+        self.api(f"{self.plugin_id}:save.changed")()
+
+    def save_later(self, plugin_id):
+        """Save the settings for a plugin after the save delay.
+
+        Changes to any plugin during the delay are saved together. If the delay
+        is 0 or there is no event loop, the settings are saved right away.
+        """
+        save_delay = self.settings_values.get(self.plugin_id, {}).get("savedelay", 0)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            save_delay = 0
+        if save_delay <= 0:
+            self.settings_values[plugin_id].sync()
+            self.unsaved_plugins.discard(plugin_id)
+            return
+
+        self.unsaved_plugins.add(plugin_id)
+        if self.save_task is None:
+            self.save_task = self.api("libs.asynch:task.add")(
+                self.save_after_delay, "Settings save task"
+            )
+
+    async def save_after_delay(self):
+        """Save the changed settings once the save delay has passed."""
+        try:
+            await asyncio.sleep(
+                self.settings_values[self.plugin_id].get("savedelay", 0)
+            )
+        finally:
+            # a cancelled or failed task must not stop the next save
+            self.save_task = None
+        self.api(f"{self.plugin_id}:save.changed")()
+
+    @AddAPI("save.changed", description="save the settings of plugins with changes")
+    def _api_save_changed(self):
+        """Save the settings of all plugins with changes that have not been saved."""
+        for plugin_id in sorted(self.unsaved_plugins):
+            if plugin_id in self.settings_values:
+                self.settings_values[plugin_id].sync()
+        self.unsaved_plugins.clear()
+
     @AddAPI("add", description="add a setting to a plugin")
     def _api_add(self, plugin_id, setting_name, default, stype, help, **kwargs):
         """@Yplugin_id@w     = the plugin_id of the owner of the setting.
@@ -54,6 +127,9 @@ class SettingsPlugin(BasePlugin):
           @Yreadonly@w   = if True, can't be changed by a client
           @Yhidden@w     = if True, don't show in @Ysettings@w command
           @Yaftersetmessage@w = message to send to client after setting is changed.
+          @Yvolatile@w   = if True, keep the value in memory only, it is not
+                           saved and is reset on restart
+          @Ynoevent@w    = if True, don't raise an event when the setting changes
         """
         LogRecord(
             f"setting {plugin_id}.{setting_name} {default} {stype} {help} {kwargs}",
@@ -92,11 +168,18 @@ class SettingsPlugin(BasePlugin):
         if plugin_id not in self.settings_values:
             data_directory = self.api(f"{plugin_id}:get.data.directory")()
             settings_file: Path = data_directory / "settingvalues.txt"
+            # setting values are not dicts, only the setting names are keys
             self.settings_values[plugin_id] = PersistentDict(
-                plugin_id, settings_file, "c"
+                plugin_id, settings_file, "c", key_schema=KeySchema()
             )
 
-        if setting_name not in self.settings_values[plugin_id]:
+        if setting_info.volatile:
+            self.volatile_values.setdefault(plugin_id, {})[setting_name] = (
+                setting_info.default
+            )
+            # remove a value that was saved before the setting was volatile
+            self.settings_values[plugin_id].pop(setting_name, None)
+        elif setting_name not in self.settings_values[plugin_id]:
             self.settings_values[plugin_id][setting_name] = setting_info.default
 
         self.settings_info[plugin_id][setting_name] = setting_info
@@ -113,6 +196,12 @@ class SettingsPlugin(BasePlugin):
         """
         returnval = None
 
+        if (
+            plugin_id in self.volatile_values
+            and setting in self.volatile_values[plugin_id]
+        ):
+            return self.volatile_values[plugin_id][setting]
+
         with contextlib.suppress(KeyError):
             returnval = (
                 self.api("plugins.core.utils:verify.value")(
@@ -158,10 +247,16 @@ class SettingsPlugin(BasePlugin):
         """Reset all settings for a plugin to their default values."""
         self.settings_values[plugin_id].clear()
         for i in self.settings_info[plugin_id]:
+            if self.settings_info[plugin_id][i].volatile:
+                self.volatile_values[plugin_id][i] = self.settings_info[plugin_id][
+                    i
+                ].default
+                continue
             self.settings_values[plugin_id][i] = self.settings_info[plugin_id][
                 i
             ].default
         self.settings_values[plugin_id].sync()
+        self.unsaved_plugins.discard(plugin_id)
 
     @AddAPI("change", description="change the value of a setting")
     def _api_setting_change(self, plugin_id, setting, value):
@@ -180,11 +275,20 @@ class SettingsPlugin(BasePlugin):
         if setting not in self.settings_info[plugin_id]:
             return False
 
+        setting_info = self.settings_info[plugin_id][setting]
+
         if value == "default":
-            value = self.settings_info[plugin_id][setting].default
+            value = setting_info.default
+        elif (
+            setting_info.volatile
+            and isinstance(setting_info.stype, type)
+            and isinstance(value, setting_info.stype)
+        ):
+            # internal callers of volatile settings already pass the right type
+            pass
         elif self.api("libs.plugins.loader:is.plugin.loaded")("plugins.core.utils"):
             value = self.api("plugins.core.utils:verify.value")(
-                value, self.settings_info[plugin_id][setting].stype
+                value, setting_info.stype
             )
 
         old_value = self.api("plugins.core.settings:get")(plugin_id, setting)
@@ -192,11 +296,15 @@ class SettingsPlugin(BasePlugin):
         if old_value == value:
             return True
 
-        self.settings_values[plugin_id][setting] = value
-        self.settings_values[plugin_id].sync()
+        if setting_info.volatile:
+            self.volatile_values[plugin_id][setting] = value
+        else:
+            self.settings_values[plugin_id][setting] = value
+            self.save_later(plugin_id)
 
         if (
-            self.api("libs.plugins.loader:is.plugin.loaded")(plugin_id)
+            setting_info.noevent
+            or not self.api("libs.plugins.loader:is.plugin.loaded")(plugin_id)
             # or self.api("libs.plugins.loader:is.plugin.instantiated")(plugin_id)
             or self.api("plugins.core.settings:is.setting.hidden")(plugin_id, setting)
         ):
@@ -243,7 +351,10 @@ class SettingsPlugin(BasePlugin):
             self.settings_info[plugin_id] = {}
 
         for i in self.settings_info[plugin_id]:
-            if self.api("plugins.core.settings:is.setting.hidden")(plugin_id, i):
+            if (
+                self.api("plugins.core.settings:is.setting.hidden")(plugin_id, i)
+                or self.settings_info[plugin_id][i].noevent
+            ):
                 continue
             self.api("plugins.core.events:add.event")(
                 f"ev_{plugin_id}_var_{i}_modified",
@@ -272,9 +383,11 @@ class SettingsPlugin(BasePlugin):
                 del self.settings_map[i]
 
         del self.settings_info[plugin_id]
+        self.volatile_values.pop(plugin_id, None)
 
         self.settings_values[plugin_id].close()
         del self.settings_values[plugin_id]
+        self.unsaved_plugins.discard(plugin_id)
 
     @AddAPI("save.plugin", description="save the settings for a plugin")
     def _api_save_plugin(self, plugin_id):
@@ -285,6 +398,7 @@ class SettingsPlugin(BasePlugin):
             sources=[self.plugin_id, plugin_id],
         )()
         self.settings_values[plugin_id].sync()
+        self.unsaved_plugins.discard(plugin_id)
 
     @AddAPI("get.all.for.plugin", description="get all settings for a plugin")
     def _api_get_all_for_plugin(self, plugin_id):
@@ -301,7 +415,10 @@ class SettingsPlugin(BasePlugin):
         )()
         old_value = "__init__"
         for i in self.settings_info[plugin_id]:
-            if self.api("plugins.core.settings:is.setting.hidden")(plugin_id, i):
+            if (
+                self.api("plugins.core.settings:is.setting.hidden")(plugin_id, i)
+                or self.settings_info[plugin_id][i].noevent
+            ):
                 continue
             event_name = f"ev_{plugin_id}_var_{i}_modified"
             new_value = self.api("plugins.core.settings:get")(plugin_id, i)
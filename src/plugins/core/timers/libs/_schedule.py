@@ -0,0 +1,133 @@
+# Project: bastproxy
+# Filename: plugins/core/timers/libs/_schedule.py
+#
+# File Description: a heap of timers ordered by the time they fire
+#
+# By: Bast
+"""Module for keeping timers in the order they fire.
+
+This module provides the `TimerSchedule` class, which the timers plugin uses
+to find the next timer to fire without looking at every timer or every
+second. Timers are kept in a min-heap of (fire time, sequence, timer), so the
+next fire time is always the first entry.
+
+Key Components:
+    - TimerSchedule: A min-heap of items keyed by the time they fire.
+
+Features:
+    - Adding a timer is O(log n) and removing one is O(1).
+    - Removed timers are marked and dropped when they reach the top of the
+        heap, the heap is rebuilt when more than half of it is removed timers.
+    - Fire times are floats, so timers can fire more than once a second.
+    - Timers that fire at the same time are returned in the order they were
+        added.
+
+Usage:
+    - Use `add` to schedule a timer at a timestamp and `remove` to unschedule it.
+    - Call `next_time` to find out how long to sleep.
+    - Call `pop_due` with the current time to get the timers to fire.
+
+Classes:
+    - `TimerSchedule`: Keeps timers in the order they fire.
+
+"""
+
+# Standard Library
+import heapq
+import itertools
+from typing import Any
+
+# 3rd Party
+# Project
+
+
+class TimerSchedule:
+    """A min-heap of items keyed by the time they fire.
+
+    Each item is in the schedule at most once. Items are tracked by identity,
+    so they do not need to be hashable.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty schedule."""
+        # [fire time, sequence, item], item is None for a removed entry
+        self.heap: list[list[Any]] = []
+        # id(item): its entry in the heap
+        self._entries: dict[int, list[Any]] = {}
+        self._sequence = itertools.count()
+        self._removed = 0
+
+    def __len__(self) -> int:
+        """Return the number of items in the schedule."""
+        return len(self._entries)
+
+    def __contains__(self, item: Any) -> bool:
+        """Check if an item is in the schedule."""
+        return id(item) in self._entries
+
+    def add(self, item: Any, when: float) -> bool:
+        """Schedule an item, moving it if it is already scheduled.
+
+        Args:
+            item: The item to schedule.
+            when: The timestamp the item fires at.
+
+        Returns:
+            True if the item is now the next one to fire, False otherwise.
+
+        """
+        self.remove(item)
+        entry = [when, next(self._sequence), item]
+        self._entries[id(item)] = entry
+        heapq.heappush(self.heap, entry)
+        return self.heap[0] is entry
+
+    def remove(self, item: Any) -> bool:
+        """Remove an item from the schedule.
+
+        Args:
+            item: The item to remove.
+
+        Returns:
+            True if the item was scheduled, False otherwise.
+
+        """
+        if (entry := self._entries.pop(id(item), None)) is None:
+            return False
+        entry[2] = None
+        self._removed += 1
+        if self._removed > len(self.heap) // 2:
+            self.heap = [kept for kept in self.heap if kept[2] is not None]
+            heapq.heapify(self.heap)
+            self._removed = 0
+        return True
+
+    def _drop_removed(self) -> None:
+        """Pop removed entries from the top of the heap."""
+        while self.heap and self.heap[0][2] is None:
+            heapq.heappop(self.heap)
+            self._removed -= 1
+
+    def next_time(self) -> float | None:
+        """Return the timestamp of the next item to fire, None if it is empty."""
+        self._drop_removed()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: float) -> list[tuple[float, Any]]:
+        """Remove and return the items that fire at or before a time.
+
+        Args:
+            now: The current timestamp.
+
+        Returns:
+            A list of (fire time, item), in the order they fire.
+
+        """
+        due = []
+        self._drop_removed()
+        while self.heap and self.heap[0][0] <= now:
+            when, _, item = heapq.heappop(self.heap)
+            del self._entries[id(item)]
+            due.append((when, item))
+            self._drop_removed()
+        return due
@@ -7,8 +7,8 @@
 
 # Standard Library
 import asyncio
+import contextlib
 import datetime
-import math
 import sys
 import time
 from collections.abc import Callable
@@ -22,6 +22,10 @@ from libs.records import LogRecord
 from plugins._baseplugin import BasePlugin, RegisterPluginHook
 from plugins.core.commands import AddArgument, AddParser
 from plugins.core.events import RegisterToEvent
+from plugins.core.timers.libs._schedule import TimerSchedule
+
+# a timer that fires later than this, in seconds, is logged as late
+LATE_TIMER_WARNING = 1
 
 
 class Timer(Callback):
@@ -33,7 +37,7 @@ class Timer(Callback):
         Parameters:
         name (str): Name of the timer event.
         func (func): Function to execute on the timer event.
-        seconds (int): Time interval in seconds.
+        seconds (float): Time interval in seconds, it can be less than a second.
         plugin (obj): Plugin related to the timer event.
         **kwargs (Optional): Additional keyword arguments
             onetime (bool): True if the timer is one-time only. Defaults to False.
@@ -42,7 +46,7 @@ class Timer(Callback):
             log (bool): True if the timer should show up in the logs. Defaults to True.
         """
         super().__init__(name, plugin_id, func, enabled)
-        self.seconds: int = seconds
+        self.seconds: float = seconds
         self.api = API(owner_id=f"{plugin_id}:Timer:{name}")
 
         self.onetime: bool = False
@@ -73,9 +77,13 @@ class Timer(Callback):
         if self.time:
             hour_minute = time.strptime(self.time, "%H%M")
             new_date = now.replace(
-                hour=hour_minute.tm_hour, minute=hour_minute.tm_min, second=0
+                hour=hour_minute.tm_hour,
+                minute=hour_minute.tm_min,
+                second=0,
+                microsecond=0,
             )
-            while new_date < now:
+            # a timer that fired this second is due again tomorrow
+            while new_date <= now:
                 new_date = new_date + datetime.timedelta(days=1)
 
         else:
@@ -93,14 +101,24 @@ class Timer(Callback):
         now = datetime.datetime.now(datetime.UTC)
         if not self.last_fired_datetime:
             return self.get_first_fire()
-        next_fire = self.last_fired_datetime + datetime.timedelta(seconds=self.seconds)
-        while next_fire < now:
-            next_fire = next_fire + datetime.timedelta(seconds=self.seconds)
+        # count from when the timer was due, a time of day timer that fired
+        # early in its minute would otherwise be due again right away
+        interval = (
+            datetime.timedelta(days=1)
+            if self.time
+            else datetime.timedelta(seconds=self.seconds)
+        )
+        next_fire = self.last_fired_datetime + interval
+        if next_fire < now:
+            # skip every interval that was missed, such as while the proxy
+            # was suspended, without stepping through them one at a time
+            missed = -((next_fire - now) // interval)
+            next_fire = next_fire + missed * interval
         return next_fire
 
     def __str__(self) -> str:
         """Return a string representation of the timer."""
-        return f"Timer {self.name:<10} : {self.owner_id:<15} : {self.seconds:05d} : {self.enabled:<6} : {self.next_fire_datetime.strftime(self.api.time_format)}"
+        return f"Timer {self.name:<10} : {self.owner_id:<15} : {self.seconds:05} : {self.enabled:<6} : {self.next_fire_datetime.strftime(self.api.time_format)}"
 
 
 class TimersPlugin(BasePlugin):
@@ -111,10 +129,13 @@ class TimersPlugin(BasePlugin):
         """Initialize the instance."""
         self.can_reload_f: bool = False
 
-        self.timer_events: dict[int, list[Timer]] = {}
+        # the timers in the order they fire
+        self.timer_schedule: TimerSchedule = TimerSchedule()
         self.timer_lookup: dict[str, Timer] = {}
         self.overall_fire_count: int = 0
         self.time_last_checked: datetime.datetime = datetime.datetime.now(datetime.UTC)
+        # set to wake the timer task when a timer is added that fires first
+        self.timer_wakeup: asyncio.Event = asyncio.Event()
 
     @RegisterPluginHook("initialize")
     def _phook_initialize(self):
@@ -182,7 +203,7 @@ class TimersPlugin(BasePlugin):
                 "Enabled": enabled,
                 "Disabled": disabled,
                 "Fired": self.overall_fire_count,
-                "Memory Usage": sys.getsizeof(self.timer_events),
+                "Memory Usage": sys.getsizeof(self.timer_schedule.heap),
             }
 
     @RegisterToEvent(event_name="ev_plugin_stats")
@@ -333,13 +354,14 @@ class TimersPlugin(BasePlugin):
 
     @AddAPI("add.timer", description="add a timer")
     def _api_add_timer(
-        self, name: str, func: Callable, seconds: int, **kwargs
+        self, name: str, func: Callable, seconds: float, **kwargs
     ) -> Timer | None:
         """Add a timer.
 
         @Yname@w   = The timer name
         @Yfunc@w  = the function to call when firing the timer
-        @Yseconds@w   = the interval (in seconds) to fire the timer
+        @Yseconds@w   = the interval (in seconds) to fire the timer, it can
+                        be less than a second
         @Yargs@w arguments:
           @Yunique@w    = True if no duplicates of this timer are allowed,
                                         False otherwise
@@ -459,33 +481,25 @@ class TimersPlugin(BasePlugin):
 
     def _add_timer_internal(self, timer: Timer):
         """Internally add a timer."""
-        timer_next_time_to_fire = math.floor(timer.next_fire_datetime.timestamp())
-        if timer_next_time_to_fire != -1:
-            if timer_next_time_to_fire not in self.timer_events:
-                self.timer_events[timer_next_time_to_fire] = []
-            self.timer_events[timer_next_time_to_fire].append(timer)
+        # a timer added with the name of another one replaces it
+        if (old_timer := self.timer_lookup.get(timer.name)) is not None:
+            self.timer_schedule.remove(old_timer)
+        if self.timer_schedule.add(timer, timer.next_fire_datetime.timestamp()):
+            self.timer_wakeup.set()
         self.timer_lookup[timer.name] = timer
 
     def _remove_timer_internal(self, timer: Timer):
         """Internally remove a timer."""
-        timer_next_time_to_fire = math.floor(timer.next_fire_datetime.timestamp())
-        if (
-            timer_next_time_to_fire != -1
-            and timer_next_time_to_fire in self.timer_events
-        ):
-            if timer in self.timer_events[timer_next_time_to_fire]:
-                self.timer_events[timer_next_time_to_fire].remove(timer)
-            if not self.timer_events[timer_next_time_to_fire]:
-                del self.timer_events[timer_next_time_to_fire]
-        if timer.name in self.timer_lookup:
+        self.timer_schedule.remove(timer)
+        if self.timer_lookup.get(timer.name) is timer:
             del self.timer_lookup[timer.name]
 
-    def execute_timer(self, time, timer: Timer):
+    def execute_timer(self, timer: Timer):
         """Executes and reschedules the given timer.
 
         Args:
-            time: The current time when the timer is being executed.
-            timer: The timer to be executed.
+            timer: The timer to be executed, it has already been taken out of
+                the schedule.
 
         Returns:
             None
@@ -495,6 +509,9 @@ class TimersPlugin(BasePlugin):
 
         """
         if timer.enabled:
+            # the next fire is counted from when the timer was due, so the
+            # interval does not drift by the time it takes to fire
+            timer.last_fired_datetime = timer.next_fire_datetime
             try:
                 timer.execute()
                 self.overall_fire_count = self.overall_fire_count + 1
@@ -511,14 +528,9 @@ class TimersPlugin(BasePlugin):
                     sources=[self.plugin_id, timer.owner_id],
                     exc_info=True,
                 )()
-        try:
-            self.timer_events[time].remove(timer)
-        except ValueError:
-            LogRecord(
-                f"check_for_timers_to_fire - timer {timer.name} did not exist in timerevents",
-                level="error",
-                sources=[self.plugin_id, timer.owner_id],
-            )()
+        if self.timer_lookup.get(timer.name) is not timer:
+            # the timer was removed or replaced while it was firing
+            return
         if not timer.onetime:
             timer.next_fire_datetime = timer.get_next_fire()
             if timer.log:
@@ -531,38 +543,47 @@ class TimersPlugin(BasePlugin):
         else:
             self.api(f"{self.plugin_id}:remove.timer")(timer.name)
 
+    def fire_due_timers(self, now: float):
+        """Fire the timers that are due at a time.
+
+        Args:
+            now: The current timestamp.
+
+        Returns:
+            None
+
+        """
+        for fire_time, timer in self.timer_schedule.pop_due(now):
+            if now - fire_time > LATE_TIMER_WARNING:
+                LogRecord(
+                    f"check_for_timers_to_fire - timer {timer.name} fired {now - fire_time:.2f} seconds late",
+                    level="warning",
+                    sources=[self.plugin_id, timer.owner_id],
+                )()
+            self.execute_timer(timer)
+
     async def check_for_timers_to_fire(self):
-        # this is a callback, so disable unused-argument
-        # pylint: disable=unused-argument,too-many-nested-blocks
-        """Check all timers."""
-        firstrun: bool = True
-        keepgoing: bool = True
-        while keepgoing:
-            now = datetime.datetime.now(datetime.UTC)
-            if now != self.time_last_checked:
-                if not firstrun:
-                    diff = now - self.time_last_checked
-                    if diff.total_seconds() > 1:
-                        LogRecord(
-                            f"check_for_timers_to_fire - timer had to check multiple seconds: {now - self.time_last_checked}",
-                            level="warning",
-                            sources=[self.plugin_id],
-                        )()
-                else:
-                    LogRecord(
-                        "Checking timers coroutine has started",
-                        level="debug",
-                        sources=[self.plugin_id],
-                    )()
-                firstrun = False
-                for i in range(
-                    math.floor(self.time_last_checked.timestamp()),
-                    math.floor(now.timestamp()) + 1,
-                ):
-                    if self.timer_events.get(i):
-                        for timer in self.timer_events[i][:]:
-                            self.execute_timer(i, timer)
-
-                self.time_last_checked = now
-
-            await asyncio.sleep(0.2)
+        """Fire timers when they are due.
+
+        The task sleeps until the next timer in the schedule is due. Adding a
+        timer that fires before that wakes it up, and it sleeps until a timer
+        is added when there are none.
+        """
+        LogRecord(
+            "Checking timers coroutine has started",
+            level="debug",
+            sources=[self.plugin_id],
+        )()
+        while True:
+            now = time.time()
+            self.fire_due_timers(now)
+            self.time_last_checked = datetime.datetime.fromtimestamp(now, datetime.UTC)
+
+            # clear before looking at the schedule, so a timer added after
+            # this is not missed
+            self.timer_wakeup.clear()
+            timeout = None
+            if (next_time := self.timer_schedule.next_time()) is not None:
+                timeout = max(next_time - time.time(), 0)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.timer_wakeup.wait(), timeout)
@@ -0,0 +1,603 @@
+# Project: bastproxy
+# Filename: plugins/core/triggers/libs/_matcher.py
+#
+# File Description: a multi-pattern matcher for trigger regexes
+#
+# By: Bast
+"""Module for matching a line against every trigger regex in a single pass.
+
+This module provides the `TriggerMatcher` class, which holds the compiled regexes
+used by the triggers plugin and returns every regex that matches a line instead
+of only the first alternative of one combined regex. Each regex is prefiltered
+by a literal it requires, either a prefix or a substring, so a line only runs
+the regexes that could possibly match it.
+
+Key Components:
+    - TriggerMatcher: A set-of-regexes matcher with literal prefilter indexes.
+    - extract_literal_prefix: A function to find the literal prefix of a regex.
+    - extract_required_literal: A function to find the longest literal that
+        must appear in every match of a regex.
+
+Features:
+    - All matching regexes are found for a line, not just the first one.
+    - Regexes that start with a literal are only run when the line starts with
+        that literal, looked up by prefix length in a dictionary.
+    - Regexes that only contain a literal somewhere are bucketed by a short
+        piece of the literal, so finding the literals in a line is a scan of the
+        line no matter how many regexes there are.
+    - Match objects are returned so the caller does not need to match again.
+    - Candidates can be checked one at a time in sorted order, so a caller can
+        stop before running the rest of the regexes.
+
+    - Each regex is compiled and indexed on its own, so adding or removing a
+        regex only touches the index buckets for that regex.
+
+Usage:
+    - Create a TriggerMatcher and use `add` and `remove` to manage regexes.
+    - Call `match` with a line to get a dict of regex ids to match objects.
+    - Call `candidates` and `get_pattern` to check regexes one at a time.
+
+Classes:
+    - `TriggerMatcher`: Matches a line against a set of regexes.
+
+"""
+
+# Standard Library
+import sys
+from typing import Any
+
+# 3rd Party
+try:
+    import regex as re
+except ImportError:
+    print("Please install required libraries. regex is missing.")
+    print("From the root of the project: uv sync --all-extras")
+    sys.exit(1)
+
+# Project
+
+# characters that end a literal run in a regex
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]|()")
+
+# quantifiers that make the previous character optional
+OPTIONAL_QUANTIFIERS = frozenset("*?{")
+
+# an inline flag group that turns on case insensitive or verbose matching
+INLINE_FLAGS_RE = re.compile(r"\(\?[a-zA-Z\-]*[ix]")
+
+# literals shorter than this are too common to be worth indexing
+MINIMUM_LITERAL_LENGTH = 2
+
+# the longest key used to bucket literals, shorter literals use their full length
+LITERAL_BUCKET_LENGTH = 4
+
+# a prefix at least this long is always preferred over a substring literal
+PREFERRED_PREFIX_LENGTH = 3
+
+
+def has_top_level_alternation(regex: str) -> bool:
+    """Check if a regex has an alternation outside of any group.
+
+    Args:
+        regex: The regex source to check.
+
+    Returns:
+        True if the regex has a top level alternation, False otherwise.
+
+    """
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(regex):
+        char = regex[index]
+        if char == "\\":
+            index += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # a ] right after the opening [ (or [^) is a literal
+            if regex[index + 1 : index + 2] == "^":
+                index += 1
+            if regex[index + 1 : index + 2] == "]":
+                index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        index += 1
+    return False
+
+
+def escape_length(regex: str, index: int) -> int:
+    r"""Get the length of the escape that starts at index in a regex.
+
+    Escapes such as \x41, \u00e9, \N{...}, \p{...} and \012 carry more
+    characters than the one after the backslash, none of them are literals.
+
+    Args:
+        regex: The regex source.
+        index: The index of the backslash.
+
+    Returns:
+        The number of characters in the escape, including the backslash.
+
+    """
+    escaped = regex[index + 1 : index + 2]
+    end = index + 2
+    if escaped == "x" and regex[end : end + 1] != "{":
+        end += 2
+    elif escaped == "u":
+        end += 4
+    elif escaped == "U":
+        end += 8
+    elif escaped in ("x", "N", "p", "P") and regex[end : end + 1] == "{":
+        closing = regex.find("}", end)
+        end = closing + 1 if closing != -1 else len(regex)
+    elif escaped in ("p", "P"):
+        end += 1
+    elif escaped in ("g", "k") and regex[end : end + 1] == "<":
+        closing = regex.find(">", end)
+        end = closing + 1 if closing != -1 else len(regex)
+    elif escaped.isdigit():
+        # an octal escape or a group reference, at most 3 digits
+        while end < index + 4 and regex[end : end + 1].isdigit():
+            end += 1
+    return min(end, len(regex)) - index
+
+
+def extract_literal_prefix(regex: str) -> str:
+    """Get the literal text that every match of a regex must start with.
+
+    The regex is assumed to be used with `match`, so it is anchored at the start
+    of the line. The extraction is conservative, if there is any doubt about a
+    character it is not included in the prefix.
+
+    Args:
+        regex: The regex source to extract the prefix from.
+
+    Returns:
+        The literal prefix, or an empty string if there is none.
+
+    """
+    if not regex or INLINE_FLAGS_RE.search(regex) or has_top_level_alternation(regex):
+        return ""
+
+    index = 0
+    if regex.startswith("^"):
+        index = 1
+    elif regex.startswith("\\A"):
+        index = 2
+
+    prefix: list[str] = []
+    while index < len(regex):
+        char = regex[index]
+        if char == "\\":
+            escaped = regex[index + 1 : index + 2]
+            # \d, \w, \b, \x41 and friends are not simple literals
+            if not escaped or escaped.isalnum():
+                break
+            char = escaped
+            next_index = index + 2
+        elif char in REGEX_METACHARACTERS:
+            break
+        else:
+            next_index = index + 1
+
+        quantifier = regex[next_index : next_index + 1]
+        if quantifier in OPTIONAL_QUANTIFIERS:
+            # the character may not be there at all
+            break
+        prefix.append(char)
+        if quantifier == "+":
+            # the character is there at least once, but nothing after it is known
+            break
+        index = next_index
+
+    return "".join(prefix)
+
+
+def extract_required_literal(regex: str) -> str:
+    """Get the longest literal that must appear in every match of a regex.
+
+    Only literals outside of groups and character classes are used, since a
+    group may be optional or part of an alternation.
+
+    Args:
+        regex: The regex source to extract the literal from.
+
+    Returns:
+        The longest required literal, or an empty string if there is none.
+
+    """
+    if not regex or INLINE_FLAGS_RE.search(regex) or has_top_level_alternation(regex):
+        return ""
+
+    runs: list[str] = []
+    current: list[str] = []
+
+    def end_run() -> None:
+        """Save the current run of literal characters."""
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(regex):
+        char = regex[index]
+        if char == "\\":
+            escaped = regex[index + 1 : index + 2]
+            if depth or in_class or not escaped or escaped.isalnum():
+                # skip the whole escape, the rest of \x41 is not a literal
+                end_run()
+                index += escape_length(regex, index)
+                continue
+            char = escaped
+            next_index = index + 2
+        elif in_class:
+            if char == "]":
+                in_class = False
+            index += 1
+            continue
+        elif char == "[":
+            end_run()
+            in_class = True
+            if regex[index + 1 : index + 2] == "^":
+                index += 1
+            if regex[index + 1 : index + 2] == "]":
+                index += 1
+            index += 1
+            continue
+        elif char == "(":
+            end_run()
+            depth += 1
+            index += 1
+            continue
+        elif char == ")":
+            depth -= 1
+            index += 1
+            continue
+        elif depth:
+            index += 1
+            continue
+        elif char == "{":
+            # skip the whole quantifier, the numbers in it are not literals
+            end_run()
+            closing = regex.find("}", index)
+            index = closing + 1 if closing != -1 else len(regex)
+            continue
+        elif char in REGEX_METACHARACTERS:
+            end_run()
+            index += 1
+            continue
+        else:
+            next_index = index + 1
+
+        quantifier = regex[next_index : next_index + 1]
+        if quantifier in OPTIONAL_QUANTIFIERS:
+            end_run()
+        else:
+            current.append(char)
+            if quantifier == "+":
+                end_run()
+        index = next_index
+
+    end_run()
+    return max(runs, key=len, default="")
+
+
+def literal_bucket(literal: str) -> str:
+    """Get the key used to bucket a literal.
+
+    The key is a piece of the literal that does not start with whitespace when
+    possible, since a line has a lot of pieces that start with a space.
+
+    Args:
+        literal: The literal to get the key for.
+
+    Returns:
+        The bucket key, which is always a substring of the literal.
+
+    """
+    stripped = literal.strip()
+    if len(stripped) >= LITERAL_BUCKET_LENGTH:
+        return stripped[:LITERAL_BUCKET_LENGTH]
+    return literal[:LITERAL_BUCKET_LENGTH]
+
+
+class TriggerMatcher:
+    """Match a line against a set of regexes and return every match."""
+
+    def __init__(self) -> None:
+        """Initialize the matcher.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        # key: regex_id, value: the compiled regex
+        self._compiled: dict[str, re.Pattern] = {}
+        # key: regex_id, value: the key the regex is sorted by in match results
+        self._order: dict[str, Any] = {}
+        self._order_count = 0
+        # key: regex_id, value: the literal prefix of the regex
+        self._prefixes: dict[str, str] = {}
+        # key: literal prefix, value: a set of regex_ids with that prefix
+        self._prefix_index: dict[str, set[str]] = {}
+        # the lengths of all prefixes in the prefix index, sorted
+        self._prefix_lengths: list[int] = []
+        # key: regex_id, value: the required literal of the regex
+        self._literals: dict[str, str] = {}
+        # key: required literal, value: a set of regex_ids with that literal
+        self._literal_index: dict[str, set[str]] = {}
+        # key: bucket key length, value: a dict of bucket keys to sets of literals
+        self._literal_buckets: dict[int, dict[str, set[str]]] = {}
+        # regex_ids that have no usable literal and must always be checked
+        self._unindexed: set[str] = set()
+
+    def __len__(self) -> int:
+        """Return the number of regexes in the matcher.
+
+        Returns:
+            The number of regexes.
+
+        """
+        return len(self._compiled)
+
+    def __contains__(self, regex_id: str) -> bool:
+        """Check if a regex is in the matcher.
+
+        Args:
+            regex_id: The id of the regex.
+
+        Returns:
+            True if the regex is in the matcher, False otherwise.
+
+        """
+        return regex_id in self._compiled
+
+    def add(self, regex_id: str, regex: str, order: Any = None) -> re.Pattern:
+        """Compile a regex and add it to the matcher.
+
+        Args:
+            regex_id: The id of the regex.
+            regex: The regex source.
+            order: The key used to sort this regex in match results, defaults
+                to the order the regexes were added in. All regexes in a
+                matcher should use the same type of key.
+
+        Returns:
+            The compiled regex.
+
+        Raises:
+            regex.error: If the regex cannot be compiled.
+
+        """
+        if regex_id in self._compiled:
+            self.remove(regex_id)
+
+        compiled = re.compile(regex)
+        self._compiled[regex_id] = compiled
+        if order is None:
+            self._order_count += 1
+            order = self._order_count
+        self._order[regex_id] = order
+
+        prefix = extract_literal_prefix(regex)
+        literal = extract_required_literal(regex)
+        if len(literal) < MINIMUM_LITERAL_LENGTH or (
+            len(prefix) >= min(len(literal), PREFERRED_PREFIX_LENGTH)
+        ):
+            literal = ""
+        else:
+            prefix = ""
+
+        if prefix:
+            self._prefixes[regex_id] = prefix
+            if prefix not in self._prefix_index:
+                self._prefix_index[prefix] = set()
+                self._update_prefix_lengths()
+            self._prefix_index[prefix].add(regex_id)
+        elif literal:
+            self._literals[regex_id] = literal
+            if literal not in self._literal_index:
+                self._literal_index[literal] = set()
+                bucket = literal_bucket(literal)
+                buckets = self._literal_buckets.setdefault(len(bucket), {})
+                buckets.setdefault(bucket, set()).add(literal)
+            self._literal_index[literal].add(regex_id)
+        else:
+            self._unindexed.add(regex_id)
+
+        return compiled
+
+    def remove(self, regex_id: str) -> None:
+        """Remove a regex from the matcher.
+
+        Args:
+            regex_id: The id of the regex.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        if regex_id not in self._compiled:
+            return
+
+        del self._compiled[regex_id]
+        del self._order[regex_id]
+        self._unindexed.discard(regex_id)
+        if prefix := self._prefixes.pop(regex_id, ""):
+            self._prefix_index[prefix].discard(regex_id)
+            if not self._prefix_index[prefix]:
+                del self._prefix_index[prefix]
+                self._update_prefix_lengths()
+        if literal := self._literals.pop(regex_id, ""):
+            self._literal_index[literal].discard(regex_id)
+            if not self._literal_index[literal]:
+                del self._literal_index[literal]
+                bucket = literal_bucket(literal)
+                buckets = self._literal_buckets[len(bucket)]
+                buckets[bucket].discard(literal)
+                if not buckets[bucket]:
+                    del buckets[bucket]
+                if not buckets:
+                    del self._literal_buckets[len(bucket)]
+
+    def clear(self) -> None:
+        """Remove all regexes from the matcher.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        self._compiled.clear()
+        self._order.clear()
+        self._prefixes.clear()
+        self._prefix_index.clear()
+        self._prefix_lengths = []
+        self._literals.clear()
+        self._literal_index.clear()
+        self._literal_buckets.clear()
+        self._unindexed.clear()
+
+    def set_order(self, regex_id: str, order: Any) -> None:
+        """Change the key a regex is sorted by without compiling it again.
+
+        Args:
+            regex_id: The id of the regex.
+            order: The new key used to sort the regex in match results.
+
+        Returns:
+            None
+
+        Raises:
+            KeyError: If the regex is not in the matcher.
+
+        """
+        if regex_id not in self._compiled:
+            raise KeyError(regex_id)
+        self._order[regex_id] = order
+
+    def get_order(self, regex_id: str) -> Any:
+        """Get the key a regex is sorted by.
+
+        Args:
+            regex_id: The id of the regex.
+
+        Returns:
+            The sort key of the regex.
+
+        """
+        return self._order[regex_id]
+
+    def get_pattern(self, regex_id: str) -> re.Pattern:
+        """Get the compiled regex for a regex id.
+
+        Args:
+            regex_id: The id of the regex.
+
+        Returns:
+            The compiled regex.
+
+        """
+        return self._compiled[regex_id]
+
+    def _update_prefix_lengths(self) -> None:
+        """Update the sorted list of prefix lengths from the prefix index.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefix_index})
+
+    def get_prefix(self, regex_id: str) -> str:
+        """Get the literal prefix that was found for a regex.
+
+        Args:
+            regex_id: The id of the regex.
+
+        Returns:
+            The literal prefix, or an empty string if there is none.
+
+        """
+        return self._prefixes.get(regex_id, "")
+
+    def get_literal(self, regex_id: str) -> str:
+        """Get the required literal that was found for a regex.
+
+        The literal is only set for regexes that are not indexed by prefix.
+
+        Args:
+            regex_id: The id of the regex.
+
+        Returns:
+            The required literal, or an empty string if there is none.
+
+        """
+        return self._literals.get(regex_id, "")
+
+    def candidates(self, line: str) -> list[str]:
+        """Get the regexes that could match a line, in sorted order.
+
+        Args:
+            line: The line to check.
+
+        Returns:
+            A list of regex ids.
+
+        """
+        candidates = set(self._unindexed)
+        line_length = len(line)
+        for length in self._prefix_lengths:
+            if length > line_length:
+                break
+            if regex_ids := self._prefix_index.get(line[:length]):
+                candidates.update(regex_ids)
+        for length, buckets in self._literal_buckets.items():
+            line_buckets = {
+                line[index : index + length]
+                for index in range(line_length - length + 1)
+            }
+            for bucket in line_buckets:
+                if literals := buckets.get(bucket):
+                    for literal in literals:
+                        if literal in line:
+                            candidates.update(self._literal_index[literal])
+        return sorted(candidates, key=self._order.__getitem__)
+
+    def match(self, line: str) -> dict[str, re.Match]:
+        """Match a line against all regexes.
+
+        Args:
+            line: The line to match.
+
+        Returns:
+            A dict of regex ids to match objects for every regex that matched,
+            in sorted order.
+
+        """
+        matches = {}
+        for regex_id in self.candidates(line):
+            if match := self._compiled[regex_id].match(line):
+                matches[regex_id] = match
+        return matches
@@ -6,7 +6,9 @@
 # By: Bast
 
 # Standard Library
+import heapq
 import sys
+from contextlib import contextmanager
 
 # 3rd Party
 try:
@@ -22,6 +24,7 @@ from libs.records import LogRecord
 from plugins._baseplugin import BasePlugin, RegisterPluginHook
 from plugins.core.commands import AddArgument, AddParser
 from plugins.core.events import RegisterToEvent
+from plugins.core.triggers.libs._matcher import TriggerMatcher
 
 
 class TriggerItem:
@@ -70,13 +73,14 @@ class TriggerItem:
         args["trigger_name"] = self.trigger_name
         args["trigger_id"] = self.trigger_id
 
-        args = self.api("plugins.core.events:raise.event")(
+        args = self.api.bind("plugins.core.events:raise.event")(
             self.event_name, event_args=args
         )
         LogRecord(
-            f"raisetrigger - trigger {self.trigger_id} raised event {self.event_name} with args {args}",
+            "raisetrigger - trigger %s raised event %s with args %s",
             level="debug",
             sources=[self.owner_id, "plugins.core.triggers"],
+            args=(self.trigger_id, self.event_name, args),
         )()
 
         return args
@@ -113,8 +117,16 @@ class TriggersPlugin(BasePlugin):
         # lookup for regex to regex_id
         self.regex_lookup_to_id = {}
 
-        # The compiled regex
-        self.created_regex: dict = {"created_regex": "", "created_regex_compiled": ""}
+        # The matcher that finds every regex that matches a line
+        self.matcher = TriggerMatcher()
+        # The dispatch table, the triggers for each regex sorted by priority
+        # key is regex_id
+        # value is a list of ((priority, regex order, position), trigger_id)
+        self.dispatch_table = {}
+        # regex_ids whose triggers changed since the matcher was last synced
+        self.changed_regex_ids = set()
+        # how many batch.changes blocks are open
+        self.batch_depth = 0
 
     @RegisterPluginHook("initialize")
     def _phook_initialize(self):
@@ -157,31 +169,78 @@ class TriggersPlugin(BasePlugin):
                 event_record["plugin_id"]
             )
 
-    def rebuild_regexes(self):
-        """Rebuild a regex for priority.
+    def mark_regex_changed(self, regex_id):
+        """Flag a regex so the matcher is updated for it before the next line.
 
-        will need a colored and a noncolored regex for each priority
+        Nothing is compiled here, so adding hundreds of triggers costs one
+        compile per regex when the next line comes in or a batch ends.
         """
-        if created_regex_list := [
-            f"(?P<{regex['regex_id']}>{regex['regex']})"
-            for regex in self.regexes.values()
-            if regex["triggers"]
-        ]:
-            self.created_regex["created_regex"] = "|".join(created_regex_list)
-            try:
-                self.created_regex["created_regex_compiled"] = re.compile(
-                    self.created_regex["created_regex"]
+        if regex_id:
+            self.changed_regex_ids.add(regex_id)
+
+    def sync_matcher(self):
+        """Update the matcher for every regex that changed since the last sync.
+
+        Only the changed regexes are added to or removed from the matcher, a
+        regex that does not compile only disables itself. The dispatch table
+        entry for each changed regex is rebuilt, and the regex is sorted in
+        the matcher by its highest priority trigger.
+        """
+        if not self.changed_regex_ids:
+            return
+        changed_regex_ids = self.changed_regex_ids
+        self.changed_regex_ids = set()
+        for regex_id in changed_regex_ids:
+            regex = self.regexes[regex_id]
+            dispatch = sorted(
+                (
+                    (self.triggers[trigger_id].priority, regex["order"], position),
+                    trigger_id,
                 )
-            except re.error:
-                LogRecord(
-                    "Could not compile created regex",
-                    level="error",
-                    sources=[self.plugin_id],
-                    exc_info=True,
-                )()
-        else:
-            self.created_regex["created_regex"] = ""
-            self.created_regex["created_regex_compiled"] = ""
+                for position, trigger_id in enumerate(regex["triggers"])
+                if trigger_id in self.triggers
+            )
+            if not dispatch:
+                self.dispatch_table.pop(regex_id, None)
+                self.matcher.remove(regex_id)
+                continue
+            self.dispatch_table[regex_id] = dispatch
+            if regex_id in self.matcher:
+                self.matcher.set_order(regex_id, dispatch[0][0])
+            else:
+                try:
+                    self.matcher.add(regex_id, regex["regex"], order=dispatch[0][0])
+                except re.error:
+                    LogRecord(
+                        f"Could not compile regex {regex_id} : {regex['regex']}",
+                        level="error",
+                        sources=[self.plugin_id],
+                        exc_info=True,
+                    )()
+
+    @AddAPI(
+        "batch.changes",
+        description="a context manager to update the matcher once after many trigger changes",
+    )
+    @contextmanager
+    def _api_batch_changes(self):
+        """Update the matcher once after a block of trigger changes.
+
+        Blocks can be nested, the matcher is synced when the outermost one
+        ends. Without a block the matcher is synced on the next line.
+
+        @Yexample@w:
+          with self.api("plugins.core.triggers:batch.changes")():
+              for name in names:
+                  self.api("plugins.core.triggers:trigger.add")(name, regex)
+        """
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                self.sync_matcher()
 
     @staticmethod
     def create_trigger_id(name, owner_id):
@@ -233,26 +292,19 @@ class TriggersPlugin(BasePlugin):
             )()
             return False
 
-        trigger_enabled = self.triggers[trigger_id].enabled
+        trigger = self.triggers[trigger_id]
 
         for key in trigger_data:
-            old_value = self.triggers[trigger_id][key]
+            old_value = getattr(trigger, key)
             new_value = trigger_data[key]
             if old_value == new_value:
                 continue
-            setattr(self.triggers[trigger_id], key, new_value)
             if key == "regex":
                 orig_regex = new_value
                 regex = re.sub(r"\?P\<.*?\>", "", orig_regex)
 
-                old_regex_id = self.triggers[trigger_id].regex_id
-                new_regex_id = self.find_regex_id(regex)
-
-                self.triggers[trigger_id].original_regex = orig_regex
                 try:
-                    self.triggers[trigger_id].original_regex_compiled = re.compile(
-                        orig_regex
-                    )
+                    trigger.original_regex_compiled = re.compile(orig_regex)
                 except Exception:  # pylint: disable=broad-except
                     LogRecord(
                         f"Could not compile regex for trigger: {trigger_name} : {orig_regex}",
@@ -268,22 +320,48 @@ class TriggersPlugin(BasePlugin):
                     sources=[self.plugin_id],
                 )()
 
-                if trigger_id in self.regexes[old_regex_id]["triggers"]:
-                    self.regexes[old_regex_id]["triggers"].remove(trigger_id)
-                if trigger_enabled:
-                    self.regexes[new_regex_id]["triggers"].append(trigger_id)
+                old_regex_id = trigger.regex_id
+                new_regex_id = self.find_regex_id(regex)
 
-                self.rebuild_regexes()
+                trigger.original_regex = orig_regex
+                trigger.regex = regex
+                trigger.regex_id = new_regex_id
+
+                # keep the enabled state the trigger had with the old regex
+                active = trigger.enabled
+                if old_regex_id:
+                    active = trigger_id in self.regexes[old_regex_id]["triggers"]
+                    if active:
+                        self.regexes[old_regex_id]["triggers"].remove(trigger_id)
+                        self.mark_regex_changed(old_regex_id)
+                if active:
+                    self.regexes[new_regex_id]["triggers"].append(trigger_id)
+                    self.mark_regex_changed(new_regex_id)
+                continue
 
-            if key == "group":
-                self.trigger_groups[old_value].remove(trigger_name)
-                if self.triggers[trigger_name].group not in self.trigger_groups:
-                    self.trigger_groups[self.triggers[trigger_name].group] = []
-                self.trigger_groups[self.triggers[trigger_name].group].append(
-                    trigger_name
-                )
+            setattr(trigger, key, new_value)
+            if key == "priority":
+                self.mark_regex_changed(trigger.regex_id)
+            elif key == "group":
+                if old_value in self.trigger_groups:
+                    self.trigger_groups[old_value].remove(trigger_id)
+                if new_value:
+                    if new_value not in self.trigger_groups:
+                        self.trigger_groups[new_value] = []
+                    self.trigger_groups[new_value].append(trigger_id)
         return None
 
+    def format_prefilter(self, regex_id):
+        """Describe the literal used to prefilter a regex."""
+        self.sync_matcher()
+        if not regex_id or regex_id not in self.matcher:
+            return "not in matcher"
+        if prefix := self.matcher.get_prefix(regex_id):
+            return f"starts with {prefix!r}"
+        if literal := self.matcher.get_literal(regex_id):
+            return f"contains {literal!r}"
+        return "none, checked on every line"
+
     def find_regex_id(self, regex):
         """Look for a regex, if not create one."""
         regex_id = None
@@ -294,6 +372,7 @@ class TriggersPlugin(BasePlugin):
                 "regex_id": regex_id,
                 "triggers": [],
                 "hits": 0,
+                "order": self.latest_regex_id,
             }
             self.regex_lookup_to_id[regex] = regex_id
         else:
@@ -374,11 +453,10 @@ class TriggersPlugin(BasePlugin):
                 sources=[self.plugin_id, owner_id],
             )()
 
-            need_rebuild = False
             if args.get("enabled"):
-                need_rebuild = True
                 if trigger_id not in self.regexes[regex_id]["triggers"]:
                     self.regexes[regex_id]["triggers"].append(trigger_id)
+                    self.mark_regex_changed(regex_id)
                 else:
                     LogRecord(
                         f"_api_trigger_add - trigger {trigger_name} already exists in regex: {regex}",
@@ -386,10 +464,6 @@ class TriggersPlugin(BasePlugin):
                         sources=[self.plugin_id, owner_id],
                     )()
 
-            # go through and rebuild the regexes
-            if need_rebuild:
-                self.rebuild_regexes()
-
         if args.get("group"):
             if args["group"] not in self.trigger_groups:
                 self.trigger_groups[args["group"]] = []
@@ -457,16 +531,15 @@ class TriggersPlugin(BasePlugin):
             )()
             return False
 
-        regex = self.regexes[self.triggers[trigger_id].regex_id]
-        need_rebuild = False
-        if trigger_id in regex["triggers"]:
+        regex = self.regexes.get(self.triggers[trigger_id].regex_id)
+        if regex and trigger_id in regex["triggers"]:
             LogRecord(
                 f"_api_trigger_remove - removing trigger {trigger_name} from {regex['regex_id']}",
                 level="debug",
                 sources=[self.plugin_id, owner_id],
             )()
-            need_rebuild = True
             regex["triggers"].remove(trigger_id)
+            self.mark_regex_changed(regex["regex_id"])
 
         if trigger_id in self.triggers:
             del self.triggers[trigger_id]
@@ -477,10 +550,6 @@ class TriggersPlugin(BasePlugin):
             sources=[self.plugin_id, owner_id],
         )()
 
-        # go through and rebuild the regexes
-        if need_rebuild:
-            self.rebuild_regexes()
-
         return True
 
     @AddAPI("trigger.get", description="get a trigger")
@@ -517,8 +586,11 @@ class TriggersPlugin(BasePlugin):
             for trigger in self.triggers.values()
             if trigger.owner_id == owner_id
         ]
-        for trigger in trigs:
-            self.api("plugins.core.triggers:trigger.remove")(trigger, owner_id=owner_id)
+        with self.api(f"{self.plugin_id}:batch.changes")():
+            for trigger in trigs:
+                self.api("plugins.core.triggers:trigger.remove")(
+                    trigger, owner_id=owner_id
+                )
 
     @AddAPI("trigger.toggle.enable", description="toggle a trigger")
     def _api_trigger_toggle_enable(self, trigger_name, flag, owner_id=None):
@@ -536,18 +608,16 @@ class TriggersPlugin(BasePlugin):
 
         trigger_id = self.create_trigger_id(trigger_name, owner_id)
         if trigger_id in self.triggers:
-            needs_rebuild = False
-            regex = self.regexes[self.triggers[trigger_id].regex_id]
-            if flag:
-                if trigger_id not in regex["triggers"]:
-                    regex["triggers"].append(trigger_id)
-                    needs_rebuild = True
-            elif trigger_id in regex["triggers"]:
-                regex["triggers"].remove(trigger_id)
-                needs_rebuild = True
-
-            if needs_rebuild:
-                self.rebuild_regexes()
+            regex_id = self.triggers[trigger_id].regex_id
+            if regex_id:
+                regex = self.regexes[regex_id]
+                if flag:
+                    if trigger_id not in regex["triggers"]:
+                        regex["triggers"].append(trigger_id)
+                        self.mark_regex_changed(regex_id)
+                elif trigger_id in regex["triggers"]:
+                    regex["triggers"].remove(trigger_id)
+                    self.mark_regex_changed(regex_id)
         else:
             LogRecord(
                 f"toggletrigger - trigger {trigger_name} (maybe {owner_id}) does not exist",
@@ -594,100 +664,149 @@ class TriggersPlugin(BasePlugin):
             sources=[self.plugin_id],
         )()
         if trigger_group in self.trigger_groups:
-            for i in self.trigger_groups[trigger_group]:
-                self.api(f"{self.plugin_id}:trigger.toggle.enable")(i, flag)
+            with self.api(f"{self.plugin_id}:batch.changes")():
+                for trigger_id in self.trigger_groups[trigger_group]:
+                    # the group holds trigger ids, toggle takes the name and owner
+                    if trigger := self.triggers.get(trigger_id):
+                        self.api(f"{self.plugin_id}:trigger.toggle.enable")(
+                            trigger.trigger_name, flag, owner_id=trigger.owner_id
+                        )
 
-    def process_match(self, data_line, regex_match_data):
-        """Processes a match for triggers.
+    def raise_matched_trigger(self, trigger, data_line, regex_match):
+        """Raise a trigger whose regex matched a line.
+
+        Triggers that do not match color reuse the match from the matcher, the
+        named groups of the trigger are looked up by position since the regex in
+        the matcher is the trigger regex with the group names removed.
 
         Args:
-            data_line: The data line that matched triggers.
-            regex_match_data: The list of regexes that matched the data.
+            trigger: The trigger to raise.
+            data_line: The data line that matched.
+            regex_match: The match of the regex for the trigger.
 
         Returns:
-            None
+            True if the trigger was raised, False otherwise.
 
         """
-        args = {"line": data_line}
-        LogRecord(
-            f"_eventcb_check_trigger - line {data_line.colorcoded} matched the following regexes {regex_match_data}",
-            level="debug",
-            sources=[self.plugin_id],
-        )()
-        for regex_id in regex_match_data:
-            match = None
+        if trigger.matchcolor:
+            match = trigger.original_regex_compiled.match(data_line.colorcoded)
+            if not match:
+                return False
+            group_dict = match.groupdict()
+        else:
+            group_dict = {
+                name: regex_match.group(index)
+                for name, index in trigger.original_regex_compiled.groupindex.items()
+            }
+        if trigger.argtypes:
+            for arg in trigger.argtypes:
+                if arg in group_dict:
+                    group_dict[arg] = trigger.argtypes[arg](group_dict[arg])
+        trigger.raisetrigger({"line": data_line, "matches": group_dict})
+        return True
+
+    def process_line(self, data_line, data):
+        """Raise the triggers that match a line in priority order.
+
+        The candidate regexes from the matcher are sorted by their highest
+        priority trigger, so a regex is only checked once every trigger that
+        comes before it has been raised. When a trigger with stopevaluating is
+        raised, no more triggers are raised and no more regexes are checked.
+
+        Args:
+            data_line: The data line to check.
+            data: The line without ansi codes.
+
+        Returns:
+            A list of the regex ids that matched the line.
+
+        """
+        matched_regex_ids: list[str] = []
+        # a heap of (trigger key, trigger_id, regex match) from matched regexes
+        pending: list[tuple[tuple[int, int, int], str, re.Match]] = []
+
+        def raise_pending(before=None):
+            """Raise pending triggers that sort before a key, True if stopped."""
+            while pending and (before is None or pending[0][0] < before):
+                _, trigger_id, regex_match = heapq.heappop(pending)
+                # an earlier trigger on this line can remove a trigger
+                trigger = self.triggers.get(trigger_id)
+                if not trigger or not trigger.enabled:
+                    continue
+                if (
+                    self.raise_matched_trigger(trigger, data_line, regex_match)
+                    and trigger.stopevaluating
+                ):
+                    return True
+            return False
+
+        for regex_id in self.matcher.candidates(data):
+            if raise_pending(self.matcher.get_order(regex_id)):
+                return matched_regex_ids
             if regex_id not in self.regexes:
                 LogRecord(
-                    f"_eventcb_check_trigger - regex_id {regex_id} not found in _eventcb_check_trigger",
+                    f"process_line - regex_id {regex_id} not found",
                     level="error",
                     sources=[self.plugin_id],
                 )()
                 continue
-
-            self.regexes[regex_id]["hits"] = self.regexes[regex_id]["hits"] + 1
-            for trigger_id in self.regexes[regex_id]["triggers"]:
-                if not self.triggers[trigger_id].enabled:
-                    continue
-                if self.triggers[trigger_id].matchcolor:
-                    match = self.triggers[trigger_id].original_regex_compiled.match(
-                        data_line.colorcoded
-                    )
-                else:
-                    match = self.triggers[trigger_id].original_regex_compiled.match(
-                        data_line.noansi
-                    )
-                if match:
-                    group_dict = match.groupdict()
-                    if self.triggers[trigger_id].argtypes:
-                        for arg in self.triggers[trigger_id].argtypes:
-                            if arg in group_dict:
-                                group_dict[arg] = self.triggers[trigger_id].argtypes[
-                                    arg
-                                ](group_dict[arg])
-                    args["matches"] = group_dict
-                    self.triggers[trigger_id].raisetrigger(args)
-                    if self.triggers[trigger_id].stopevaluating:
-                        break
-
-    @RegisterToEvent(event_name="ev_to_client_data_modify")
-    def _eventcb_check_trigger(self):  # pylint: disable=too-many-branches
-        """Check a line of text from the mud to see if it matches any triggers."""
+            if regex_match := self.matcher.get_pattern(regex_id).match(data):
+                matched_regex_ids.append(regex_id)
+                self.regexes[regex_id]["hits"] = self.regexes[regex_id]["hits"] + 1
+                for key, trigger_id in self.dispatch_table.get(regex_id, ()):
+                    heapq.heappush(pending, (key, trigger_id, regex_match))
+
+        raise_pending()
+        return matched_regex_ids
+
+    @RegisterToEvent(event_name="ev_to_client_data_modify", batch=True)
+    def _eventcb_check_trigger(self):
+        """Check the lines of text from the mud to see if they match any triggers."""
         if not (
             event_record := self.api("plugins.core.events:get.current.event.record")()
         ):
             return
 
-        # don't check internal data
-        line = event_record["line"]
-        if line.internal:
-            return
+        # the lines of a read come in one call, a single line when raised
+        # without a data_list
+        if "line_list" in event_record:
+            lines = event_record["line_list"]
+        else:
+            lines = [event_record["line"]]
+
+        for line in lines:
+            # don't check internal data
+            if line.internal:
+                continue
+            # the triggers get the line in the event record
+            event_record["line"] = line
+            self.check_line(event_record, line)
 
+    def check_line(self, event_record, line):
+        """Check a line of text from the mud to see if it matches any triggers."""
         data = line.noansi
         self.triggers[self.beall_id].raisetrigger(event_record)
 
+        # compile anything that changed since the last line, a trigger on an
+        # earlier line of the same read can enable or add triggers
+        self.sync_matcher()
+
         if data == "":
             self.triggers[self.emptyline_id].raisetrigger(event_record)
+        elif matched_regex_ids := self.process_line(line, data):
+            LogRecord(
+                "_eventcb_check_trigger - line %s matched the following regexes %s",
+                level="debug",
+                sources=[self.plugin_id],
+                args=(data, matched_regex_ids),
+            )()
         else:
-            if self.created_regex["created_regex_compiled"]:
-                match_data = self.created_regex["created_regex_compiled"].match(data)
-            else:
-                match_data = None
-
-            if match_data:
-                match_groups = {
-                    k: v for k, v in match_data.groupdict().items() if v is not None
-                }
-            else:
-                match_groups = {}
-
-            if regex_match_data := match_groups.keys():
-                self.process_match(event_record["line"], regex_match_data)
-            else:
-                LogRecord(
-                    f"_eventcb_check_trigger - line {data} did not match any regexes",
-                    level="debug",
-                    sources=[self.plugin_id],
-                )()
+            LogRecord(
+                "_eventcb_check_trigger - line %s did not match any regexes",
+                level="debug",
+                sources=[self.plugin_id],
+                args=(data,),
+            )()
 
         self.triggers[self.all_id].raisetrigger(event_record)
 
@@ -793,6 +912,7 @@ class TriggersPlugin(BasePlugin):
                             f"{'Regex':<{columnwidth}} : {self.triggers[trigger].original_regex}",
                             f"{'Regex (w/o Groups)':<{columnwidth}} : {self.triggers[trigger].regex}",
                             f"{'Regex ID':<{columnwidth}} : {self.triggers[trigger].regex_id}",
+                            f"{'Regex Prefilter':<{columnwidth}} : {self.format_prefilter(self.triggers[trigger].regex_id)}",
                             f"{'Event Name':<{columnwidth}} : {self.triggers[trigger].event_name}",
                             f"{'Match Color':<{columnwidth}} : {self.triggers[trigger].matchcolor}",
                             f"{'Group':<{columnwidth}} : {self.triggers[trigger].group}",
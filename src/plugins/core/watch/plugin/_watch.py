@@ -219,14 +219,22 @@ class WatchPlugin(BasePlugin):
             if self.watch_data[i]["owner"] == plugin:
                 self.api(f"{self.plugin_id}:watch.remove")(i)
 
-    @RegisterToEvent(event_name="ev_to_mud_data_modify")
+    @RegisterToEvent(event_name="ev_to_mud_data_modify", batch=True)
     def _eventcb_check_command(self):
         """Check input from the client and see if we are watching for it."""
         if not (
             event_record := self.api("plugins.core.events:get.current.event.record")()
         ):
             return
-        client_data = event_record["line"]
+        if "line_list" in event_record:
+            lines = event_record["line_list"]
+        else:
+            lines = [event_record["line"]]
+        for client_data in lines:
+            self.check_watches(client_data)
+
+    def check_watches(self, client_data):
+        """Raise the event of each watch that matches a line from the client."""
         for watch_name in self.watch_data:
             cmdre = self.watch_data[watch_name]["compiled"]
             if match_data := cmdre.match(client_data):
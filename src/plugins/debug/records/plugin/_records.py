@@ -7,12 +7,14 @@
 
 # Standard Library
 
-from libs.records import RMANAGER
+from libs.records import RMANAGER, STACKTRACER, LogRecord
+from libs.records.managers.stacks import TRACING_MODES
 
 # 3rd Party
 # Project
 from plugins._baseplugin import BasePlugin, RegisterPluginHook
 from plugins.core.commands import AddArgument, AddParser
+from plugins.core.events import RegisterToEvent
 
 
 class RecordPlugin(BasePlugin):
@@ -28,6 +30,45 @@ class RecordPlugin(BasePlugin):
             bool,
             "1 to show LogRecords in detail command",
         )
+        self.api("plugins.core.settings:add")(
+            self.plugin_id,
+            "recordtracing",
+            STACKTRACER.mode,
+            str,
+            f"which records capture their call stack: {', '.join(TRACING_MODES)}",
+        )
+        self.api("plugins.core.settings:add")(
+            self.plugin_id,
+            "recordsamplerate",
+            STACKTRACER.sample_rate,
+            int,
+            "capture the call stack of 1 in this many records when sampled",
+        )
+
+    @RegisterToEvent(event_name="ev_{plugin_id}_var_recordtracing_modified")
+    @RegisterToEvent(event_name="ev_{plugin_id}_var_recordsamplerate_modified")
+    def _eventcb_record_tracing_modified(self):
+        """Update the record tracing mode."""
+        mode = self.api("plugins.core.settings:get")(self.plugin_id, "recordtracing")
+        sample_rate = self.api("plugins.core.settings:get")(
+            self.plugin_id, "recordsamplerate"
+        )
+        try:
+            STACKTRACER.set_mode(mode, sample_rate)
+        except ValueError as err:
+            LogRecord(
+                f"could not set record tracing: {err}, reverting to {STACKTRACER.mode} "
+                f"with a sample rate of {STACKTRACER.sample_rate}",
+                level="error",
+                sources=[self.plugin_id],
+            )()
+            # put back the mode in use so the bad value is not saved
+            self.api("plugins.core.settings:change")(
+                self.plugin_id, "recordtracing", STACKTRACER.mode
+            )
+            self.api("plugins.core.settings:change")(
+                self.plugin_id, "recordsamplerate", STACKTRACER.sample_rate
+            )
 
     @AddParser(description="return the list of record types")
     def _command_types(self):
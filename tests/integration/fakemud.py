@@ -0,0 +1,196 @@
+"""A fake MUD for integration and load tests.
+
+This module provides `FakeMud`, an asyncio telnet server that stands in for
+a MUD. It negotiates telnet options, sends a banner, and then streams lines
+at a configured rate when asked to. Each line and prompt carries a sequence
+number between `#` marks, so a client of the proxy can match what it
+receives to when the fake MUD sent it.
+
+Key Components:
+    - FakeMudConfig: The line rate, ANSI density and prompts of the stream.
+    - FakeMud: The server, it records when each sequence number was sent.
+
+Features:
+    - Offers EOR and asks for NAWS when a connection opens.
+    - A configurable fraction of lines are colored with ANSI codes.
+    - A prompt ending in IAC GA or IAC EOR every `prompt_every` lines.
+    - Telnet commands are stripped from input, the commands received are
+        kept in `commands`.
+
+"""
+
+import asyncio
+import contextlib
+import random
+import re
+import time
+from dataclasses import dataclass
+
+IAC = b"\xff"
+GA = b"\xf9"
+EOR = b"\xef"
+WILL = b"\xfb"
+DO = b"\xfd"
+TELOPT_EOR = b"\x19"
+TELOPT_NAWS = b"\x1f"
+
+# telnet commands, with sub-negotiations, in the input from the proxy
+_TELNET_COMMAND = re.compile(
+    rb"\xff(?:\xfa.*?\xff\xf0|[\xfb-\xfe].|[\xf0-\xfa\xff])", re.DOTALL
+)
+# the sequence number in a line or prompt
+SEQUENCE = re.compile(r"#(\d+)#")
+
+_COLORS = ["1;31", "0;32", "1;33", "0;34", "1;35", "0;36", "1;37", "38;5;208"]
+_PHRASES = [
+    "a large troll swings at you",
+    "and misses",
+    "you dodge the blow of the guard",
+    "your sword hits the orc very hard",
+    "the goblin flees north",
+]
+
+
+@dataclass
+class FakeMudConfig:
+    """The stream a FakeMud sends."""
+
+    # lines sent each second
+    lines_per_second: float = 100
+    # the fraction of lines that are colored
+    ansi_density: float = 0.5
+    # a prompt is sent after this many lines, 0 for no prompts
+    prompt_every: int = 20
+    # "ga" or "eor", the telnet command that ends a prompt
+    prompt_end: str = "ga"
+    # the number of phrases in a line, after the sequence number
+    phrases: int = 3
+    # the seed for the phrases and colors, so runs send the same stream
+    seed: int = 1
+
+
+class FakeMud:
+    """An asyncio telnet server that stands in for a MUD."""
+
+    def __init__(self, config: FakeMudConfig | None = None) -> None:
+        """Initialize the fake MUD, it does not listen until started."""
+        self.config = config or FakeMudConfig()
+        self.random = random.Random(self.config.seed)
+        self.server: asyncio.Server | None = None
+        self.port = 0
+        self.writers: list[asyncio.StreamWriter] = []
+        self.handlers: set[asyncio.Task] = set()
+        self.connected = asyncio.Event()
+        self.commands: list[str] = []
+        # sequence number: perf_counter when it was sent
+        self.sent: dict[int, float] = {}
+        self.prompts: set[int] = set()
+        self.sequence = 0
+
+    async def start(self, host: str = "localhost", port: int = 0) -> int:
+        """Start listening.
+
+        Args:
+            host: The host to listen on.
+            port: The port to listen on, 0 to pick a free one.
+
+        Returns:
+            The port the fake MUD is listening on.
+
+        """
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Close the connections and stop listening."""
+        for writer in self.writers:
+            writer.close()
+        if self.handlers:
+            await asyncio.wait(self.handlers, timeout=5)
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Negotiate options, send the banner and read commands."""
+        task = asyncio.current_task()
+        self.handlers.add(task)  # type: ignore[arg-type]
+        writer.write(IAC + WILL + TELOPT_EOR + IAC + DO + TELOPT_NAWS)
+        writer.write(b"Welcome to the fake MUD.\r\n")
+        await writer.drain()
+        self.writers.append(writer)
+        self.connected.set()
+
+        buffer = b""
+        with contextlib.suppress(ConnectionError):
+            while data := await reader.read(4096):
+                buffer += _TELNET_COMMAND.sub(b"", data)
+                *lines, buffer = buffer.split(b"\n")
+                self.commands.extend(
+                    line.decode("utf-8", "replace").strip() for line in lines
+                )
+        if writer in self.writers:
+            self.writers.remove(writer)
+        self.handlers.discard(task)  # type: ignore[arg-type]
+
+    def make_line(self) -> bytes:
+        """Build the next line of the stream."""
+        self.sequence += 1
+        phrases = " ".join(self.random.choices(_PHRASES, k=self.config.phrases))
+        text = f"#{self.sequence}# {phrases}"
+        if self.random.random() < self.config.ansi_density:
+            colored = []
+            for word in text.split(" "):
+                color = self.random.choice(_COLORS)
+                colored.append(f"\x1b[{color}m{word}")
+            text = " ".join(colored) + "\x1b[0m"
+        return text.encode() + b"\r\n"
+
+    def make_prompt(self) -> bytes:
+        """Build a prompt, it ends in IAC GA or IAC EOR."""
+        self.sequence += 1
+        self.prompts.add(self.sequence)
+        end = EOR if self.config.prompt_end == "eor" else GA
+        return f"<#{self.sequence}# 100hp 100mn 100mv> ".encode() + IAC + end
+
+    def write(self, data: bytes) -> None:
+        """Write data to every connection and record when it was sent."""
+        now = time.perf_counter()
+        self.sent[self.sequence] = now
+        for writer in self.writers:
+            writer.write(data)
+
+    async def stream(self, seconds: float) -> int:
+        """Send lines at the configured rate.
+
+        The stream always ends with a line. The proxy holds a prompt that
+        arrives on its own until the next line comes, so a prompt at the end
+        would never be delivered.
+
+        Args:
+            seconds: How long to send lines for.
+
+        Returns:
+            The number of lines and prompts sent.
+
+        """
+        start = time.perf_counter()
+        lines = 0
+        sent_before = len(self.sent)
+        while (elapsed := time.perf_counter() - start) < seconds:
+            due = int(elapsed * self.config.lines_per_second) + 1
+            while lines < due:
+                self.write(self.make_line())
+                lines += 1
+                if self.config.prompt_every and lines % self.config.prompt_every == 0:
+                    self.write(self.make_prompt())
+            for writer in self.writers:
+                await writer.drain()
+            await asyncio.sleep(0.01)
+        self.write(self.make_line())
+        for writer in self.writers:
+            await writer.drain()
+        return len(self.sent) - sent_before
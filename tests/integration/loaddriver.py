@@ -0,0 +1,318 @@
+"""A load driver that measures the proxy with a fake MUD and many clients.
+
+This module starts a copy of the proxy in a subprocess, connects it to a
+`FakeMud`, and connects telnetlib3 clients to the proxy's listener. While
+the fake MUD streams lines, it measures how long each line takes to reach
+every client, how many lines each client receives, and the memory of the
+proxy.
+
+The proxy runs from a copy of src in a temporary directory, so its data
+directory starts empty and the repository is not changed.
+
+Key Components:
+    - LoadConfig: The number of clients, the stream and how long to run.
+    - LoadResult: The latency, throughput and memory of a run.
+    - run_load: Runs the proxy, the fake MUD and the clients.
+
+Usage:
+    python -m tests.integration.loaddriver --clients 5 --rate 500 --seconds 10
+
+"""
+
+import argparse
+import asyncio
+import contextlib
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import psutil
+import telnetlib3
+
+from tests.integration.fakemud import SEQUENCE, FakeMud, FakeMudConfig
+
+SRC_PATH = Path(__file__).resolve().parent.parent.parent / "src"
+DEFAULT_PASSWORD = "defaultpass"
+PROXY_STARTUP_TIMEOUT = 30
+
+
+@dataclass
+class LoadConfig:
+    """A load test run."""
+
+    clients: int = 3
+    seconds: float = 5
+    mud: FakeMudConfig = field(default_factory=FakeMudConfig)
+    # how long to wait for the last lines after the stream ends
+    settle_seconds: float = 5
+    # how often the memory of the proxy is sampled
+    memory_interval: float = 0.5
+
+
+@dataclass
+class LoadResult:
+    """The results of a load test run."""
+
+    sent: int = 0
+    seconds: float = 0.0
+    # client number: the number of lines and prompts it received
+    received: dict[int, int] = field(default_factory=dict)
+    # for each line, the time for it to reach the slowest client
+    fanout_latencies: list[float] = field(default_factory=list)
+    # (seconds since the stream started, rss of the proxy in bytes)
+    memory: list[tuple[float, int]] = field(default_factory=list)
+
+    @property
+    def lines_per_second(self) -> float:
+        """Return the lines received per second by all clients."""
+        return sum(self.received.values()) / self.seconds if self.seconds else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return a fan-out latency percentile in seconds, by nearest rank."""
+        if not self.fanout_latencies:
+            return 0.0
+        ordered = sorted(self.fanout_latencies)
+        rank = max(round(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def report(self) -> list[str]:
+        """Return the results as lines of text."""
+        msg = [
+            f"lines sent            : {self.sent}",
+            (
+                f"lines received        : {sum(self.received.values())} "
+                f"({', '.join(str(count) for count in self.received.values())})"
+            ),
+            f"received lines/sec    : {self.lines_per_second:.0f}",
+        ]
+        msg.extend(
+            f"{f'fan-out p{percent}':<22}: {self.percentile(percent) * 1000:.3f} ms"
+            for percent in (50, 90, 99)
+        )
+        msg.append(
+            f"fan-out max           : "
+            f"{max(self.fanout_latencies, default=0) * 1000:.3f} ms"
+        )
+        if self.memory:
+            rss = [sample for _, sample in self.memory]
+            msg.append(
+                f"proxy rss MiB         : start {rss[0] / 2**20:.1f}, "
+                f"peak {max(rss) / 2**20:.1f}, end {rss[-1] / 2**20:.1f}"
+            )
+        return msg
+
+
+def free_port() -> int:
+    """Return a port that is free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class LoadClient:
+    """A telnetlib3 client of the proxy that records when lines arrive."""
+
+    def __init__(self, number: int) -> None:
+        """Initialize the client, it is not connected."""
+        self.number = number
+        self.reader: telnetlib3.TelnetReaderUnicode | None = None
+        self.writer: telnetlib3.TelnetWriterUnicode | None = None
+        # sequence number: perf_counter when it was received
+        self.received: dict[int, float] = {}
+        self.text = ""
+
+    async def connect(self, port: int, timeout: float) -> None:
+        """Connect to the proxy, retrying until it is listening."""
+        end = time.monotonic() + timeout
+        while True:
+            try:
+                self.reader, self.writer = await telnetlib3.open_connection(
+                    "localhost", port
+                )
+            except OSError:
+                if time.monotonic() > end:
+                    raise
+                await asyncio.sleep(0.5)
+            else:
+                return
+
+    async def read_until(self, text: str, timeout: float = 10) -> str:
+        """Read until text is received."""
+        end = time.monotonic() + timeout
+        while text not in self.text:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                msg = f"client {self.number} did not receive {text!r}: {self.text!r}"
+                raise TimeoutError(msg)
+            with contextlib.suppress(TimeoutError):
+                self.text += await asyncio.wait_for(
+                    self.reader.read(4096),  # type: ignore[union-attr]
+                    timeout=remaining,
+                )
+        found = self.text
+        self.text = ""
+        return found
+
+    async def login(self) -> None:
+        """Log in with the default password."""
+        await self.read_until("password")
+        await self.send(DEFAULT_PASSWORD)
+        await self.read_until("logged in")
+
+    async def send(self, line: str) -> None:
+        """Send a line to the proxy."""
+        self.writer.write(f"{line}\n")  # type: ignore[union-attr]
+        await self.writer.drain()  # type: ignore[union-attr]
+
+    async def record(self) -> None:
+        """Record when each sequence number arrives, until cancelled."""
+        pending = ""
+        while data := await self.reader.read(65536):  # type: ignore[union-attr]
+            now = time.perf_counter()
+            pending += data
+            # a sequence number is complete once its closing mark arrives
+            last = 0
+            for match in SEQUENCE.finditer(pending):
+                self.received.setdefault(int(match[1]), now)
+                last = match.end()
+            pending = pending[last:]
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self.writer:
+            self.writer.close()
+
+
+async def sample_memory(
+    pid: int, interval: float, start: float, samples: list[tuple[float, int]]
+) -> None:
+    """Sample the rss of a process until cancelled."""
+    process = psutil.Process(pid)
+    while True:
+        samples.append((time.perf_counter() - start, process.memory_info().rss))
+        await asyncio.sleep(interval)
+
+
+async def run_load(config: LoadConfig) -> LoadResult:
+    """Run the proxy with a fake MUD and clients, and measure it.
+
+    Args:
+        config: The run.
+
+    Returns:
+        The results of the run.
+
+    """
+    result = LoadResult()
+    run_path = Path(tempfile.mkdtemp(prefix="bastproxy-load-"))
+    shutil.copytree(
+        SRC_PATH,
+        run_path / "src",
+        # leave out the data directory of the proxy, not the data packages
+        ignore=lambda directory, names: [
+            name
+            for name in names
+            if name == "__pycache__" or (name == "data" and Path(directory) == SRC_PATH)
+        ],
+    )
+    mud = FakeMud(config.mud)
+    await mud.start()
+    proxy_port = free_port()
+    proxy = subprocess.Popen(
+        [sys.executable, "mudproxy.py", "-p", str(proxy_port), "--quiet"],
+        cwd=run_path / "src",
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    clients = [LoadClient(number) for number in range(config.clients)]
+    tasks: list[asyncio.Task] = []
+    try:
+        for client in clients:
+            await client.connect(proxy_port, PROXY_STARTUP_TIMEOUT)
+            await client.login()
+
+        await clients[0].send("#bp.core.proxy.set mudhost localhost")
+        await clients[0].send(f"#bp.core.proxy.set mudport {mud.port}")
+        await clients[0].send("#bp.core.proxy.connect")
+        await asyncio.wait_for(mud.connected.wait(), timeout=10)
+        # let the banner and the negotiation reach the clients
+        await asyncio.sleep(1)
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(client.record()) for client in clients]
+        tasks.append(
+            asyncio.create_task(
+                sample_memory(proxy.pid, config.memory_interval, start, result.memory)
+            )
+        )
+        result.sent = await mud.stream(config.seconds)
+
+        last = mud.sequence
+        end = time.monotonic() + config.settle_seconds
+        while time.monotonic() < end and not all(
+            last in client.received for client in clients
+        ):
+            await asyncio.sleep(0.1)
+        result.seconds = time.perf_counter() - start
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for client in clients:
+            client.close()
+        proxy.terminate()
+        try:
+            proxy.wait(10)
+        except subprocess.TimeoutExpired:
+            proxy.kill()
+            proxy.wait()
+        await mud.stop()
+        shutil.rmtree(run_path, ignore_errors=True)
+
+    for client in clients:
+        result.received[client.number] = len(client.received)
+    for sequence, sent_at in mud.sent.items():
+        arrivals = [client.received.get(sequence) for client in clients]
+        if all(arrivals):
+            result.fanout_latencies.append(max(arrivals) - sent_at)  # type: ignore[type-var]
+    return result
+
+
+def main() -> None:
+    """Parse the arguments and run a load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=3, help="clients to connect")
+    parser.add_argument("--seconds", type=float, default=5, help="seconds to stream")
+    parser.add_argument("--rate", type=float, default=100, help="lines per second")
+    parser.add_argument(
+        "--ansi", type=float, default=0.5, help="the fraction of colored lines"
+    )
+    parser.add_argument(
+        "--prompt-every", type=int, default=20, help="lines between prompts"
+    )
+    parser.add_argument(
+        "--prompt-end", choices=["ga", "eor"], default="ga", help="prompt ending"
+    )
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        clients=args.clients,
+        seconds=args.seconds,
+        mud=FakeMudConfig(
+            lines_per_second=args.rate,
+            ansi_density=args.ansi,
+            prompt_every=args.prompt_every,
+            prompt_end=args.prompt_end,
+        ),
+    )
+    result = asyncio.run(run_load(config))
+    print("\n".join(result.report()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Tests for the fake MUD used by the load tests.
+
+This module tests the fake MUD on its own, with a plain asyncio connection
+in place of the proxy.
+
+Test Classes:
+    - `TestFakeMud`: Tests negotiation, the stream and reading commands.
+
+"""
+
+import asyncio
+
+import pytest
+
+from tests.integration.fakemud import (
+    DO,
+    EOR,
+    GA,
+    IAC,
+    SEQUENCE,
+    TELOPT_EOR,
+    TELOPT_NAWS,
+    WILL,
+    FakeMud,
+    FakeMudConfig,
+)
+
+
+async def read_for(reader: asyncio.StreamReader, seconds: float) -> bytes:
+    """Read everything that arrives within a number of seconds."""
+    data = b""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    while (remaining := end - loop.time()) > 0:
+        try:
+            data += await asyncio.wait_for(reader.read(65536), timeout=remaining)
+        except TimeoutError:
+            break
+    return data
+
+
+class TestFakeMud:
+    """Test the fake MUD."""
+
+    @pytest.mark.asyncio
+    async def test_negotiation_and_banner(self) -> None:
+        """Test that a connection is offered EOR and asked for NAWS.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        mud = FakeMud()
+        port = await mud.start()
+        reader, writer = await asyncio.open_connection("localhost", port)
+
+        data = await read_for(reader, 0.3)
+
+        assert data.startswith(IAC + WILL + TELOPT_EOR + IAC + DO + TELOPT_NAWS)
+        assert b"Welcome to the fake MUD." in data
+        writer.close()
+        await mud.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("prompt_end", "end"), [("ga", GA), ("eor", EOR)])
+    async def test_stream(self, prompt_end: str, end: bytes) -> None:
+        """Test that lines and prompts are sent with their sequence numbers.
+
+        Args:
+            prompt_end: The prompt ending in the config.
+            end: The telnet command that should end each prompt.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        config = FakeMudConfig(
+            lines_per_second=200, ansi_density=1, prompt_every=5, prompt_end=prompt_end
+        )
+        mud = FakeMud(config)
+        port = await mud.start()
+        reader, writer = await asyncio.open_connection("localhost", port)
+        await asyncio.wait_for(mud.connected.wait(), timeout=2)
+
+        sent = await mud.stream(0.25)
+        data = await read_for(reader, 0.3)
+        text = data.decode("utf-8", "replace")
+
+        assert sent == len(mud.sent)
+        assert [int(match[1]) for match in SEQUENCE.finditer(text)] == list(
+            range(1, mud.sequence + 1)
+        )
+        assert mud.prompts
+        assert data.count(IAC + end) == len(mud.prompts)
+        assert "\x1b[" in text
+        # the stream ends with a line, not a prompt
+        assert mud.sequence not in mud.prompts
+        writer.close()
+        await mud.stop()
+
+    @pytest.mark.asyncio
+    async def test_commands_are_read(self) -> None:
+        """Test that commands are read without their telnet negotiation.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        mud = FakeMud()
+        port = await mud.start()
+        reader, writer = await asyncio.open_connection("localhost", port)
+        await asyncio.wait_for(mud.connected.wait(), timeout=2)
+
+        writer.write(IAC + b"\xfa\x1f\x00\x50\x00\x18" + IAC + b"\xf0look\r\n")
+        writer.write(IAC + DO + TELOPT_EOR + b"score\n")
+        await writer.drain()
+        await read_for(reader, 0.2)
+
+        assert mud.commands == ["look", "score"]
+        writer.close()
+        await mud.stop()
@@ -0,0 +1,46 @@
+"""End-to-end load test of the proxy with a fake MUD.
+
+This module runs a copy of the proxy with the fake MUD and a few clients,
+and checks that every line reaches every client. It is small enough to run
+in CI; use `python -m tests.integration.loaddriver` for larger runs.
+
+Test Classes:
+    - `TestLoad`: Tests the fan-out of a stream to several clients.
+
+"""
+
+import asyncio
+
+import pytest
+
+from tests.integration.fakemud import FakeMudConfig
+from tests.integration.loaddriver import LoadConfig, run_load
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestLoad:
+    """Test the proxy under a small load."""
+
+    def test_every_client_receives_the_stream(self) -> None:
+        """Test that every line and prompt reaches every client.
+
+        Returns:
+            None
+
+        Raises:
+            None
+
+        """
+        config = LoadConfig(
+            clients=2,
+            seconds=2,
+            mud=FakeMudConfig(lines_per_second=100, prompt_every=10),
+        )
+
+        result = asyncio.run(run_load(config))
+
+        assert result.sent > 150
+        assert result.received == {0: result.sent, 1: result.sent}
+        assert len(result.fanout_latencies) == result.sent
+        assert result.memory
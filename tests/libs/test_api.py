@@ -7,17 +7,20 @@ This module tests the API registration and invocation system including:
 - Getting API children
 - API overwriting and forcing
 - API statistics tracking
+- API handles that follow added and removed APIs
 
 Test Classes:
     - `TestAPIBasics`: Tests for basic API operations (add, get, has).
     - `TestAPINamespaces`: Tests for API namespace separation and hierarchy.
     - `TestAPIOverwriting`: Tests for API overwriting and force behavior.
+    - `TestAPICallerTracking`: Tests for recording the callers of APIs.
+    - `TestAPIBind`: Tests for API handles returned by bind.
 
 """
 
 import pytest
 
-from libs.api import API
+from libs.api import API, AddAPI
 
 
 def helper_function_one() -> str:
@@ -308,3 +311,102 @@ class TestAPIInstancePriority:
 
         assert instance_api_item.tfunction == helper_function_two
         assert instance_api_item.instance is True
+
+
+class TestAPICallerTracking:
+    """Test suite for recording the callers of APIs."""
+
+    def test_calls_are_recorded_for_the_owner(self) -> None:
+        """Test that calls through an API instance are recorded for its owner."""
+        provider = API(owner_id="provider_owner")
+        provider.add("testcaller", "function", helper_function_one, description="T")
+        caller = API(owner_id="caller_owner:sub")
+
+        result = caller("testcaller:function")()
+
+        assert result == "function_one"
+        stats = caller.get("testcaller:function").stats
+        assert stats.detailed_calls["caller_owner:sub"] == 1
+        assert stats.calls_by_caller["caller_owner"] == 1
+
+    def test_nested_call_finds_outer_caller(self) -> None:
+        """Test that an API can find who called it while ignoring itself."""
+        provider = API(owner_id="provider_owner")
+
+        def find_caller() -> str:
+            """Find the caller of this API."""
+            return provider("libs.api:get.caller.owner")(
+                ignore_owner_list=["provider_owner"]
+            )
+
+        provider.add("testcaller", "find", find_caller, description="Test")
+        caller = API(owner_id="caller_owner")
+
+        assert caller("testcaller:find")() == "caller_owner"
+        assert provider("libs.api:get.caller.owner")() == "provider_owner"
+
+
+class RemovableProvider:
+    """A class with an API that can be removed."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="testbindremove")
+
+    @AddAPI("function", description="Test")
+    def _api_function(self) -> str:
+        """Return a test string."""
+        return "function_one"
+
+
+class TestAPIBind:
+    """Test suite for API handles returned by bind."""
+
+    def test_bind_returns_same_handle(self) -> None:
+        """Test that bind returns one handle per location."""
+        api = API(owner_id="test_owner")
+        api.add("testbind", "same", helper_function_one, description="Test")
+
+        handle = api.bind("testbind:same")
+
+        assert api.bind("testbind:same") is handle
+        assert handle() == "function_one"
+
+    def test_handle_follows_overwritten_api(self) -> None:
+        """Test that a handle calls the new function after an API is replaced."""
+        api = API(owner_id="test_owner")
+        api.add("testbind", "replace", helper_function_one, description="Test")
+        handle = api.bind("testbind:replace")
+        assert handle() == "function_one"
+
+        api.add(
+            "testbind",
+            "replace",
+            helper_function_two,
+            instance=True,
+            force=True,
+            description="Test",
+        )
+        assert handle() == "function_two"
+
+        api.add(
+            "testbind",
+            "replace",
+            helper_function_three,
+            force=True,
+            description="Test",
+        )
+        assert api.bind("testbind:replace") is handle
+        assert handle.api_item.instance is True
+
+    def test_handle_fails_after_remove(self) -> None:
+        """Test that a handle raises after its API is removed."""
+        provider = RemovableProvider()
+        provider.api("libs.api:add.apis.for.object")("testbindremove", provider)
+        handle = API(owner_id="test_owner").bind("testbindremove:function")
+        assert handle() == "function_one"
+
+        provider.api("libs.api:remove")("testbindremove")
+
+        with pytest.raises(AttributeError, match="is not in the api"):
+            handle()
@@ -0,0 +1,148 @@
+# Project: bastproxy
+# Filename: tests/libs/test_capture.py
+#
+# File Description: Tests for the network data capture
+#
+# By: Bast
+"""Unit tests for the network data capture.
+
+This module contains tests for packing captured records into blocks, writing
+them to a capture file and reading them back.
+
+"""
+
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+
+from libs.net import capture
+from libs.net.capture import (
+    CLIENT_WRITE,
+    COMPRESS_NONE,
+    COMPRESS_ZLIB,
+    FROM_MUD,
+    TO_MUD,
+    CaptureFile,
+    SessionCapture,
+    export_text,
+    read_capture,
+)
+
+
+def write_capture(path: Path, compression: int) -> None:
+    """Capture a few records to a file."""
+    capture_file = CaptureFile(path, compression=compression)
+    session = SessionCapture()
+    session.start(capture_file.write_block)
+    session.record(FROM_MUD, "mud", "You are hungry.\r\n")
+    session.record(TO_MUD, "mud", b"\xff\xfb\x01")
+    session.record(CLIENT_WRITE, "abc123", "caf\udce9\r\n")
+    session.stop()
+    capture_file.close()
+
+
+class TestCapture:
+    """Test suite for capturing network data."""
+
+    @pytest.mark.parametrize("compression", [COMPRESS_NONE, COMPRESS_ZLIB])
+    def test_records_round_trip(self, tmp_path: Path, compression: int) -> None:
+        """Test that captured records are read back as they were captured."""
+        path = tmp_path / "session.bpcap"
+        write_capture(path, compression)
+
+        records = [record[1:] for record in read_capture(path)]
+
+        assert records == [
+            (FROM_MUD, "mud", "You are hungry.\r\n"),
+            (TO_MUD, "mud", b"\xff\xfb\x01"),
+            (CLIENT_WRITE, "abc123", "caf\udce9\r\n"),
+        ]
+
+    def test_appended_captures_are_read(self, tmp_path: Path) -> None:
+        """Test that a file with more than one capture is read in full."""
+        path = tmp_path / "session.bpcap"
+        write_capture(path, COMPRESS_ZLIB)
+        write_capture(path, COMPRESS_NONE)
+
+        assert len(list(read_capture(path))) == 6
+
+    def test_not_a_capture_file(self, tmp_path: Path) -> None:
+        """Test that reading a file that is not a capture raises an error."""
+        path = tmp_path / "networkdata.log"
+        path.write_text("2024-01-01 : data.mud - from_mud : a line\n")
+
+        with pytest.raises(ValueError, match="not a capture file"):
+            list(read_capture(path))
+
+    def test_capture_without_sink_does_nothing(self) -> None:
+        """Test that records are not kept until the capture is started."""
+        session = SessionCapture()
+        session.record(FROM_MUD, "mud", "a line")
+
+        assert not session.buffer
+
+    def test_full_block_is_passed_to_sink(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a block is passed to the sink when it is full."""
+        monkeypatch.setattr(capture, "BLOCK_SIZE", 100)
+        blocks: list[bytes] = []
+        session = SessionCapture()
+        session.start(blocks.append)
+
+        session.record(FROM_MUD, "mud", "a short line")
+        assert blocks == []
+
+        session.record(FROM_MUD, "mud", "x" * 100)
+        assert len(blocks) == 1
+        assert not session.buffer
+
+    def test_block_flushed_by_timer(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a block is passed to the sink when no record follows it."""
+        monkeypatch.setattr(capture, "FLUSH_INTERVAL", 0.01)
+        blocks: list[bytes] = []
+        session = SessionCapture()
+        session.start(blocks.append)
+
+        async def capture_line() -> None:
+            session.record(FROM_MUD, "mud", "a line")
+            assert blocks == []
+            await asyncio.sleep(0.05)
+
+        asyncio.run(capture_line())
+
+        assert len(blocks) == 1
+        assert session.flush_timer is None
+
+    def test_flush_cancels_timer(self) -> None:
+        """Test that passing a block to the sink cancels its flush timer."""
+        blocks: list[bytes] = []
+        session = SessionCapture()
+        session.start(blocks.append)
+
+        async def capture_line() -> None:
+            session.record(FROM_MUD, "mud", "a line")
+            timer = session.flush_timer
+            assert timer is not None
+            session.flush()
+            assert timer.cancelled()
+
+        asyncio.run(capture_line())
+
+        assert len(blocks) == 1
+        assert session.flush_timer is None
+
+    def test_export_text(self, tmp_path: Path) -> None:
+        """Test that a capture is exported in the networkdata.log format."""
+        path = tmp_path / "session.bpcap"
+        write_capture(path, COMPRESS_ZLIB)
+        out = io.StringIO()
+
+        assert export_text(path, out, utc=True) == 3
+
+        lines = out.getvalue().split("\n")
+        assert lines[0].endswith(" : data.mud    - from_mud     : You are hungry.\r")
+        assert lines[1].endswith(" : data.mud    - to_mud       : b'\\xff\\xfb\\x01'")
+        assert " : data.client.abc123 - client_write : caf" in lines[2]
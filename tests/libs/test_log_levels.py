@@ -0,0 +1,119 @@
+# Project: bastproxy
+# Filename: tests/libs/test_log_levels.py
+#
+# File Description: Tests for the log level table
+#
+# By: Bast
+"""Unit tests for the LogLevels class.
+
+This module contains tests for skipping LogRecords that no handler would log
+and for formatting the message of a LogRecord only when it is built.
+
+"""
+
+import logging
+from collections.abc import Iterator
+
+import pytest
+
+from libs.records import LOGLEVELS, LogRecord
+from libs.records.managers.loglevels import LogLevels
+from libs.records.rtypes.log import DISABLED_LOG_RECORD
+
+
+@pytest.fixture
+def info_levels() -> Iterator[dict[str, dict[str, int]]]:
+    """Log every source at info while a test runs, and return the counts."""
+    counts: dict[str, dict[str, int]] = {}
+
+    def resolver(source: str) -> tuple[int, dict[str, int]]:
+        return logging.INFO, counts.setdefault(source, {})
+
+    LOGLEVELS.set_resolver(resolver)
+    yield counts
+    LOGLEVELS.set_resolver(None)
+
+
+class TestLogLevels:
+    """Test suite for the LogLevels class."""
+
+    def test_no_resolver_logs_everything(self) -> None:
+        """Test that every record is enabled until a resolver is set."""
+        levels = LogLevels()
+
+        assert levels.is_enabled("debug", ["test"])
+
+    def test_lowest_source_decides(self) -> None:
+        """Test that a record is enabled if any of its sources logs it."""
+        levels = LogLevels()
+        levels.set_resolver(
+            lambda source: (
+                logging.DEBUG if source == "verbose" else logging.INFO,
+                {},
+            )
+        )
+
+        assert not levels.is_enabled("debug", ["quiet"])
+        assert levels.is_enabled("debug", ["quiet", "verbose"])
+        assert levels.is_enabled("info", ["quiet"])
+
+    def test_levels_are_cached_until_cleared(self) -> None:
+        """Test that the resolver is only called again after a clear."""
+        levels = LogLevels()
+        calls = []
+
+        def resolver(source: str) -> tuple[int, dict[str, int]]:
+            calls.append(source)
+            return logging.INFO, {}
+
+        levels.set_resolver(resolver)
+        levels.is_enabled("debug", ["test"])
+        levels.is_enabled("debug", ["test"])
+        assert calls == ["test"]
+
+        levels.clear()
+        levels.is_enabled("debug", ["test"])
+        assert calls == ["test", "test"]
+
+
+@pytest.mark.usefixtures("info_levels")
+class TestLazyLogRecord:
+    """Test suite for LogRecords that are not built."""
+
+    def test_disabled_record_is_not_built(
+        self, info_levels: dict[str, dict[str, int]]
+    ) -> None:
+        """Test that a record below the level is not built but is counted."""
+        calls = []
+
+        def message() -> str:
+            calls.append("formatted")
+            return "not logged"
+
+        record = LogRecord(message, level="debug", sources=["test"])
+        record()
+
+        assert record is DISABLED_LOG_RECORD
+        assert not record.wasemitted["console"]
+        assert calls == []
+        assert info_levels["test"] == {"debug": 1}
+
+    def test_enabled_record_formats_args(self) -> None:
+        """Test that the message of a built record is formatted with its args."""
+        record = LogRecord(
+            "line %s of %r", level="info", sources=["test"], args=(1, "data")
+        )
+
+        assert isinstance(record, LogRecord)
+        assert list(record) == ["line 1 of 'data'"]
+
+    def test_args_need_a_str_message(self) -> None:
+        """Test that args with a list message raise an error."""
+        with pytest.raises(TypeError, match="str message"):
+            LogRecord(["line %s"], level="info", sources=["test"], args=(1,))
+
+    def test_enabled_record_calls_message(self) -> None:
+        """Test that a callable message is called when the record is built."""
+        record = LogRecord(lambda: "built", level="warning", sources=["test"])
+
+        assert list(record) == ["built"]
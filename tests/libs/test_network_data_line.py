@@ -0,0 +1,171 @@
+# Project: bastproxy
+# Filename: tests/libs/test_network_data_line.py
+#
+# File Description: Tests for lightweight network data lines
+#
+# By: Bast
+"""Unit tests for lightweight NetworkDataLine records.
+
+This module contains tests for lines that are created without tracking and
+promoted to tracked records when their updates are asked for, and for the
+cached color conversions of a line.
+
+"""
+
+from collections.abc import Iterator
+
+import pytest
+
+from libs.api import API, AddAPI
+from libs.records import NetworkData, NetworkDataLine
+from libs.records.managers.records import RMANAGER
+from libs.records.managers.stacks import STACKTRACER
+from plugins.core.colors.libs._transcoder import (
+    ansicode_strip,
+    ansicode_to_colorcode,
+    colorcode_to_ansicode,
+)
+
+ESC = chr(27)
+
+
+class ColorsProvider:
+    """The color APIs that a line converts itself with, counting conversions."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="plugins.core.colors")
+        self.conversions = 0
+
+    @AddAPI("ansicode.strip", description="Test")
+    def _api_ansicode_strip(self, text: str) -> str:
+        """Strip the ansi codes from text."""
+        self.conversions += 1
+        return ansicode_strip(text)
+
+    @AddAPI("ansicode.to.colorcode", description="Test")
+    def _api_ansicode_to_colorcode(self, text: str) -> str:
+        """Convert the ansi codes in text to color codes."""
+        self.conversions += 1
+        return ansicode_to_colorcode(text)
+
+    @AddAPI("colorcode.to.ansicode", description="Test")
+    def _api_colorcode_to_ansicode(self, text: str) -> str:
+        """Convert the color codes in text to ansi codes."""
+        return colorcode_to_ansicode(text)
+
+
+class LoaderProvider:
+    """The plugin loader API that libs.api:has reads, no plugins are loaded."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="libs.plugins.loader")
+
+    @AddAPI("is.plugin.id", description="Test")
+    def _api_is_plugin_id(self, plugin_id: str) -> bool:
+        """Return False, the colors stand-in is not a plugin."""
+        return False
+
+
+@pytest.fixture
+def colors() -> Iterator[ColorsProvider]:
+    """Add the color APIs while a test runs."""
+    loader = LoaderProvider()
+    loader.api("libs.api:add.apis.for.object")("libs.plugins.loader", loader)
+    provider = ColorsProvider()
+    provider.api("libs.api:add.apis.for.object")("plugins.core.colors", provider)
+    yield provider
+    provider.api("libs.api:remove")("plugins.core.colors")
+    provider.api("libs.api:remove")("libs.plugins.loader")
+
+
+class TestLightweightNetworkDataLine:
+    """Test suite for lightweight NetworkDataLine records."""
+
+    def test_lightweight_line_is_not_tracked(self) -> None:
+        """Test that a lightweight line is not added to the record manager."""
+        line = NetworkDataLine("a line", originated="mud", lightweight=True)
+        data = NetworkData([line], owner_id="test")
+
+        assert line.lightweight
+        assert line.parents == [data]
+        assert line.uuid not in RMANAGER.record_instances
+        assert line.owner_id == "NetworkDataLine:'a line'"
+
+    def test_lightweight_line_tracks_changes(self) -> None:
+        """Test that a lightweight line still monitors and locks attributes."""
+        line = NetworkDataLine("a line", originated="mud", lightweight=True)
+
+        line.line = "changed"
+        line.lock()
+        line.line = "changed again"
+
+        assert line.line_modified
+        assert line.line == "changed"
+        assert line.original_line == "a line"
+        assert line._am_get_original_value("line") == "a line"
+
+    def test_asking_for_updates_promotes(self) -> None:
+        """Test that asking for the updates promotes the line."""
+        line = NetworkDataLine("a line", originated="mud", lightweight=True)
+        line.send = False
+
+        updates = list(line.updates)
+
+        assert not line.lightweight
+        assert line.uuid
+        assert line.api.owner_id == "NetworkDataLine:'a line'"
+        assert RMANAGER.record_instances[line.uuid] is line
+        assert [update.action for update in updates] == ["original input"]
+
+        line.send = True
+        assert line.updates[-1].action == "send attribute changed"
+
+    def test_full_tracing_creates_tracked_lines(self) -> None:
+        """Test that lines are fully tracked when the tracing mode is full."""
+        mode = STACKTRACER.mode
+        STACKTRACER.set_mode("full")
+        try:
+            line = NetworkDataLine("a line", originated="mud", lightweight=True)
+        finally:
+            STACKTRACER.set_mode(mode)
+
+        assert not line.lightweight
+        assert RMANAGER.record_instances[line.uuid] is line
+
+
+class TestNetworkDataLineColors:
+    """Test suite for the cached color conversions of a line."""
+
+    def test_conversions_cached(self, colors: ColorsProvider) -> None:
+        """Test that the conversions are done once while the line is the same."""
+        line = NetworkDataLine(f"{ESC}[0;31mred{ESC}[0m", originated="mud")
+
+        assert line.noansi == "red"
+        assert line.colorcoded == "@rred@x"
+        assert line.noansi == "red"
+        assert line.colorcoded == "@rred@x"
+        assert colors.conversions == 2
+
+    def test_line_change_clears_cache(self, colors: ColorsProvider) -> None:
+        """Test that changing the line converts it again."""
+        line = NetworkDataLine(f"{ESC}[0;31mred{ESC}[0m", originated="mud")
+        assert line.noansi == "red"
+        assert line.colorcoded == "@rred@x"
+
+        line.line = f"{ESC}[1;32mgreen{ESC}[0m"
+
+        assert line.noansi == "green"
+        assert line.colorcoded == "@Ggreen@x"
+
+    def test_color_line_clears_cache(self, colors: ColorsProvider) -> None:
+        """Test that coloring the line converts it again."""
+        line = NetworkDataLine("plain", originated="internal", color="@r")
+        assert line.noansi == "plain"
+        assert line.colorcoded == "plain"
+
+        line.color_line()
+
+        assert line.noansi == "plain"
+        assert line.colorcoded == "@rplain@x"
@@ -13,7 +13,15 @@ including saving, loading, and context manager behavior.
 
 from pathlib import Path
 
-from libs.persistentdict import PersistentDict
+import pytest
+
+from libs.persistentdict import (
+    JOURNAL_MIN_ENTRIES,
+    SERIALIZERS,
+    KeySchema,
+    PersistentDict,
+    int_key,
+)
 
 
 class TestPersistentDict:
@@ -229,3 +237,189 @@ class TestPersistentDict:
         # Key exists, should return existing value
         val = pd.setdefault("new_key", "other")
         assert val == "default"  # Original value preserved
+
+
+class TestPersistentDictJournal:
+    """Test suite for the journal format of PersistentDict."""
+
+    def test_round_trip(self, temp_data_dir: Path) -> None:
+        """Test that a journal is replayed when loaded.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.journal"
+        pd = PersistentDict("test_owner", filepath, tformat="journal")
+        pd["name"] = "value"
+        pd[1] = {"nested": [1, 2]}
+        pd.sync()
+        pd["name"] = "changed"
+        pd.sync()
+
+        loaded = PersistentDict("test_owner", filepath, tformat="journal")
+        assert loaded == {"name": "changed", 1: {"nested": [1, 2]}}
+
+    def test_deletes_are_replayed(self, temp_data_dir: Path) -> None:
+        """Test that deleted and popped keys stay removed after a load.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.journal"
+        pd = PersistentDict("test_owner", filepath, tformat="journal")
+        pd.update({"a": 1, "b": 2, "c": 3})
+        pd.sync()
+        del pd["a"]
+        pd.pop("b")
+        pd.sync()
+
+        loaded = PersistentDict("test_owner", filepath, tformat="journal")
+        assert loaded == {"c": 3}
+
+    def test_sync_appends_changed_keys(self, temp_data_dir: Path) -> None:
+        """Test that a sync only appends the keys changed since the last sync.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.journal"
+        pd = PersistentDict("test_owner", filepath, tformat="journal")
+        pd.update({f"key{i}": i for i in range(50)})
+        pd.sync()
+        lines = filepath.read_text().splitlines()
+
+        pd["key1"] = "one"
+        pd.sync()
+
+        new_lines = filepath.read_text().splitlines()
+        assert new_lines[: len(lines)] == lines
+        assert new_lines[len(lines) :] == ['["s","key1","one"]']
+
+    def test_journal_is_compacted(self, temp_data_dir: Path) -> None:
+        """Test that a journal that grows too large is rewritten.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.journal"
+        pd = PersistentDict("test_owner", filepath, tformat="journal")
+        for count in range(200):
+            pd["counter"] = count
+            pd.sync()
+
+        assert len(filepath.read_text().splitlines()) <= JOURNAL_MIN_ENTRIES
+
+        pd.clear()
+        pd["only"] = True
+        pd.sync()
+        assert filepath.read_text().splitlines() == ['["s","only",true]']
+
+        loaded = PersistentDict("test_owner", filepath, tformat="journal")
+        assert loaded == {"only": True}
+
+    def test_incomplete_last_entry_is_skipped(self, temp_data_dir: Path) -> None:
+        """Test that a partly written last entry does not stop the load.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.journal"
+        filepath.write_text('["s","a",1]\n["s","b",2]\n["s","c",')
+
+        pd = PersistentDict("test_owner", filepath, tformat="journal")
+        assert pd == {"a": 1, "b": 2}
+
+
+class TestPersistentDictFormats:
+    """Test suite for the serializers and key conversion of PersistentDict."""
+
+    @pytest.mark.parametrize("tformat", list(SERIALIZERS))
+    def test_round_trip(self, temp_data_dir: Path, tformat: str) -> None:
+        """Test that each format loads what it synced.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+            tformat: The format to test.
+
+        """
+        filepath = temp_data_dir / "test.txt"
+        data = {"name": "value", 5: [1, "two"], "nested": {"1": True, "b": None}}
+        pd = PersistentDict("test_owner", filepath, tformat=tformat)
+        pd.update(data)
+        pd.sync()
+
+        loaded = PersistentDict("test_owner", filepath, tformat=tformat)
+        assert loaded == {
+            "name": "value",
+            5: [1, "two"],
+            "nested": {1: True, "b": None},
+        }
+
+    def test_json_formats_read_each_other(self, temp_data_dir: Path) -> None:
+        """Test that the JSON formats can load files written by the others.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.txt"
+        pd = PersistentDict("test_owner", filepath, tformat="orjson")
+        pd["key"] = "value"
+        pd.sync()
+
+        assert PersistentDict("test_owner", filepath) == {"key": "value"}
+
+        pd = PersistentDict("test_owner", filepath)
+        pd["other"] = 1
+        pd.sync()
+
+        loaded = PersistentDict("test_owner", filepath, tformat="json-compact")
+        assert loaded == {"key": "value", "other": 1}
+
+    def test_unknown_format_raises(self, temp_data_dir: Path) -> None:
+        """Test that an unknown format is rejected when the dict is created.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        with pytest.raises(ValueError, match="Unknown format"):
+            PersistentDict("test_owner", temp_data_dir / "test.txt", tformat="yaml")
+
+    def test_key_schema(self, temp_data_dir: Path) -> None:
+        """Test that a key schema only converts the keys of the dicts it names.
+
+        Args:
+            temp_data_dir: Temporary directory for test data.
+
+        """
+        filepath = temp_data_dir / "test.json"
+        pd = PersistentDict("test_owner", filepath)
+        pd.update({1: "one", "levels": {1: "a"}, "names": {"2": "b"}})
+        pd.sync()
+
+        schema = KeySchema(fields={"levels": KeySchema()})
+        loaded = PersistentDict("test_owner", filepath, key_schema=schema)
+        assert loaded == {1: "one", "levels": {1: "a"}, "names": {"2": "b"}}
+
+        loaded = PersistentDict("test_owner", filepath, key_schema=KeySchema())
+        assert loaded["levels"] == {"1": "a"}
+
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [("12", 12), ("-3", -3), (" 4", 4), ("name", "name"), ("1a", "1a"), ("", "")],
+    )
+    def test_int_key(self, key: str, expected: int | str) -> None:
+        """Test converting keys to ints.
+
+        Args:
+            key: The key to convert.
+            expected: The converted key.
+
+        """
+        assert int_key(key) == expected
@@ -203,3 +203,70 @@ class TestQueue:
 
         with pytest.raises(ValueError, match="Count must be non-negative"):
             q.get_last_x(-1)
+
+    def test_enqueue_returns_evicted_item(self) -> None:
+        """Test that enqueue returns the item removed to make room."""
+
+        q: Queue = Queue(length=2)
+
+        assert q.enqueue("item1") is None
+        assert q.enqueue("item2") is None
+        assert q.enqueue("item3") == "item1"
+        assert q.last_automatically_removed_item == "item1"
+        assert q.get() == ["item2", "item3"]
+
+    def test_get_by_id_forgets_removed_items(self) -> None:
+        """Test that evicted and dequeued items are no longer found by ID."""
+
+        q: Queue = Queue(length=2, id_key="id")
+
+        for item_id in ("abc", "def", "ghi"):
+            q.enqueue({"id": item_id})
+
+        assert q.get_by_id("abc") is None
+        assert q.get_by_id("ghi") == {"id": "ghi"}
+
+        q.dequeue()
+        assert q.get_by_id("def") is None
+        assert len(q.id_lookup) == 1
+
+    def test_get_last_x_bounds(self) -> None:
+        """Test get_last_x with a count of 0 and more than the queue holds."""
+
+        q: Queue = Queue()
+
+        q.enqueue("item1")
+        q.enqueue("item2")
+
+        assert q.get_last_x(0) == ["item1", "item2"]
+        assert q.get_last_x(5) == ["item1", "item2"]
+        assert q.get_last_x(1) == ["item2"]
+
+    def test_snapshot_is_independent(self) -> None:
+        """Test that changing the queue does not change a snapshot."""
+
+        q: Queue = Queue(length=2, id_key="id")
+
+        q.enqueue({"id": "abc"})
+        q.takesnapshot()
+        q.enqueue({"id": "def"})
+        q.enqueue({"id": "ghi"})
+
+        snapshot = q.getsnapshot()
+        assert snapshot is not None
+        assert snapshot.get() == [{"id": "abc"}]
+        assert snapshot.get_by_id("abc") == {"id": "abc"}
+
+    def test_shrink_keeps_newest_items(self) -> None:
+        """Test that lowering the length keeps the newest items."""
+
+        q: Queue = Queue(length=4, id_key="id")
+
+        for item_id in ("a", "b", "c", "d"):
+            q.enqueue({"id": item_id})
+        q.len = 2
+
+        assert [item["id"] for item in q] == ["c", "d"]
+        assert q.get_by_id("a") is None
+        q.enqueue({"id": "e"})
+        assert [item["id"] for item in q] == ["d", "e"]
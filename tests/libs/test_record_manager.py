@@ -0,0 +1,78 @@
+# Project: bastproxy
+# Filename: tests/libs/test_record_manager.py
+#
+# File Description: Tests for the record manager
+#
+# By: Bast
+"""Unit tests for the RecordManager class.
+
+This module contains tests for looking up the children of records.
+
+"""
+
+from libs.records import NetworkData, NetworkDataLine
+from libs.records.managers.records import RMANAGER, RecordManager
+
+
+class TestRecordManagerChildren:
+    """Test suite for the children of records."""
+
+    def test_get_children(self) -> None:
+        """Test that the lines of a NetworkData are its children."""
+        first = NetworkDataLine("first", originated="mud")
+        second = NetworkDataLine("second", originated="mud")
+        data = NetworkData([first, second], owner_id="test")
+
+        assert set(RMANAGER.get_children(data)) == {first, second}
+        assert RMANAGER.get_children(data, record_filter=["NetworkDataLine"]) == []
+
+    def test_reset_moves_child(self) -> None:
+        """Test that a child added to a new parent leaves the old one."""
+        line = NetworkDataLine("a line", originated="mud")
+        old = NetworkData([line], owner_id="test")
+        new = NetworkData([], owner_id="test")
+
+        line.add_parent(new, reset=True)
+
+        assert RMANAGER.get_children(old) == []
+        assert RMANAGER.get_children(new) == [line]
+
+    def test_lightweight_children_are_not_returned(self) -> None:
+        """Test that lines that are not tracked are left out until promoted."""
+        line = NetworkDataLine("a line", originated="mud", lightweight=True)
+        data = NetworkData([line], owner_id="test")
+
+        assert RMANAGER.get_children(data) == []
+
+        line.promote()
+        assert RMANAGER.get_children(data) == [line]
+
+    def test_evicted_child_is_removed(self) -> None:
+        """Test that an evicted record is removed from its parents."""
+        manager = RecordManager()
+        manager.max_records = 1
+        first = NetworkDataLine("first", originated="mud")
+        second = NetworkDataLine("second", originated="mud")
+        data = NetworkData([first, second], owner_id="test")
+
+        manager.add(first)
+        manager.add(second)
+
+        assert id(first) not in data.children
+        assert manager.get_children(data) == [second]
+
+    def test_evicted_empty_record_is_removed(self) -> None:
+        """Test that an evicted record is removed even when it is empty."""
+        manager = RecordManager()
+        manager.max_records = 1
+        parent = NetworkDataLine("parent", originated="mud")
+        first = NetworkData([], owner_id="test")
+        second = NetworkData([], owner_id="test")
+        first.add_parent(parent)
+
+        manager.add(first)
+        manager.add(second)
+
+        assert not first
+        assert first.uuid not in manager.record_instances
+        assert id(first) not in parent.children
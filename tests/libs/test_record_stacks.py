@@ -0,0 +1,82 @@
+# Project: bastproxy
+# Filename: tests/libs/test_record_stacks.py
+#
+# File Description: Tests for the record stack tracer
+#
+# By: Bast
+"""Unit tests for the StackTracer class.
+
+This module contains tests for the tracing modes used to capture the call
+stacks of records.
+
+"""
+
+import pytest
+
+from libs.records.managers.stacks import StackTracer
+
+
+def capture_here(tracer: StackTracer):
+    """Capture a stack from a known function."""
+    return tracer.capture(limit=5)
+
+
+class TestStackTracer:
+    """Test suite for StackTracer class."""
+
+    def test_sampled_mode_samples_one_in_n(self) -> None:
+        """Test that sampled mode captures one in every sample_rate records."""
+        tracer = StackTracer()
+        tracer.set_mode("sampled", 3)
+
+        assert [tracer.sample() for _ in range(6)] == [
+            False,
+            False,
+            True,
+            False,
+            False,
+            True,
+        ]
+
+    def test_off_and_full_modes(self) -> None:
+        """Test that off never samples and full always samples."""
+        tracer = StackTracer()
+
+        tracer.set_mode("off")
+        assert not any(tracer.sample() for _ in range(10))
+
+        tracer.set_mode("full")
+        assert all(tracer.sample() for _ in range(10))
+
+    def test_invalid_mode_raises(self) -> None:
+        """Test that invalid settings are rejected."""
+        tracer = StackTracer()
+
+        with pytest.raises(ValueError, match="tracing mode"):
+            tracer.set_mode("sometimes")
+        with pytest.raises(ValueError, match="sample rate"):
+            tracer.set_mode("sampled", 0)
+
+        assert tracer.mode == "sampled"
+
+    def test_sampled_capture_is_formatted_lazily(self) -> None:
+        """Test that a sampled stack keeps locations until it is formatted."""
+        tracer = StackTracer()
+
+        stack = capture_here(tracer)
+
+        assert stack.locations[-1][2] == "capture_here"
+        lines = stack.format()
+        assert lines[-2].endswith("in capture_here")
+        assert lines[-1].strip() == "return tracer.capture(limit=5)"
+        assert stack.format() is lines
+
+    def test_full_capture_matches_sampled_format(self) -> None:
+        """Test that full and sampled captures format the same way."""
+        tracer = StackTracer()
+        sampled = capture_here(tracer).format()
+
+        tracer.set_mode("full")
+        full = capture_here(tracer).format()
+
+        assert full[-2:] == sampled[-2:]
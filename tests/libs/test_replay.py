@@ -0,0 +1,82 @@
+# Project: bastproxy
+# Filename: tests/libs/test_replay.py
+#
+# File Description: Tests for replaying recorded sessions
+#
+# By: Bast
+"""Unit tests for replaying recorded sessions.
+
+This module contains tests for reading the lines from the mud in a recorded
+session and for the stats of a replay.
+
+"""
+
+from pathlib import Path
+
+from libs.net.capture import (
+    CLIENT_READ,
+    FROM_MUD,
+    TO_MUD,
+    CaptureFile,
+    SessionCapture,
+)
+from libs.net.replay import ReplayClient, ReplayStats, read_session
+
+
+class TestReadSession:
+    """Test suite for reading recorded sessions."""
+
+    def test_read_capture(self, tmp_path: Path) -> None:
+        """Test that only the lines from the mud are read from a capture."""
+        path = tmp_path / "session.bpcap"
+        capture_file = CaptureFile(path)
+        session = SessionCapture()
+        session.start(capture_file.write_block)
+        session.record(FROM_MUD, "mud", "You are hungry.\r\n")
+        session.record(TO_MUD, "mud", b"\xff\xfd\x01")
+        session.record(CLIENT_READ, "abc123", "look\r\n")
+        session.record(FROM_MUD, "mud", "<100hp> ")
+        session.stop()
+        capture_file.close()
+
+        lines = [line for _, line in read_session(path)]
+
+        assert lines == ["You are hungry.\r\n", "<100hp> "]
+
+    def test_read_networkdata_log(self, tmp_path: Path) -> None:
+        """Test that the lines from the mud are read from a networkdata.log."""
+        path = tmp_path / "networkdata.log"
+        path.write_bytes(
+            b"2024-05-01T10:00:00+00:00 : data.mud    - from_mud     : "
+            b"You are hungry.\r\n\n"
+            b"2024-05-01T10:00:01+00:00 : data.client.abc - client_read  : look\n"
+            b"2024-05-01T10:00:02+00:00 : data.mud    - from_mud     : <100hp> \n"
+        )
+
+        session = list(read_session(path))
+
+        assert [line for _, line in session] == ["You are hungry.\r\n", "<100hp> \n"]
+        assert session[1][0] - session[0][0] == 2
+
+
+class TestReplayStats:
+    """Test suite for the stats of a replay."""
+
+    def test_percentiles(self) -> None:
+        """Test that the percentiles use the nearest rank."""
+        stats = ReplayStats(lines=100, seconds=2)
+        stats.latencies = [number / 1000 for number in range(1, 101)]
+
+        assert stats.lines_per_second == 50
+        assert stats.percentile(50) == 0.05
+        assert stats.percentile(99) == 0.099
+        assert stats.percentile(100) == 0.1
+
+    def test_client_records_latency(self) -> None:
+        """Test that a stand-in client records each line it is sent."""
+        client = ReplayClient(1)
+        client.send_to(None)  # type: ignore[arg-type]
+
+        assert client.uuid == "replay-1"
+        assert client.lines == 1
+        assert len(client.latencies) == 1
@@ -0,0 +1,75 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_color_transcoder.py
+#
+# File Description: Tests for the color transcoder
+#
+# By: Bast
+"""Unit tests for the color transcoder functions.
+
+This module contains tests for converting between @ color codes and ANSI
+sequences used by the colors plugin.
+
+"""
+
+import pytest
+
+from plugins.core.colors.libs._transcoder import (
+    ansicode_strip,
+    ansicode_to_colorcode,
+    colorcode_strip,
+    colorcode_to_ansicode,
+)
+
+ESC = chr(27)
+
+
+class TestColorcodeToAnsicode:
+    """Test suite for colorcode_to_ansicode."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("no colors here", "no colors here"),
+            ("@rred@w", f"{ESC}[0;31mred{ESC}[0m"),
+            ("lead @Gtext", f"lead {ESC}[1;32mtext{ESC}[0m"),
+            (
+                "@x123fg @z5bg@w",
+                f"{ESC}[38;5;123mfg {ESC}[48;5;5mbg{ESC}[0m",
+            ),
+            ("@rmail@@home", f"{ESC}[0;31mmail@home{ESC}[0m"),
+            ("@rtilde @-", f"{ESC}[0;31mtilde ~{ESC}[0m"),
+            ("@x300bad @x25612", "bad 12"),
+            ("@qunknown", "unknown"),
+            ("@r@gtext", f"{ESC}[0;32mtext{ESC}[0m"),
+            ("@xtext", "text"),
+        ],
+    )
+    def test_convert(self, text: str, expected: str) -> None:
+        """Test converting color codes for a set of strings."""
+        assert colorcode_to_ansicode(text) == expected
+
+    def test_strip(self) -> None:
+        """Test that stripping removes both color codes and ANSI sequences."""
+        assert colorcode_strip(f"@rred {ESC}[1;32mgreen@@ @x12x") == "red green@ x"
+
+
+class TestAnsicodeToColorcode:
+    """Test suite for ANSI conversions."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("plain", "plain"),
+            (f"{ESC}[1;31mred{ESC}[0m", "@Rred@x"),
+            (f"{ESC}[0;031mred", "@rred"),
+            (f"{ESC}[38;5;012mblue", "@x12blue"),
+            (f"{ESC}[32mgreen", "@ggreen"),
+        ],
+    )
+    def test_convert(self, text: str, expected: str) -> None:
+        """Test converting ANSI sequences for a set of strings."""
+        assert ansicode_to_colorcode(text) == expected
+
+    def test_strip(self) -> None:
+        """Test that ANSI sequences are removed."""
+        assert ansicode_strip(f"{ESC}[1;31mred{ESC}[0m plain") == "red plain"
@@ -0,0 +1,272 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_event.py
+#
+# File Description: Tests for the Event class
+#
+# By: Bast
+"""Unit tests for the Event class.
+
+This module contains tests for the order callbacks are called in, the number
+of raised events an event keeps, and the totals kept for every raise.
+
+"""
+
+from collections.abc import Iterator
+
+import pytest
+
+import libs.timing  # noqa: F401 - adds the timing APIs used by records
+from libs.api import API, AddAPI
+from plugins.core.events.plugin._event import Event
+
+
+class SettingsProvider:
+    """The settings API that raising an event reads."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="plugins.core.settings")
+
+    @AddAPI("get", description="Test")
+    def _api_get(self, plugin_id: str, setting: str) -> bool:
+        """Return False for the log_savestate setting."""
+        return False
+
+
+@pytest.fixture
+def settings_api() -> Iterator[None]:
+    """Add the settings API while a test runs."""
+    provider = SettingsProvider()
+    provider.api("libs.api:add.apis.for.object")("plugins.core.settings", provider)
+    yield
+    provider.api("libs.api:remove")("plugins.core.settings")
+
+
+@pytest.mark.usefixtures("settings_api")
+class TestEventRetention:
+    """Test suite for the raised events kept by an event."""
+
+    def test_keeps_last_raised_events(self) -> None:
+        """Test that only the last retention raised events are kept."""
+        event = Event("ev_test_retention", retention=2)
+
+        raised = [event.raise_event({"count": count}, "test") for count in range(4)]
+
+        assert list(event.raised_events.values()) == raised[2:]
+        assert event.raised_count == 4
+        assert event.raised_time_max >= event.raised_time_average > 0
+
+    def test_retention_off(self) -> None:
+        """Test that a retention of 0 keeps no raised events."""
+        event = Event("ev_test_retention_off", retention=0)
+
+        raised_event = event.raise_event({}, "test")
+
+        assert raised_event is not None
+        assert event.raised_events == {}
+        assert event.raised_count == 1
+
+    def test_default_retention(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that events without a retention follow the default."""
+        event = Event("ev_test_retention_default")
+        for _ in range(3):
+            event.raise_event({}, "test")
+
+        monkeypatch.setattr(Event, "default_retention", 1)
+        event.trim_raised_events()
+        assert len(event.raised_events) == 1
+
+        event.set_retention(0)
+        assert event.raised_events == {}
+
+
+@pytest.mark.usefixtures("settings_api")
+class TestEventDispatch:
+    """Test suite for the order callbacks are called in."""
+
+    def test_priority_order(self) -> None:
+        """Test that callbacks are called from the lowest priority up."""
+        event = Event("ev_test_dispatch_order")
+        calls = []
+        for priority in (50, 10, 90):
+            event.register(
+                lambda priority=priority: calls.append(priority), "test", priority
+            )
+        plan = event.dispatch_plan
+
+        event.raise_event({}, "test")
+        event.raise_event({}, "test")
+
+        assert calls == [10, 50, 90, 10, 50, 90]
+        assert event.dispatch_plan is plan
+
+    def test_register_during_raise(self) -> None:
+        """Test that functions registered during a raise are called in it."""
+        event = Event("ev_test_dispatch_register")
+        calls = []
+
+        def later() -> None:
+            calls.append("later")
+
+        def earlier() -> None:
+            calls.append("earlier")
+
+        def first() -> None:
+            calls.append("first")
+            event.register(later, "test", 60)
+            event.register(earlier, "test", 10)
+
+        event.register(first, "test", 50)
+        event.raise_event({}, "test")
+
+        assert calls == ["first", "earlier", "later"]
+
+    def test_unregister_during_raise(self) -> None:
+        """Test that a function unregistered during a raise is not called."""
+        event = Event("ev_test_dispatch_unregister")
+        calls = []
+
+        def second() -> None:
+            calls.append("second")
+
+        def first() -> None:
+            calls.append("first")
+            event.unregister(second)
+
+        event.register(first, "test", 10)
+        event.register(second, "test", 20)
+        event.raise_event({}, "test")
+
+        assert calls == ["first"]
+
+    def test_nested_raise_skips_running_callback(self) -> None:
+        """Test that raising the event from a callback does not call it again."""
+        event = Event("ev_test_dispatch_nested")
+        calls = []
+
+        def outer() -> None:
+            calls.append("outer")
+            if calls.count("outer") == 1:
+                event.raise_event({}, "test")
+
+        def other() -> None:
+            calls.append("other")
+
+        event.register(outer, "test", 10)
+        event.register(other, "test", 20)
+        event.raise_event({}, "test")
+
+        assert calls == ["outer", "other", "other"]
+        assert event.current_callback is None
+
+
+@pytest.mark.usefixtures("settings_api")
+class TestEventBatch:
+    """Test suite for callbacks registered with batch=True."""
+
+    def test_batch_called_once(self) -> None:
+        """Test that a batch callback gets the whole list in priority order."""
+        event = Event("ev_test_batch_once")
+        calls = []
+
+        def each(name: str) -> None:
+            calls.append((name, event.active_event.event_data["line"]))
+
+        def batch() -> None:
+            calls.append(("batch", event.active_event.event_data["line_list"]))
+
+        event.register(lambda: each("late"), "test", 90)
+        event.register(batch, "test", 50, batch=True)
+        event.register(lambda: each("early"), "test", 10)
+        event.register(lambda: each("same"), "test", 50)
+        raised_event = event.raise_event(
+            {}, "test", data_list=["a", "b"], key_name="line"
+        )
+
+        assert calls == [
+            ("early", "a"),
+            ("same", "a"),
+            ("early", "b"),
+            ("same", "b"),
+            ("batch", ["a", "b"]),
+            ("late", "a"),
+            ("late", "b"),
+        ]
+        assert event.dispatch_phases == (
+            (False, 10, 50),
+            (True, 50, 50),
+            (False, 90, 90),
+        )
+        assert raised_event is not None
+        assert raised_event.times_invoked == 5
+
+    def test_register_new_priority_during_raise(self) -> None:
+        """Test that a function registered at a new priority is called."""
+        event = Event("ev_test_batch_register")
+        calls = []
+
+        def later() -> None:
+            calls.append(("later", event.active_event.event_data["line"]))
+
+        def batch() -> None:
+            calls.append(("batch", event.active_event.event_data["line_list"]))
+
+        def first() -> None:
+            calls.append(("first", event.active_event.event_data["line"]))
+            if len(calls) == 1:
+                event.register(later, "test", 70)
+                event.register(batch, "test", 90, batch=True)
+
+        event.register(first, "test", 50)
+        event.raise_event({}, "test", data_list=["a", "b"], key_name="line")
+
+        assert calls == [
+            ("first", "a"),
+            ("first", "b"),
+            ("later", "a"),
+            ("later", "b"),
+            ("batch", ["a", "b"]),
+        ]
+
+    def test_only_batch_callbacks(self) -> None:
+        """Test that the items are not dispatched when every callback is batch."""
+        event = Event("ev_test_batch_only")
+        calls = []
+        event.register(lambda: calls.append("batch"), "test", batch=True)
+
+        raised_event = event.raise_event(
+            {}, "test", data_list=["a", "b", "c"], key_name="line"
+        )
+
+        assert calls == ["batch"]
+        assert raised_event is not None
+        assert raised_event.times_invoked == 1
+        assert "line" not in raised_event.event_data
+
+    def test_batch_without_data_list(self) -> None:
+        """Test that a batch callback is called for a raise without a list."""
+        event = Event("ev_test_batch_single")
+        calls = []
+        event.register(lambda: calls.append("batch"), "test", batch=True)
+        event.register(lambda: calls.append("each"), "test", 60)
+
+        event.raise_event({"line": "a"}, "test")
+
+        assert calls == ["batch", "each"]
+
+
+@pytest.mark.usefixtures("settings_api")
+class TestEventRaise:
+    """Test suite for raising an event more than once."""
+
+    def test_single_callback_called_every_raise(self) -> None:
+        """Test that an event with one callback calls it on every raise."""
+        event = Event("ev_test_raise_single")
+        calls = []
+        event.register(lambda: calls.append("called"), "test")
+
+        for _ in range(3):
+            event.raise_event({}, "test")
+
+        assert calls == ["called", "called", "called"]
+        assert event.current_callback is None
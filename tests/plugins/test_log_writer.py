@@ -0,0 +1,218 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_log_writer.py
+#
+# File Description: Tests for the log writer
+#
+# By: Bast
+"""Unit tests for the LogWriter class.
+
+This module contains tests for writing log records on the writer thread, for
+dropping records when the queue is full, for the gap written to a capture
+file when blocks are dropped, and for stopping the writer.
+
+"""
+
+import io
+import logging
+import threading
+from pathlib import Path
+
+from libs.net.capture import FROM_MUD, GAP, SessionCapture, export_text, read_capture
+from plugins.core.log.libs._custom_logger import CaptureHandler
+from plugins.core.log.libs._writer import LogWriter, QueuedLogHandler
+
+
+class ListHandler(logging.Handler):
+    """A handler that keeps the messages it handles and counts its flushes."""
+
+    def __init__(self) -> None:
+        """Initialize the handler."""
+        super().__init__()
+        self.messages: list[str] = []
+        self.threads: set[str] = set()
+        self.flushes = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Keep the message of a record."""
+        self.messages.append(record.getMessage())
+        self.threads.add(threading.current_thread().name)
+
+    def flush(self) -> None:
+        """Count a flush."""
+        self.flushes += 1
+
+
+def make_logger(
+    name: str, writer: LogWriter, target: logging.Handler
+) -> logging.Logger:
+    """Create a logger that queues its records for a handler."""
+    logger = logging.getLogger(f"test_log_writer.{name}")
+    logger.handlers = [QueuedLogHandler(writer, target)]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+class TestLogWriter:
+    """Test suite for the LogWriter class."""
+
+    def test_records_written_on_thread(self) -> None:
+        """Test that queued records are formatted and written by the thread."""
+        writer = LogWriter()
+        target = ListHandler()
+        writer.add_handler(target)
+        logger = make_logger("thread", writer, target)
+        writer.start()
+
+        logger.info("line %s of %s", 1, 2)
+        logger.info("line %s of %s", 2, 2)
+        assert writer.flush()
+
+        assert target.messages == ["line 1 of 2", "line 2 of 2"]
+        assert target.threads == {"bastproxy log writer"}
+        assert target.flushes >= 1
+        writer.stop()
+
+    def test_full_queue_drops_records(self) -> None:
+        """Test that records are dropped when the queue is full and counted."""
+        writer = LogWriter(maxsize=2)
+        target = ListHandler()
+        writer.add_handler(target)
+        logger = make_logger("full", writer, target)
+        # the thread is not started, so mark it running without taking records
+        writer._thread = threading.current_thread()
+
+        for number in range(5):
+            logger.info("record %s", number)
+
+        assert writer.queue.qsize() == 2
+        assert writer.dropped == {target: 3}
+
+        writer._thread = None
+        writer.start()
+        logger.info("after")
+        assert writer.flush()
+
+        assert target.messages == [
+            "record 0",
+            "record 1",
+            "the log queue was full, 3 records were not written",
+            "after",
+        ]
+        assert writer.dropped == {}
+        writer.stop()
+
+    def test_dropped_warning_written_to_warning_handler(self) -> None:
+        """Test that the warning for dropped records is also in the main log."""
+        writer = LogWriter(maxsize=3)
+        target = ListHandler()
+        target.set_name("target")
+        main_log = ListHandler()
+        writer.warning_handler = main_log
+        logger = make_logger("warning", writer, target)
+        writer._thread = threading.current_thread()
+
+        for number in range(5):
+            logger.info("record %s", number)
+
+        assert writer.dropped == {target: 2}
+
+        writer._thread = None
+        writer.start()
+        # wait for the queued records to be written, so there is room
+        assert writer.flush()
+        logger.info("after")
+        assert writer.flush()
+
+        assert target.messages == [
+            "record 0",
+            "record 1",
+            "record 2",
+            "the log queue was full, 2 records were not written",
+            "after",
+        ]
+        assert main_log.messages == [
+            "the log queue was full, 2 records for target were not written"
+        ]
+        writer.stop()
+
+    def test_no_room_for_warnings_keeps_count(self) -> None:
+        """Test that the warnings are only queued when there is room for all."""
+        writer = LogWriter(maxsize=2)
+        target = ListHandler()
+        writer.warning_handler = ListHandler()
+        writer._thread = threading.current_thread()
+        writer.dropped[target] = 2
+        writer.queue.put_nowait((target, logging.makeLogRecord({"msg": "queued"})))
+
+        writer.put(target, logging.makeLogRecord({"msg": "next"}))
+
+        assert writer.queue.qsize() == 1
+        assert writer.dropped == {target: 3}
+        writer._thread = None
+
+    def test_capture_overflow_writes_gap(self, tmp_path: Path) -> None:
+        """Test that blocks dropped for the capture file leave a gap record."""
+        path = tmp_path / "session.bpcap"
+        writer = LogWriter(maxsize=3)
+        capture_handler = CaptureHandler(path)
+        writer.add_handler(capture_handler)
+        main_log = ListHandler()
+        writer.warning_handler = main_log
+        session = SessionCapture()
+        session.start(
+            lambda block: writer.put(
+                capture_handler, logging.makeLogRecord({"msg": block})
+            )
+        )
+        writer._thread = threading.current_thread()
+
+        for number in range(5):
+            session.record(FROM_MUD, "mud", f"line {number}\r\n")
+            session.flush()
+
+        assert writer.dropped == {capture_handler: 2}
+
+        writer._thread = None
+        writer.start()
+        assert writer.flush()
+        session.record(FROM_MUD, "mud", "line 5\r\n")
+        session.stop()
+        writer.stop()
+
+        records = [record[1:] for record in read_capture(path)]
+        assert records == [
+            (FROM_MUD, "mud", "line 0\r\n"),
+            (FROM_MUD, "mud", "line 1\r\n"),
+            (FROM_MUD, "mud", "line 2\r\n"),
+            (GAP, "", "2 blocks of network data were not written"),
+            (FROM_MUD, "mud", "line 5\r\n"),
+        ]
+        assert main_log.messages == [
+            (
+                f"the log queue was full, 2 records for the capture file {path}"
+                " were not written"
+            )
+        ]
+
+        out = io.StringIO()
+        export_text(path, out, utc=True)
+        gap_line = out.getvalue().split("\n")[3]
+        assert gap_line.endswith(
+            " : capture     - gap          : 2 blocks of network data were not written"
+        )
+
+    def test_stop_writes_queued_records(self) -> None:
+        """Test that stopping writes the queue and then writes synchronously."""
+        writer = LogWriter()
+        target = ListHandler()
+        logger = make_logger("stop", writer, target)
+        writer.start()
+
+        logger.info("queued")
+        writer.stop()
+        assert not writer.running
+        assert target.messages == ["queued"]
+
+        logger.info("direct")
+        assert target.messages == ["queued", "direct"]
@@ -0,0 +1,70 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_records_plugin.py
+#
+# File Description: Tests for the records debug plugin
+#
+# By: Bast
+"""Unit tests for the RecordPlugin class.
+
+This module contains tests for the settings that control which records
+capture their call stack.
+
+"""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from libs.records import STACKTRACER
+from plugins.debug.records.plugin._records import RecordPlugin
+from tests.plugins.test_settings import SettingsHarness, create_plugin
+
+PLUGIN_ID = "plugins.debug.records"
+
+
+@pytest.fixture
+def records(tmp_path: Path) -> Iterator[tuple[SettingsHarness, RecordPlugin]]:
+    """Create the records plugin and its settings while a test runs."""
+    mode, sample_rate = STACKTRACER.mode, STACKTRACER.sample_rate
+    harness = SettingsHarness(tmp_path)
+    plugin = create_plugin(RecordPlugin, PLUGIN_ID, tmp_path)
+    harness.loader.loaded.add(PLUGIN_ID)
+    plugin._phook_initialize()
+    yield harness, plugin
+    harness.close()
+    harness.api("libs.api:remove")(PLUGIN_ID)
+    STACKTRACER.set_mode(mode, sample_rate)
+
+
+class TestRecordTracingSettings:
+    """Test suite for the record tracing settings."""
+
+    def test_change_sets_mode(
+        self, records: tuple[SettingsHarness, RecordPlugin]
+    ) -> None:
+        """Test that changing the settings changes the tracing mode."""
+        harness, plugin = records
+        harness.api("plugins.core.settings:change")(PLUGIN_ID, "recordtracing", "full")
+        harness.api("plugins.core.settings:change")(PLUGIN_ID, "recordsamplerate", "7")
+        plugin._eventcb_record_tracing_modified()
+
+        assert STACKTRACER.mode == "full"
+        assert STACKTRACER.sample_rate == 7
+
+    def test_invalid_mode_is_reverted(
+        self, records: tuple[SettingsHarness, RecordPlugin]
+    ) -> None:
+        """Test that an invalid mode is not kept in the settings."""
+        harness, plugin = records
+        STACKTRACER.set_mode("off", 5)
+        harness.api("plugins.core.settings:change")(PLUGIN_ID, "recordtracing", "off")
+        harness.api("plugins.core.settings:change")(
+            PLUGIN_ID, "recordtracing", "everything"
+        )
+        plugin._eventcb_record_tracing_modified()
+
+        assert STACKTRACER.mode == "off"
+        get = harness.api("plugins.core.settings:get")
+        assert get(PLUGIN_ID, "recordtracing") == "off"
+        assert get(PLUGIN_ID, "recordsamplerate") == 5
@@ -0,0 +1,360 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_settings.py
+#
+# File Description: Tests for the settings plugin
+#
+# By: Bast
+"""Unit tests for the SettingsPlugin class.
+
+This module contains tests for changing settings and the events raised when a
+setting changes. The settings plugin runs with the utils plugin, and stand-ins
+for the plugin loader and the events plugin.
+
+"""
+
+import asyncio
+import contextlib
+import types
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+import libs.timing  # noqa: F401 - adds the timing APIs used by records
+from libs.api import API, AddAPI
+from libs.persistentdict import KeySchema, PersistentDict
+from libs.plugins import reloadutils  # noqa: F401 - adds the plugin cache APIs
+from plugins._baseplugin import BasePlugin
+from plugins.core.settings.plugin._settings import SettingsPlugin
+from plugins.core.utils.plugin._utils import UtilsPlugin
+
+OWNER_ID = "plugins.test.owner"
+
+
+class LoaderProvider:
+    """The plugin loader API that the settings plugin reads."""
+
+    def __init__(self) -> None:
+        """Initialize the provider, no plugins are loaded."""
+        self.api = API(owner_id="libs.plugins.loader")
+        self.loaded: set[str] = set()
+
+    @AddAPI("is.plugin.id", description="Test")
+    def _api_is_plugin_id(self, plugin_id: str) -> bool:
+        """Return True for a loaded plugin."""
+        return plugin_id in self.loaded
+
+    @AddAPI("is.plugin.loaded", description="Test")
+    def _api_is_plugin_loaded(self, plugin_id: str) -> bool:
+        """Return True for a loaded plugin."""
+        return plugin_id in self.loaded
+
+    @AddAPI("is.plugin.instantiated", description="Test")
+    def _api_is_plugin_instantiated(self, plugin_id: str) -> bool:
+        """Return True for a loaded plugin."""
+        return plugin_id in self.loaded
+
+
+class EventsProvider:
+    """The events API that the settings plugin raises events with."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="plugins.core.events")
+        self.raised: list[tuple[str, dict]] = []
+
+    @AddAPI("raise.event", description="Test")
+    def _api_raise_event(self, event_name: str, event_args=None, **kwargs) -> None:
+        """Keep the name and arguments of a raised event."""
+        self.raised.append((event_name, event_args))
+
+    def raised_names(self) -> list[str]:
+        """Return the names of the raised events."""
+        return [event_name for event_name, _ in self.raised]
+
+
+class TaskProvider:
+    """The asynch API that the settings plugin starts its save task with."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="libs.asynch")
+        self.tasks: list[asyncio.Task] = []
+
+    @AddAPI("task.add", description="Test")
+    def _api_task_add(self, task, name: str, startstring: str = "") -> asyncio.Task:
+        """Start a task on the running loop."""
+        self.tasks.append(asyncio.get_running_loop().create_task(task(), name=name))
+        return self.tasks[-1]
+
+
+def create_plugin(plugin_class: type, plugin_id: str, data_path: Path):
+    """Create a plugin with a data directory, without loading it."""
+    info = types.SimpleNamespace(data_directory=data_path / plugin_id)
+    return plugin_class(plugin_id, info)
+
+
+class SettingsHarness:
+    """The settings plugin, the plugins it uses and a plugin with settings."""
+
+    def __init__(self, data_path: Path) -> None:
+        """Create the plugins and stand-ins."""
+        self.loader = LoaderProvider()
+        self.loader.api("libs.api:add.apis.for.object")(
+            "libs.plugins.loader", self.loader
+        )
+        self.events = EventsProvider()
+        self.events.api("libs.api:add.apis.for.object")(
+            "plugins.core.events", self.events
+        )
+        self.tasks = TaskProvider()
+        self.tasks.api("libs.api:add.apis.for.object")("libs.asynch", self.tasks)
+        create_plugin(UtilsPlugin, "plugins.core.utils", data_path)
+        self.plugin = create_plugin(SettingsPlugin, "plugins.core.settings", data_path)
+        create_plugin(BasePlugin, OWNER_ID, data_path)
+        self.settings_file = data_path / OWNER_ID / "settingvalues.txt"
+        self.loader.loaded.update(("plugins.core.utils", OWNER_ID))
+        self.api = API(owner_id="tests.plugins.test_settings")
+
+    def close(self) -> None:
+        """Remove the APIs of the plugins and stand-ins."""
+        for owner_id in (
+            "libs.plugins.loader",
+            "plugins.core.events",
+            "libs.asynch",
+            "plugins.core.utils",
+            "plugins.core.settings",
+            OWNER_ID,
+        ):
+            self.api("libs.api:remove")(owner_id)
+
+    def add(self, setting: str, default, stype, **kwargs) -> None:
+        """Add a setting to the test plugin."""
+        self.api("plugins.core.settings:add")(
+            OWNER_ID, setting, default, stype, f"the {setting} setting", **kwargs
+        )
+
+    def change(self, setting: str, value) -> bool:
+        """Change a setting of the test plugin."""
+        return self.api("plugins.core.settings:change")(OWNER_ID, setting, value)
+
+    def get(self, setting: str):
+        """Get a setting of the test plugin."""
+        return self.api("plugins.core.settings:get")(OWNER_ID, setting)
+
+    def saved(self) -> dict:
+        """Return the settings of the test plugin that are in its file."""
+        return dict(
+            PersistentDict(OWNER_ID, self.settings_file, "r", key_schema=KeySchema())
+        )
+
+    def set_save_delay(self, seconds: float) -> None:
+        """Add the save delay setting of the settings plugin and set it."""
+        self.plugin._phook_initialize()
+        self.plugin.settings_values["plugins.core.settings"]["savedelay"] = seconds
+
+
+@pytest.fixture
+def settings(tmp_path: Path) -> Iterator[SettingsHarness]:
+    """Create the settings plugin while a test runs."""
+    harness = SettingsHarness(tmp_path)
+    yield harness
+    harness.close()
+
+
+class TestSettingChange:
+    """Test suite for changing a setting."""
+
+    def test_change_raises_modified_event(self, settings: SettingsHarness) -> None:
+        """Test that a change to a loaded plugin's setting raises an event."""
+        settings.add("count", 1, int)
+
+        assert settings.change("count", "5")
+
+        assert settings.get("count") == 5
+        assert settings.events.raised == [
+            (
+                f"ev_{OWNER_ID}_var_count_modified",
+                {"var": "count", "newvalue": 5, "oldvalue": 1},
+            )
+        ]
+
+    def test_no_event_for_plugin_not_loaded(self, settings: SettingsHarness) -> None:
+        """Test that no event is raised while the plugin is not loaded."""
+        settings.add("count", 1, int)
+        settings.loader.loaded.discard(OWNER_ID)
+
+        assert settings.change("count", "5")
+
+        assert settings.get("count") == 5
+        assert settings.events.raised == []
+
+
+class TestVolatileSettings:
+    """Test suite for settings that are kept in memory only."""
+
+    def test_volatile_value_not_saved(self, settings: SettingsHarness) -> None:
+        """Test that a volatile value is never put in the persistent dict."""
+        settings.add("state", "idle", str, volatile=True)
+
+        assert settings.change("state", "busy")
+        settings.plugin._phook_save()
+
+        assert settings.get("state") == "busy"
+        assert "state" not in settings.plugin.settings_values[OWNER_ID]
+        assert "state" not in settings.saved()
+        assert OWNER_ID not in settings.plugin.unsaved_plugins
+
+    def test_saved_value_removed_when_volatile(self, settings: SettingsHarness) -> None:
+        """Test that a value saved before a setting was volatile is removed."""
+        stored = PersistentDict(
+            OWNER_ID, settings.settings_file, "c", key_schema=KeySchema()
+        )
+        stored["state"] = "busy"
+        stored.sync()
+
+        settings.add("state", "idle", str, volatile=True)
+
+        assert settings.get("state") == "idle"
+        assert "state" not in settings.plugin.settings_values[OWNER_ID]
+
+    def test_get_returns_volatile_value(self, settings: SettingsHarness) -> None:
+        """Test that get returns the volatile value ahead of a stored value."""
+        settings.add("state", "idle", str, volatile=True)
+        settings.plugin.settings_values[OWNER_ID]["state"] = "stored"
+
+        assert settings.get("state") == "idle"
+
+        settings.change("state", "busy")
+
+        assert settings.get("state") == "busy"
+
+    def test_volatile_change_verified(self, settings: SettingsHarness) -> None:
+        """Test that a volatile value of the wrong type is verified."""
+        settings.add("count", 1, int, volatile=True)
+
+        assert settings.change("count", "5")
+        assert settings.get("count") == 5
+
+        assert settings.change("count", 7)
+        assert settings.get("count") == 7
+
+        with pytest.raises(ValueError, match="many"):
+            settings.change("count", "many")
+        assert settings.get("count") == 7
+
+    def test_volatile_change_raises_modified_event(
+        self, settings: SettingsHarness
+    ) -> None:
+        """Test that a change to a volatile setting raises an event."""
+        settings.add("state", "idle", str, volatile=True)
+
+        settings.change("state", "busy")
+
+        assert settings.events.raised_names() == [f"ev_{OWNER_ID}_var_state_modified"]
+
+    def test_noevent_suppresses_modified_event(self, settings: SettingsHarness) -> None:
+        """Test that no event is raised for a noevent setting."""
+        settings.add("count", 1, int, noevent=True)
+        settings.add("state", "idle", str, volatile=True, noevent=True)
+
+        assert settings.change("count", "5")
+        assert settings.change("state", "busy")
+
+        assert settings.get("count") == 5
+        assert settings.get("state") == "busy"
+        assert settings.events.raised == []
+
+
+class TestDelayedSave:
+    """Test suite for saving changed settings after a delay."""
+
+    def test_saved_right_away_without_loop(self, settings: SettingsHarness) -> None:
+        """Test that a change is saved right away with no event loop."""
+        settings.set_save_delay(5)
+        settings.add("count", 1, int)
+
+        settings.change("count", "5")
+
+        assert settings.saved()["count"] == 5
+        assert not settings.plugin.unsaved_plugins
+        assert settings.plugin.save_task is None
+
+    def test_changes_saved_together(self, settings: SettingsHarness) -> None:
+        """Test that changes during the delay are saved by one task."""
+        settings.set_save_delay(0.05)
+        settings.add("count", 1, int)
+        settings.add("name", "bast", str)
+
+        async def change() -> None:
+            settings.change("count", "5")
+            settings.change("name", "other")
+
+            assert len(settings.tasks.tasks) == 1
+            assert settings.plugin.unsaved_plugins == {OWNER_ID}
+            assert settings.saved().get("count") != 5
+
+            await settings.tasks.tasks[0]
+
+        asyncio.run(change())
+
+        assert settings.saved() == {"count": 5, "name": "other"}
+        assert not settings.plugin.unsaved_plugins
+        assert settings.plugin.save_task is None
+
+    def test_save_changed(self, settings: SettingsHarness) -> None:
+        """Test that save.changed saves the changes before the delay ends."""
+        settings.set_save_delay(60)
+        settings.add("count", 1, int)
+
+        async def change() -> None:
+            settings.change("count", "5")
+            settings.api("plugins.core.settings:save.changed")()
+
+        asyncio.run(change())
+
+        assert settings.saved()["count"] == 5
+        assert not settings.plugin.unsaved_plugins
+
+    def test_saved_on_shutdown_and_save(self, settings: SettingsHarness) -> None:
+        """Test that the shutdown event and the save hook save the changes."""
+        settings.set_save_delay(60)
+        settings.add("count", 1, int)
+
+        async def change() -> None:
+            settings.change("count", "5")
+            settings.plugin._eventcb_settings_shutdown()
+            assert settings.saved()["count"] == 5
+
+            settings.change("count", "6")
+            settings.plugin._phook_save()
+
+        asyncio.run(change())
+
+        assert settings.saved()["count"] == 6
+
+    def test_cancelled_task_does_not_stop_saves(
+        self, settings: SettingsHarness
+    ) -> None:
+        """Test that a new save task is started after one is cancelled."""
+        settings.set_save_delay(60)
+        settings.add("count", 1, int)
+
+        async def change() -> None:
+            settings.change("count", "5")
+            first = settings.tasks.tasks[0]
+            # let the task start waiting before it is cancelled
+            await asyncio.sleep(0)
+            first.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await first
+            assert settings.plugin.save_task is None
+
+            settings.plugin.settings_values["plugins.core.settings"]["savedelay"] = 0.01
+            settings.change("count", "6")
+            assert len(settings.tasks.tasks) == 2
+            await settings.tasks.tasks[1]
+
+        asyncio.run(change())
+
+        assert settings.saved()["count"] == 6
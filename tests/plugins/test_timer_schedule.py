@@ -0,0 +1,181 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_timer_schedule.py
+#
+# File Description: Tests for the timer schedule
+#
+# By: Bast
+"""Unit tests for the TimerSchedule class.
+
+This module contains tests for the order timers fire in, for removing and
+moving timers in the schedule, and for when a timer is due next.
+
+"""
+
+import datetime as dt
+import types
+
+import pytest
+
+from plugins.core.timers.libs._schedule import TimerSchedule
+from plugins.core.timers.plugin import _timers
+from plugins.core.timers.plugin._timers import Timer
+
+
+class FrozenClock(dt.datetime):
+    """A datetime whose now is set by the test."""
+
+    current = dt.datetime(2024, 5, 1, tzinfo=dt.UTC)
+
+    @classmethod
+    def now(cls, tz=None):  # type: ignore[override]
+        """Return the time set by the test."""
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> type[FrozenClock]:
+    """Make the timers module use the frozen clock."""
+    monkeypatch.setattr(
+        _timers,
+        "datetime",
+        types.SimpleNamespace(datetime=FrozenClock, timedelta=dt.timedelta, UTC=dt.UTC),
+    )
+    return FrozenClock
+
+
+class TestTimerSchedule:
+    """Test suite for the TimerSchedule class."""
+
+    def test_pop_due_in_order(self) -> None:
+        """Test that due timers are returned in the order they fire."""
+        schedule = TimerSchedule()
+        schedule.add("late", 3.5)
+        schedule.add("early", 1.25)
+        schedule.add("tied", 1.25)
+        schedule.add("future", 10)
+
+        assert schedule.next_time() == 1.25
+        assert schedule.pop_due(4) == [(1.25, "early"), (1.25, "tied"), (3.5, "late")]
+        assert schedule.pop_due(4) == []
+        assert len(schedule) == 1
+        assert schedule.next_time() == 10
+
+    def test_add_reports_first(self) -> None:
+        """Test that add returns True only for the next timer to fire."""
+        schedule = TimerSchedule()
+
+        assert schedule.add("first", 5)
+        assert not schedule.add("second", 6)
+        assert schedule.add("third", 0.5)
+
+    def test_remove(self) -> None:
+        """Test that a removed timer is not returned."""
+        schedule = TimerSchedule()
+        schedule.add("keep", 2)
+        schedule.add("drop", 1)
+
+        assert schedule.remove("drop")
+        assert not schedule.remove("drop")
+        assert "drop" not in schedule
+        assert schedule.next_time() == 2
+        assert schedule.pop_due(5) == [(2, "keep")]
+        assert schedule.next_time() is None
+
+    def test_add_moves_timer(self) -> None:
+        """Test that adding a scheduled timer again moves it."""
+        schedule = TimerSchedule()
+        timer = object()
+        schedule.add(timer, 1)
+        schedule.add(timer, 3)
+
+        assert len(schedule) == 1
+        assert schedule.pop_due(2) == []
+        assert schedule.pop_due(3) == [(3, timer)]
+
+    def test_removed_entries_are_compacted(self) -> None:
+        """Test that the heap is rebuilt when most of it is removed timers."""
+        schedule = TimerSchedule()
+        timers = [object() for _ in range(100)]
+        for index, timer in enumerate(timers):
+            schedule.add(timer, index)
+        for timer in timers[:90]:
+            schedule.remove(timer)
+
+        assert len(schedule.heap) < 50
+        assert [item for _, item in schedule.pop_due(200)] == timers[90:]
+
+
+class TestTimerNextFire:
+    """Test suite for when a timer is due next."""
+
+    def test_time_of_day_timer_due_tomorrow_after_firing(
+        self, clock: type[FrozenClock]
+    ) -> None:
+        """Test that a time of day timer is due a day after it fires."""
+        clock.current = dt.datetime(2024, 5, 1, 12, 59, 59, 900000, tzinfo=dt.UTC)
+        timer = Timer("daily", lambda: None, 0, "test", time="1300")
+        due = dt.datetime(2024, 5, 1, 13, 0, tzinfo=dt.UTC)
+        assert timer.next_fire_datetime == due
+
+        # fire early in the due second, as the timer task does
+        clock.current = due + dt.timedelta(milliseconds=2)
+        timer.last_fired_datetime = timer.next_fire_datetime
+
+        assert timer.get_next_fire() == due + dt.timedelta(days=1)
+
+    def test_time_of_day_timer_created_in_its_minute(
+        self, clock: type[FrozenClock]
+    ) -> None:
+        """Test that a time of day timer created as it is due waits a day."""
+        clock.current = dt.datetime(2024, 5, 1, 13, 0, 0, 250000, tzinfo=dt.UTC)
+        timer = Timer("daily", lambda: None, 0, "test", time="1300")
+
+        assert timer.next_fire_datetime == dt.datetime(2024, 5, 2, 13, 0, tzinfo=dt.UTC)
+
+    def test_interval_timer_counts_from_due_time(
+        self, clock: type[FrozenClock]
+    ) -> None:
+        """Test that an interval timer is due an interval after it was due."""
+        clock.current = dt.datetime(2024, 5, 1, 10, 0, tzinfo=dt.UTC)
+        timer = Timer("interval", lambda: None, 30, "test")
+        due = timer.next_fire_datetime
+
+        clock.current = due + dt.timedelta(seconds=0.5)
+        timer.last_fired_datetime = due
+
+        assert timer.get_next_fire() == due + dt.timedelta(seconds=30)
+
+    @pytest.mark.parametrize(
+        ("late", "expected"),
+        [
+            (dt.timedelta(seconds=30), dt.timedelta(seconds=30)),
+            (dt.timedelta(seconds=31), dt.timedelta(seconds=60)),
+            (dt.timedelta(seconds=90), dt.timedelta(seconds=90)),
+            (dt.timedelta(days=3, seconds=5), dt.timedelta(days=3, seconds=30)),
+        ],
+    )
+    def test_interval_timer_skips_missed_intervals(
+        self, clock: type[FrozenClock], late: dt.timedelta, expected: dt.timedelta
+    ) -> None:
+        """Test that missed intervals are skipped to the next one after now."""
+        clock.current = dt.datetime(2024, 5, 1, 10, 0, tzinfo=dt.UTC)
+        timer = Timer("interval", lambda: None, 30, "test")
+        due = timer.next_fire_datetime
+
+        clock.current = due + late
+        timer.last_fired_datetime = due
+
+        assert timer.get_next_fire() == due + expected
+
+    def test_time_of_day_timer_skips_missed_days(
+        self, clock: type[FrozenClock]
+    ) -> None:
+        """Test that a time of day timer missed for days is due the next day."""
+        clock.current = dt.datetime(2024, 5, 1, 12, 0, tzinfo=dt.UTC)
+        timer = Timer("daily", lambda: None, 0, "test", time="1300")
+        due = timer.next_fire_datetime
+
+        clock.current = due + dt.timedelta(days=5, hours=1)
+        timer.last_fired_datetime = due
+
+        assert timer.get_next_fire() == due + dt.timedelta(days=6)
@@ -0,0 +1,191 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_trigger_matcher.py
+#
+# File Description: Tests for the trigger matcher
+#
+# By: Bast
+"""Unit tests for the TriggerMatcher class.
+
+This module contains tests for literal prefix extraction and multi-regex
+matching used by the triggers plugin.
+
+"""
+
+import pytest
+import regex
+
+from plugins.core.triggers.libs._matcher import (
+    TriggerMatcher,
+    extract_literal_prefix,
+    extract_required_literal,
+)
+
+
+class TestExtractLiteralPrefix:
+    """Test suite for extract_literal_prefix."""
+
+    @pytest.mark.parametrize(
+        ("regex", "expected"),
+        [
+            ("^You are hungry", "You are hungry"),
+            ("You are hungry\\.$", "You are hungry."),
+            ("^\\[ Exits: (.*) \\]$", "[ Exits: "),
+            ("^(?P<name>\\w+) tells you", ""),
+            ("^You (are|were) hungry", "You "),
+            ("^Yours? turn", "Your"),
+            ("^Ah+ha", "Ah"),
+            ("^a{2}b", ""),
+            ("^\\d+ gold", ""),
+            ("^foo|^bar", ""),
+            ("(?i)^you are hungry", ""),
+            ("^[|]foo", ""),
+            ("", ""),
+        ],
+    )
+    def test_extract(self, regex: str, expected: str) -> None:
+        """Test prefix extraction for a set of regexes."""
+        assert extract_literal_prefix(regex) == expected
+
+
+class TestExtractRequiredLiteral:
+    """Test suite for extract_required_literal."""
+
+    @pytest.mark.parametrize(
+        ("regex", "expected"),
+        [
+            ("^(?P<who>\\w+) tells you: (?P<msg>.*)$", " tells you: "),
+            ("^(.*) is DEAD!!$", " is DEAD!!"),
+            ("^(\\d+)/(\\d+)hp", "hp"),
+            ("^(foo bar)?baz", "baz"),
+            ("^\\w+ (gives|hands) you", " you"),
+            ("^.* arrives?\\.", " arrive"),
+            ("^(ab){12345}", ""),
+            ("^[Hello world]+", ""),
+            ("^(.*) says|whispers", ""),
+            ("(?i)^.* tells you", ""),
+            ("\\x41BCD", "BCD"),
+            ("\\x{41}BC", "BC"),
+            ("^caf\\u00e9 au lait", " au lait"),
+            ("^\\U0001F600 smiles", " smiles"),
+            ("^\\N{EM DASH} said", " said"),
+            ("^\\p{Lu}ower", "ower"),
+            ("^(a)\\1bc", "bc"),
+            ("^\\012foo", "foo"),
+            ("^[\\x41-\\x5d]+ done", " done"),
+        ],
+    )
+    def test_extract(self, regex: str, expected: str) -> None:
+        """Test required literal extraction for a set of regexes."""
+        assert extract_required_literal(regex) == expected
+
+
+class TestTriggerMatcher:
+    """Test suite for TriggerMatcher class."""
+
+    def test_match_returns_every_matching_regex(self) -> None:
+        """Test that all matching regexes are returned, not only the first."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "^You are (\\w+)")
+        matcher.add("reg_2", "^You are hungry")
+        matcher.add("reg_3", "^(.*) hungry$")
+        matcher.add("reg_4", "^You are thirsty")
+
+        matches = matcher.match("You are hungry")
+
+        assert list(matches) == ["reg_1", "reg_2", "reg_3"]
+        assert matches["reg_1"].group(1) == "hungry"
+
+    def test_prefix_filters_candidates(self) -> None:
+        """Test that regexes with a non matching prefix are not candidates."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "^You are hungry")
+        matcher.add("reg_2", "^\\[ Exits: (.*) \\]")
+        matcher.add("reg_3", "^(\\w+) says")
+
+        assert matcher.candidates("[ Exits: north ]") == ["reg_2"]
+        assert matcher.candidates("Bob says hi") == ["reg_3"]
+
+    def test_literal_filters_candidates(self) -> None:
+        """Test that regexes without a prefix are filtered by a required literal."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "^(\\w+) tells you: (.*)$")
+        matcher.add("reg_2", "^(.*) is DEAD!!$")
+        matcher.add("reg_3", "^(.*)$")
+
+        assert matcher.get_literal("reg_1") == " tells you: "
+        assert matcher.candidates("Bob tells you: hi") == ["reg_1", "reg_3"]
+        assert matcher.candidates("A rat is DEAD!!") == ["reg_2", "reg_3"]
+        assert list(matcher.match("Bob tells you: hi")) == ["reg_1", "reg_3"]
+
+    def test_escape_is_not_a_literal(self) -> None:
+        """Test that the characters of an escape are not used as a literal."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "\\x41BCD")
+        matcher.add("reg_2", "^(.*)caf\\u00e9")
+
+        assert matcher.get_literal("reg_1") == "BCD"
+        assert matcher.get_literal("reg_2") == "caf"
+        assert list(matcher.match("ABCD")) == ["reg_1"]
+        assert list(matcher.match("a caf\u00e9")) == ["reg_2"]
+
+    def test_short_prefix_uses_literal(self) -> None:
+        """Test that a longer literal is used over a one character prefix."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "^\\[(\\d+)\\] exits: (.*)$")
+
+        assert matcher.get_prefix("reg_1") == ""
+        assert matcher.get_literal("reg_1") == "] exits: "
+        assert matcher.candidates("[2] exits: north") == ["reg_1"]
+        assert matcher.candidates("[2] rooms") == []
+
+    def test_order_sorts_matches(self) -> None:
+        """Test that an explicit order is used instead of the order added."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_2", "^You are", order=2)
+        matcher.add("reg_1", "^You are hungry", order=1)
+        matcher.add("reg_3", "^(.*) hungry$", order=3)
+
+        assert list(matcher.match("You are hungry")) == ["reg_1", "reg_2", "reg_3"]
+
+    def test_set_order_keeps_pattern(self) -> None:
+        """Test that changing the order resorts a regex without recompiling it."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "^You are", order=(100, 1))
+        pattern = matcher.add("reg_2", "^You are hungry", order=(100, 2))
+
+        matcher.set_order("reg_2", (10, 2))
+
+        assert matcher.get_order("reg_2") == (10, 2)
+        assert matcher.get_pattern("reg_2") is pattern
+        assert matcher.candidates("You are hungry") == ["reg_2", "reg_1"]
+
+        with pytest.raises(KeyError):
+            matcher.set_order("reg_3", (1, 3))
+
+    def test_remove(self) -> None:
+        """Test that removed regexes are no longer matched."""
+        matcher = TriggerMatcher()
+        matcher.add("reg_1", "^You are hungry")
+        matcher.add("reg_2", "^You are")
+        matcher.add("reg_3", "^(.*) tells you")
+        matcher.add("reg_4", "^(.*) tells you")
+
+        matcher.remove("reg_1")
+        matcher.remove("reg_3")
+
+        assert "reg_1" not in matcher
+        assert matcher.candidates("Bob tells you") == ["reg_4"]
+
+        matcher.remove("reg_4")
+
+        assert len(matcher) == 1
+        assert list(matcher.match("You are hungry")) == ["reg_2"]
+
+    def test_invalid_regex_raises(self) -> None:
+        """Test that a regex that does not compile is not added."""
+        matcher = TriggerMatcher()
+
+        with pytest.raises(regex.error):
+            matcher.add("reg_1", "^(unclosed")
+
+        assert "reg_1" not in matcher
@@ -0,0 +1,312 @@
+# Project: bastproxy
+# Filename: tests/plugins/test_triggers.py
+#
+# File Description: Tests for the triggers plugin
+#
+# By: Bast
+"""Unit tests for the TriggersPlugin class.
+
+This module contains tests for the order triggers are raised in when a line
+matches them, and for when the matcher is updated after triggers change. The
+triggers plugin runs with stand-ins for the plugin loader and the events
+plugin.
+
+"""
+
+import types
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+import libs.timing  # noqa: F401 - adds the timing APIs used by records
+from libs.api import API, AddAPI
+from libs.plugins import reloadutils  # noqa: F401 - adds the plugin cache APIs
+from plugins.core.triggers.plugin._triggers import TriggersPlugin
+from tests.plugins.test_settings import LoaderProvider, create_plugin
+
+OWNER_ID = "plugins.test.owner"
+
+
+class EventsProvider:
+    """The events API that triggers are raised with."""
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        self.api = API(owner_id="plugins.core.events")
+        self.raised: list[str] = []
+        # event name: a function called when the event is raised
+        self.callbacks: dict[str, Callable[[], None]] = {}
+
+    @AddAPI("raise.event", description="Test")
+    def _api_raise_event(self, event_name: str, event_args=None, **kwargs) -> dict:
+        """Keep the name of the raised trigger and call its callback."""
+        self.raised.append(event_args["trigger_name"])
+        if callback := self.callbacks.get(event_name):
+            callback()
+        return event_args
+
+    @AddAPI("get.event", description="Test")
+    def _api_get_event(self, event_name: str) -> None:
+        """Return no event, no functions are registered to triggers."""
+
+
+class TriggersHarness:
+    """The triggers plugin and the stand-ins it uses."""
+
+    def __init__(self, data_path: Path) -> None:
+        """Create the plugin and stand-ins."""
+        self.loader = LoaderProvider()
+        self.loader.api("libs.api:add.apis.for.object")(
+            "libs.plugins.loader", self.loader
+        )
+        self.events = EventsProvider()
+        self.events.api("libs.api:add.apis.for.object")(
+            "plugins.core.events", self.events
+        )
+        self.plugin = create_plugin(TriggersPlugin, "plugins.core.triggers", data_path)
+        self.api = API(owner_id="tests.plugins.test_triggers")
+
+    def close(self) -> None:
+        """Remove the APIs of the plugin and stand-ins."""
+        for owner_id in (
+            "libs.plugins.loader",
+            "plugins.core.events",
+            "plugins.core.triggers",
+        ):
+            self.api("libs.api:remove")(owner_id)
+
+    def add(self, trigger_name: str, regex: str, **kwargs) -> None:
+        """Add a trigger for the test owner."""
+        self.api("plugins.core.triggers:trigger.add")(
+            trigger_name, regex, OWNER_ID, **kwargs
+        )
+
+    def remove(self, trigger_name: str) -> bool:
+        """Remove a trigger of the test owner."""
+        return self.api("plugins.core.triggers:trigger.remove")(
+            trigger_name, owner_id=OWNER_ID
+        )
+
+    def on_raise(self, trigger_name: str, callback: Callable[[], None]) -> None:
+        """Call a function when a trigger of the test owner is raised."""
+        trigger_id = self.plugin.create_trigger_id(trigger_name, OWNER_ID)
+        self.events.callbacks[self.plugin.triggers[trigger_id].event_name] = callback
+
+    def process(self, data: str) -> list[str]:
+        """Sync the matcher and check a line, return the regexes that matched."""
+        self.plugin.sync_matcher()
+        return self.plugin.process_line(types.SimpleNamespace(colorcoded=data), data)
+
+    def regex_id(self, trigger_name: str) -> str:
+        """Return the regex id of a trigger of the test owner."""
+        trigger_id = self.plugin.create_trigger_id(trigger_name, OWNER_ID)
+        return self.plugin.triggers[trigger_id].regex_id
+
+
+@pytest.fixture
+def triggers(tmp_path: Path) -> Iterator[TriggersHarness]:
+    """Create the triggers plugin while a test runs."""
+    harness = TriggersHarness(tmp_path)
+    yield harness
+    harness.close()
+
+
+class TestProcessLine:
+    """Test suite for raising the triggers that match a line."""
+
+    def test_triggers_raised_in_priority_order(self, triggers: TriggersHarness) -> None:
+        """Test that triggers on different regexes are raised by priority."""
+        triggers.add("low", "^You are hungry$", priority=200)
+        triggers.add("high", "^You are (?P<state>\\w+)$", priority=10)
+        triggers.add("middle", "^You are hungry$", priority=50)
+
+        matched = triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["high", "middle", "low"]
+        assert set(matched) == {triggers.regex_id("low"), triggers.regex_id("high")}
+
+    def test_same_priority_raised_in_order_added(
+        self, triggers: TriggersHarness
+    ) -> None:
+        """Test that triggers with the same priority are raised as added."""
+        triggers.add("first", "^You are (\\w+)$")
+        triggers.add("second", "^You are hungry$")
+        triggers.add("third", "^You are (\\w+)$")
+
+        triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["first", "third", "second"]
+
+    def test_stopevaluating_stops_lower_priority(
+        self, triggers: TriggersHarness
+    ) -> None:
+        """Test that stopevaluating stops lower triggers and later regexes."""
+        triggers.add("stop", "^You are hungry$", priority=10, stopevaluating=True)
+        triggers.add("same_regex", "^You are hungry$", priority=20)
+        triggers.add("later_regex", "^You are (\\w+)$", priority=30)
+        triggers.add("before", "^You (\\w+) hungry$", priority=5)
+
+        matched = triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["before", "stop"]
+        assert triggers.regex_id("later_regex") not in matched
+
+    def test_disabled_trigger_not_raised(self, triggers: TriggersHarness) -> None:
+        """Test that a trigger disabled before the line is not raised."""
+        triggers.add("enabled", "^You are hungry$")
+        triggers.add("disabled", "^You are hungry$", enabled=False)
+
+        triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["enabled"]
+
+    def test_remove_trigger_during_line(self, triggers: TriggersHarness) -> None:
+        """Test that a trigger removed by an earlier trigger is not raised."""
+        triggers.add("first", "^You are hungry$", priority=10)
+        triggers.add("second", "^You are hungry$", priority=20)
+        triggers.add("other", "^You are (\\w+)$", priority=30)
+        triggers.on_raise("first", lambda: triggers.remove("second"))
+
+        triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["first", "other"]
+
+        triggers.events.raised.clear()
+        triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["first", "other"]
+
+    def test_remove_all_triggers_of_regex_during_line(
+        self, triggers: TriggersHarness
+    ) -> None:
+        """Test that removing every trigger of a matched regex is safe."""
+        triggers.add("first", "^You are (\\w+)$", priority=10)
+        triggers.add("second", "^You are hungry$", priority=20)
+
+        def remove_all() -> None:
+            triggers.remove("first")
+            triggers.remove("second")
+
+        triggers.on_raise("first", remove_all)
+
+        triggers.process("You are hungry")
+        triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["first"]
+
+
+class TestMatcherSync:
+    """Test suite for updating the matcher after triggers change."""
+
+    def test_add_synced_on_next_line(self, triggers: TriggersHarness) -> None:
+        """Test that an added trigger is put in the matcher on the next line."""
+        triggers.add("hungry", "^You are hungry$")
+        regex_id = triggers.regex_id("hungry")
+
+        assert regex_id not in triggers.plugin.matcher
+
+        triggers.process("You are hungry")
+
+        assert regex_id in triggers.plugin.matcher
+        assert triggers.events.raised == ["hungry"]
+
+    def test_batch_add_synced_when_block_ends(self, triggers: TriggersHarness) -> None:
+        """Test that triggers added in a batch are put in the matcher after it."""
+        with triggers.api("plugins.core.triggers:batch.changes")():
+            triggers.add("hungry", "^You are hungry$")
+            with triggers.api("plugins.core.triggers:batch.changes")():
+                triggers.add("thirsty", "^You are thirsty$")
+            assert triggers.regex_id("thirsty") not in triggers.plugin.matcher
+            assert triggers.regex_id("hungry") not in triggers.plugin.matcher
+
+        assert triggers.regex_id("hungry") in triggers.plugin.matcher
+        assert triggers.regex_id("thirsty") in triggers.plugin.matcher
+        assert not triggers.plugin.changed_regex_ids
+
+    def test_batch_remove_synced_when_block_ends(
+        self, triggers: TriggersHarness
+    ) -> None:
+        """Test that a trigger removed in a batch leaves the matcher after it."""
+        triggers.add("hungry", "^You are hungry$")
+        regex_id = triggers.regex_id("hungry")
+        triggers.process("You are hungry")
+
+        with triggers.api("plugins.core.triggers:batch.changes")():
+            triggers.remove("hungry")
+            assert regex_id in triggers.plugin.matcher
+
+        assert regex_id not in triggers.plugin.matcher
+        assert regex_id not in triggers.plugin.dispatch_table
+
+    def test_batch_toggle_synced_when_block_ends(
+        self, triggers: TriggersHarness
+    ) -> None:
+        """Test that a trigger toggled in a batch is synced after it."""
+        triggers.add("hungry", "^You are hungry$")
+        regex_id = triggers.regex_id("hungry")
+        triggers.process("You are hungry")
+        toggle = triggers.api("plugins.core.triggers:trigger.toggle.enable")
+
+        with triggers.api("plugins.core.triggers:batch.changes")():
+            toggle("hungry", False, owner_id=OWNER_ID)
+            assert regex_id in triggers.plugin.matcher
+        assert regex_id not in triggers.plugin.matcher
+
+        with triggers.api("plugins.core.triggers:batch.changes")():
+            toggle("hungry", True, owner_id=OWNER_ID)
+            assert regex_id not in triggers.plugin.matcher
+        assert regex_id in triggers.plugin.matcher
+
+    def test_remove_data_for_owner_syncs_once(
+        self, triggers: TriggersHarness, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that removing the triggers of an owner syncs the matcher once."""
+        triggers.add("hungry", "^You are hungry$")
+        triggers.add("thirsty", "^You are thirsty$")
+        triggers.api("plugins.core.triggers:trigger.add")(
+            "other", "^You are hungry$", "plugins.test.other"
+        )
+        triggers.process("You are hungry")
+        hungry_id = triggers.regex_id("hungry")
+        thirsty_id = triggers.regex_id("thirsty")
+        syncs: list[set[str]] = []
+        sync_matcher = triggers.plugin.sync_matcher
+
+        def count_sync() -> None:
+            syncs.append(set(triggers.plugin.changed_regex_ids))
+            sync_matcher()
+
+        monkeypatch.setattr(triggers.plugin, "sync_matcher", count_sync)
+
+        triggers.api("plugins.core.triggers:remove.data.for.owner")(OWNER_ID)
+
+        assert syncs == [{hungry_id, thirsty_id}]
+        assert hungry_id in triggers.plugin.matcher
+        assert thirsty_id not in triggers.plugin.matcher
+
+        triggers.events.raised.clear()
+        triggers.process("You are hungry")
+
+        assert triggers.events.raised == ["other"]
+
+    def test_group_toggle_synced_when_done(self, triggers: TriggersHarness) -> None:
+        """Test that toggling a group syncs the matcher for its triggers."""
+        triggers.add("hungry", "^You are hungry$", group="needs")
+        triggers.add("thirsty", "^You are thirsty$", group="needs")
+        triggers.process("You are hungry")
+        toggle_group = triggers.api("plugins.core.triggers:group.toggle.enable")
+
+        toggle_group("needs", False)
+
+        assert triggers.regex_id("hungry") not in triggers.plugin.matcher
+        assert triggers.regex_id("thirsty") not in triggers.plugin.matcher
+        triggers.events.raised.clear()
+        triggers.process("You are hungry")
+        assert triggers.events.raised == []
+
+        toggle_group("needs", True)
+
+        assert triggers.regex_id("hungry") in triggers.plugin.matcher
+        triggers.process("You are thirsty")
+        assert triggers.events.raised == ["thirsty"]